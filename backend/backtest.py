@@ -0,0 +1,403 @@
+"""Vectorized backtesting of trading strategies over historical price series
+
+Replays a price/sentiment series with the same paper-trading semantics as
+`execute_paper_trade()` in server.py: a BUY converts all available USD into
+the asset at the bar price, a SELL converts the whole position back to USD,
+and a trade's profit/loss is `amount * (sell_price - buy_price)`. Positions
+and equity are computed with NumPy array operations instead of a per-bar
+loop, so a year of minute bars runs in well under a second.
+
+The daily trade cap turns over-cap BUYs and SELLs into HOLDs, as the live
+portfolio does, while stop-loss/take-profit exits always fire. Unlike live
+trading, which splits free USD across the tracked assets without a
+position, a backtest trades one asset with the whole balance; results
+compare strategies on one series rather than predict a multi-asset run.
+
+Usage:
+    python backtest.py prices.csv --strategy rsi
+"""
+import argparse
+import json
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+HOLD, BUY, SELL = 0, 1, -1
+ACTION_CODES = {"HOLD": HOLD, "BUY": BUY, "SELL": SELL}
+ACTION_NAMES = {code: name for name, code in ACTION_CODES.items()}
+SENTIMENT_SCORES = {"Positive": 1.0, "Neutral": 0.0, "Negative": -1.0}
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class BacktestData(NamedTuple):
+    timestamps: np.ndarray  # datetime64[s]
+    prices: np.ndarray
+    volumes: Optional[np.ndarray] = None
+    rsi: Optional[np.ndarray] = None
+    sentiment: Optional[np.ndarray] = None  # -1.0 (Negative) .. 1.0 (Positive)
+
+    def __len__(self):
+        return len(self.prices)
+
+
+class BacktestResult(NamedTuple):
+    timestamps: np.ndarray
+    equity: np.ndarray
+    positions: np.ndarray  # 1 while holding the asset, 0 while in USD
+    trades: List[Dict[str, Any]]
+    stats: Dict[str, float]
+
+    def to_dict(self, max_points: Optional[int] = 1000):
+        """JSON-friendly view, down-sampling the equity curve to `max_points`"""
+        step = max(1, len(self.equity) // max_points) if max_points else 1
+        return {
+            "equity_curve": [
+                {"timestamp": str(ts), "total_value": float(value)}
+                for ts, value in zip(self.timestamps[::step], self.equity[::step])
+            ],
+            "trades": self.trades,
+            "stats": self.stats,
+        }
+
+
+class TradingRules(NamedTuple):
+    """Risk rules mirroring the TradingSettings fields of the same purpose"""
+    confidence_threshold: float = 0.0
+    stop_loss_percentage: Optional[float] = None
+    take_profit_percentage: Optional[float] = None
+    max_trades_per_day: Optional[int] = None
+
+
+# A decision function returns one HOLD/BUY/SELL code per bar, optionally
+# together with a per-bar confidence array: actions or (actions, confidence)
+DecisionFunction = Callable[[BacktestData], Any]
+
+
+def _sentiment_score(value):
+    if isinstance(value, str):
+        return SENTIMENT_SCORES.get(value, 0.0)
+    return float(value) if value is not None else 0.0
+
+
+def load_records(records: Iterable[Dict[str, Any]]) -> BacktestData:
+    """Build BacktestData from dicts with timestamp/price and optional volume/rsi/sentiment
+
+    Price history points and trade documents stored by server.py both work;
+    a `news_sentiment` label is used when no numeric `sentiment` is present.
+    """
+    records = sorted(records, key=lambda r: r["timestamp"])
+    timestamps = np.array([np.datetime64(r["timestamp"], "s") for r in records])
+    prices = np.array([r["price"] for r in records], dtype=float)
+
+    def optional_column(key, convert=float):
+        if not records or not all(r.get(key) is not None for r in records):
+            return None
+        return np.array([convert(r[key]) for r in records], dtype=float)
+
+    sentiment = optional_column("sentiment", _sentiment_score)
+    if sentiment is None:
+        sentiment = optional_column("news_sentiment", _sentiment_score)
+    return BacktestData(timestamps, prices, optional_column("volume"), optional_column("rsi"), sentiment)
+
+
+def load_csv(path: str) -> BacktestData:
+    """Load a CSV with a timestamp and price column (volume, rsi and sentiment optional)"""
+    import pandas as pd
+
+    frame = pd.read_csv(path)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+    frame = frame.sort_values("timestamp")
+    columns = {name: frame[name].to_numpy(dtype=float) for name in ("volume", "rsi") if name in frame}
+    sentiment = None
+    if "sentiment" in frame:
+        sentiment = np.array([_sentiment_score(v) for v in frame["sentiment"]], dtype=float)
+    return BacktestData(
+        timestamps=frame["timestamp"].to_numpy().astype("datetime64[s]"),
+        prices=frame["price"].to_numpy(dtype=float),
+        volumes=columns.get("volume"),
+        rsi=columns.get("rsi"),
+        sentiment=sentiment,
+    )
+
+
+def compute_rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Simple-moving-average RSI, 50 until `period` bars are available"""
+    rsi = np.full(len(prices), 50.0)
+    if len(prices) <= period:
+        return rsi
+    delta = np.diff(prices)
+    gains = np.concatenate([[0.0], np.cumsum(np.clip(delta, 0, None))])
+    losses = np.concatenate([[0.0], np.cumsum(np.clip(-delta, 0, None))])
+    avg_gain = (gains[period:] - gains[:-period]) / period
+    avg_loss = (losses[period:] - losses[:-period]) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = np.where(avg_loss > 0, avg_gain / avg_loss, np.inf)
+        rsi[period:] = np.where(avg_gain + avg_loss > 0, 100.0 - 100.0 / (1.0 + rs), 50.0)
+    return rsi
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` bars (expanding until the window fills)"""
+    csum = np.cumsum(np.concatenate([[0.0], values]))
+    idx = np.arange(1, len(values) + 1)
+    start = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[start]) / (idx - start)
+
+
+# Decision functions: BacktestData -> array of HOLD/BUY/SELL codes, one per bar
+def rsi_strategy(buy_below: float = 30.0, sell_above: float = 70.0, period: int = 14) -> DecisionFunction:
+    """Buy oversold, sell overbought"""
+    def decide(data: BacktestData) -> np.ndarray:
+        rsi = data.rsi if data.rsi is not None else compute_rsi(data.prices, period)
+        return np.where(rsi < buy_below, BUY, np.where(rsi > sell_above, SELL, HOLD))
+    return decide
+
+
+def moving_average_strategy(fast: int = 20, slow: int = 100) -> DecisionFunction:
+    """Buy when the fast average is above the slow one, sell when below"""
+    def decide(data: BacktestData) -> np.ndarray:
+        spread = rolling_mean(data.prices, fast) - rolling_mean(data.prices, slow)
+        actions = np.where(spread > 0, BUY, SELL)
+        actions[:slow] = HOLD
+        return actions
+    return decide
+
+
+def sentiment_strategy(threshold: float = 0.1) -> DecisionFunction:
+    """Follow news sentiment: buy when positive, sell when negative"""
+    def decide(data: BacktestData) -> np.ndarray:
+        if data.sentiment is None:
+            return np.zeros(len(data), dtype=np.int8)
+        return np.where(data.sentiment > threshold, BUY, np.where(data.sentiment < -threshold, SELL, HOLD))
+    return decide
+
+
+def cached_decisions(decisions: Iterable[Dict[str, Any]], min_confidence: float = 0.0) -> DecisionFunction:
+    """Replay recorded decisions (e.g. LLM trade documents) onto the price bars
+
+    Each decision needs `timestamp` and `decision` (BUY/SELL/HOLD), and
+    optionally `confidence`; it is applied at the first bar at or after its
+    timestamp. Decisions under `min_confidence` are treated as HOLD.
+    """
+    decisions = sorted(decisions, key=lambda d: d["timestamp"])
+    times = np.array([np.datetime64(d["timestamp"], "s") for d in decisions], dtype="datetime64[s]")
+    confidences = np.array([float(d.get("confidence", 1.0)) for d in decisions], dtype=float)
+    codes = np.array([ACTION_CODES.get(str(d.get("decision", "HOLD")).upper(), HOLD) for d in decisions], dtype=np.int8)
+    codes[confidences < min_confidence] = HOLD
+
+    def decide(data: BacktestData):
+        actions = np.zeros(len(data), dtype=np.int8)
+        confidence = np.ones(len(data))
+        if not len(codes):
+            return actions, confidence
+        bars = np.searchsorted(data.timestamps, times, side="left")
+        valid = (bars < len(data)) & (codes != HOLD)
+        # The latest BUY/SELL wins when several land on the same bar
+        actions[bars[valid]] = codes[valid]
+        confidence[bars[valid]] = confidences[valid]
+        return actions, confidence
+    return decide
+
+
+STRATEGIES = {
+    "rsi": rsi_strategy,
+    "ma": moving_average_strategy,
+    "sentiment": sentiment_strategy,
+}
+
+
+def positions_from_actions(actions: np.ndarray) -> np.ndarray:
+    """Holding state after each bar: BUY opens, SELL closes, HOLD carries forward"""
+    actions = np.asarray(actions)
+    is_signal = actions != HOLD
+    last_signal = np.where(is_signal, np.arange(len(actions)), -1)
+    np.maximum.accumulate(last_signal, out=last_signal)
+    return np.where(last_signal >= 0, actions[np.maximum(last_signal, 0)] == BUY, False).astype(np.int8)
+
+
+def _first_crossing(prices, start, end, low, high, chunk=1024):
+    """First index in [start, end) with price <= low or >= high
+
+    Scans in doubling chunks so short holding periods stay cheap even when
+    the next SELL signal is far away.
+    """
+    while start < end:
+        stop = min(end, start + chunk)
+        window = prices[start:stop]
+        crossed = (window <= low) | (window >= high)
+        if crossed.any():
+            return start + int(np.argmax(crossed))
+        start, chunk = stop, chunk * 2
+    return None
+
+
+def apply_trading_rules(data: BacktestData, actions: np.ndarray, confidence: Optional[np.ndarray], rules: TradingRules):
+    """Holding state under the risk rules, plus the reason for each forced exit
+
+    Signals under the confidence threshold are dropped, and BUY and SELL
+    signals beyond the daily trade cap are skipped. Stop-loss and take-profit
+    exits fire at the first bar whose price crosses the level, before any
+    later SELL signal; they are never capped but count toward the cap. This walks trade by trade, not
+    bar by bar, and each holding period is scanned with array operations.
+    """
+    actions = np.array(actions, copy=True)
+    if confidence is not None and rules.confidence_threshold:
+        actions[(actions != HOLD) & (np.asarray(confidence) < rules.confidence_threshold)] = HOLD
+
+    stop_loss = rules.stop_loss_percentage
+    take_profit = rules.take_profit_percentage
+    max_trades = rules.max_trades_per_day
+    if not stop_loss and not take_profit and not max_trades:
+        return positions_from_actions(actions), {}
+
+    prices = np.asarray(data.prices, dtype=float)
+    n = len(prices)
+    days = data.timestamps.astype("datetime64[D]")
+    buys = np.flatnonzero(actions == BUY)
+    sells = np.flatnonzero(actions == SELL)
+    positions = np.zeros(n, dtype=np.int8)
+    exit_reasons = {}
+    trades_per_day = {}
+
+    bar = 0
+    while True:
+        k = np.searchsorted(buys, bar)
+        if k == len(buys):
+            break
+        entry = int(buys[k])
+        day = days[entry]
+        if max_trades and trades_per_day.get(day, 0) >= max_trades:
+            bar = int(np.searchsorted(days, day + np.timedelta64(1, "D")))
+            continue
+        trades_per_day[day] = trades_per_day.get(day, 0) + 1
+
+        j = np.searchsorted(sells, entry + 1)
+        signal_exit = int(sells[j]) if j < len(sells) else n
+        while max_trades and signal_exit < n and trades_per_day.get(days[signal_exit], 0) >= max_trades:
+            # Over-cap SELLs are HOLDs: the next candidate is the first SELL of the following day
+            next_day = int(np.searchsorted(days, days[signal_exit] + np.timedelta64(1, "D")))
+            j = np.searchsorted(sells, next_day)
+            signal_exit = int(sells[j]) if j < len(sells) else n
+        exit_bar, reason = signal_exit, "signal"
+        low = prices[entry] * (1 - stop_loss / 100) if stop_loss else -np.inf
+        high = prices[entry] * (1 + take_profit / 100) if take_profit else np.inf
+        hit = _first_crossing(prices, entry + 1, signal_exit, low, high)
+        if hit is not None:
+            exit_bar, reason = hit, ("stop_loss" if prices[hit] <= low else "take_profit")
+
+        positions[entry:exit_bar] = 1
+        if exit_bar >= n:
+            break
+        exit_reasons[exit_bar] = reason
+        trades_per_day[days[exit_bar]] = trades_per_day.get(days[exit_bar], 0) + 1
+        bar = exit_bar + 1
+
+    return positions, exit_reasons
+
+
+def run_backtest(
+    data: BacktestData,
+    decide: DecisionFunction,
+    initial_value: float = 1000.0,
+    fee_rate: float = 0.0,
+    rules: Optional[TradingRules] = None,
+) -> BacktestResult:
+    """Replay `data` through `decide` and return the equity curve, trades and stats"""
+    prices = np.asarray(data.prices, dtype=float)
+    n = len(prices)
+    if n == 0:
+        raise ValueError("Backtest data is empty")
+
+    decision = decide(data)
+    actions, confidence = decision if isinstance(decision, tuple) else (decision, None)
+    positions, exit_reasons = apply_trading_rules(data, actions, confidence, rules or TradingRules())
+    changes = np.diff(np.concatenate([[0], positions]))
+    entries = np.flatnonzero(changes == 1)
+    exits = np.flatnonzero(changes == -1)
+
+    # Equity grows with the price only while a position is held over a bar
+    growth = np.ones(n)
+    growth[1:] = np.where(positions[:-1] == 1, prices[1:] / prices[:-1], 1.0)
+    if fee_rate:
+        growth[entries] *= 1.0 - fee_rate
+        growth[exits] *= 1.0 - fee_rate
+    equity = initial_value * np.cumprod(growth)
+
+    # Pair each entry with its exit; a final open position is reported unrealized
+    exit_idx = np.full(len(entries), -1)
+    exit_idx[:len(exits)] = exits
+    entry_value = equity[entries] / (1.0 - fee_rate) if fee_rate else equity[entries]
+    amounts = entry_value * (1.0 - fee_rate) / prices[entries]
+    closed = exit_idx >= 0
+    exit_prices = np.where(closed, prices[exit_idx], prices[-1])
+    profit_loss = amounts * (exit_prices - prices[entries])
+
+    trades = [
+        {
+            "entry_time": str(data.timestamps[e]),
+            "entry_price": float(prices[e]),
+            "exit_time": str(data.timestamps[x]) if x >= 0 else None,
+            "exit_price": float(prices[x]) if x >= 0 else None,
+            "amount": float(a),
+            "profit_loss": float(p),
+            "closed": bool(x >= 0),
+            "exit_reason": exit_reasons.get(x, "signal") if x >= 0 else None,
+        }
+        for e, x, a, p in zip(entries.tolist(), exit_idx.tolist(), amounts, profit_loss)
+    ]
+    stats = summarize(data, initial_value, equity, positions, profit_loss, closed)
+    return BacktestResult(data.timestamps, equity, positions, trades, stats)
+
+
+def summarize(data, initial_value, equity, positions, profit_loss, closed) -> Dict[str, float]:
+    """Summary statistics of a backtest run"""
+    running_max = np.maximum.accumulate(np.concatenate([[initial_value], equity]))[1:]
+    drawdown = (equity - running_max) / running_max
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+
+    sharpe = 0.0
+    if len(returns) > 1 and returns.std() > 0 and len(data.timestamps) > 1:
+        bar_seconds = float(np.median(np.diff(data.timestamps).astype("timedelta64[s]").astype(float)))
+        bars_per_year = SECONDS_PER_YEAR / bar_seconds if bar_seconds > 0 else 0.0
+        sharpe = float(returns.mean() / returns.std() * np.sqrt(bars_per_year))
+
+    closed_pl = profit_loss[closed]
+    return {
+        "bars": int(len(equity)),
+        "initial_value": float(initial_value),
+        "final_value": float(equity[-1]),
+        "total_return_pct": float((equity[-1] / initial_value - 1.0) * 100),
+        "buy_and_hold_return_pct": float((data.prices[-1] / data.prices[0] - 1.0) * 100),
+        "max_drawdown_pct": float(drawdown.min() * 100),
+        "sharpe_ratio": sharpe,
+        "exposure_pct": float(positions.mean() * 100),
+        "total_trades": int(len(profit_loss)),
+        "closed_trades": int(closed.sum()),
+        "win_rate_pct": float((closed_pl > 0).mean() * 100) if len(closed_pl) else 0.0,
+        "realized_profit_loss": float(closed_pl.sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest a strategy over a historical price CSV")
+    parser.add_argument("csv", help="CSV with timestamp,price[,volume,rsi,sentiment] columns")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="rsi")
+    parser.add_argument("--initial-value", type=float, default=1000.0)
+    parser.add_argument("--fee-rate", type=float, default=0.0)
+    parser.add_argument("--stop-loss", type=float, help="stop-loss percentage")
+    parser.add_argument("--take-profit", type=float, help="take-profit percentage")
+    parser.add_argument("--max-trades-per-day", type=int)
+    args = parser.parse_args()
+
+    data = load_csv(args.csv)
+    rules = TradingRules(
+        stop_loss_percentage=args.stop_loss,
+        take_profit_percentage=args.take_profit,
+        max_trades_per_day=args.max_trades_per_day,
+    )
+    result = run_backtest(data, STRATEGIES[args.strategy](), args.initial_value, args.fee_rate, rules)
+    print(json.dumps(result.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Offline load test: dashboard traffic against the app, in-process
+
+Runs server.app in this process through httpx's ASGI transport, with every
+upstream replaced by a local stand-in:
+
+    CoinGecko, CoinDesk RSS, LLM   benchmarks/stubs.py, with per-upstream
+                                   latency, jitter and error rate
+    MongoDB                        the in-memory stand-in (memory://), or a
+                                   local mongod with --mongo-url
+
+Each virtual user behaves like an open dashboard. It fetches everything
+fetchAllData() in App.js fetches, concurrently, then thinks for
+--think-ms; with --trigger-probability it also presses "trigger trade"
+(the full LLM pipeline). The report gives throughput and p50/p95/p99 per
+endpoint.
+
+--output saves the report as JSON. --baseline compares against a saved
+report; the exit code is 1 if any endpoint's p95/p99 grew, or its
+throughput fell, by more than --tolerance.
+
+Usage (from backend/):
+    python -m benchmarks.load --users 20 --duration 30 --output baseline.json
+    python -m benchmarks.load --users 20 --duration 30 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from benchmarks.stubs import StubBehavior, UpstreamStubs
+
+# One refresh of the React dashboard (fetchAllData in frontend/src/App.js)
+DASHBOARD_REQUESTS = [
+    ("GET", "/api/trade/live"),
+    ("GET", "/api/trade/history?limit=20"),
+    ("GET", "/api/metrics"),
+    ("GET", "/api/market/data"),
+    ("GET", "/api/portfolio"),
+    ("GET", "/api/trade/auto/status"),
+    ("GET", "/api/trades/chart-data?timeframe=24h"),
+    ("GET", "/api/settings"),
+]
+TRIGGER_REQUEST = ("POST", "/api/trade/trigger")
+COMPARED_LATENCIES = ("p95_ms", "p99_ms")
+# Upstream call budgets for the stubs (set in the environment to measure the limiter itself)
+STUB_RATE_LIMITS = {
+    "COINGECKO_RATE_PER_MINUTE": "6000",
+    "COINGECKO_BURST": "100",
+    "COINDESK_RATE_PER_MINUTE": "6000",
+    "COINDESK_BURST": "100",
+}
+
+
+def endpoint_name(method: str, url: str) -> str:
+    return f"{method} {url.split('?', 1)[0]}"
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """q-th percentile (0-100) with linear interpolation between closest ranks"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, Dict]:
+    """Per-endpoint count, errors, throughput and latency percentiles (ms), plus a total"""
+    report = {}
+    everything = []
+    for name in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(name, []))
+        everything.extend(values)
+        report[name] = _stats(values, errors.get(name, 0), elapsed)
+    report["TOTAL"] = _stats(sorted(everything), sum(errors.values()), elapsed)
+    return report
+
+
+def _stats(values: List[float], errors: int, elapsed: float) -> Dict:
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float = 0.2,
+            min_delta_ms: float = 1.0) -> List[Dict]:
+    """Endpoints whose tail latency grew, or throughput fell, by more than `tolerance`
+
+    Latency changes smaller than `min_delta_ms` are ignored, so sub-millisecond
+    endpoints don't flap.
+    """
+    regressions = []
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in COMPARED_LATENCIES:
+            before, after = base[metric], stats[metric]
+            if after - before > min_delta_ms and after > before * (1 + tolerance):
+                regressions.append({"endpoint": name, "metric": metric, "baseline": before, "current": after})
+        before, after = base["throughput_rps"], stats["throughput_rps"]
+        if before and after < before * (1 - tolerance):
+            regressions.append({"endpoint": name, "metric": "throughput_rps", "baseline": before, "current": after})
+    return regressions
+
+
+def synthetic_trades(server, count: int, seed: int = 0) -> List[Dict]:
+    """Full trade documents spread over the last week, as the pipeline writes them"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        server.TradeResult(
+            timestamp=now - timedelta(minutes=5 * i),
+            symbol="BTC",
+            price=42000 + rng.uniform(-1500, 1500),
+            decision=rng.choice(["BUY", "SELL", "HOLD", "HOLD"]),
+            confidence=rng.uniform(0.5, 0.95),
+            reasoning="Signals are balanced; following the short-term trend.",
+            evidence=["Bitcoin steadies as traders weigh rate outlook", "Crypto funds see fourth week of inflows"],
+            profit_loss=rng.uniform(-40, 40),
+            chain_of_thought={"market_analysis": "Flat", "risk_assessment": "Moderate", "reasoning_steps": ["a", "b"]},
+            news_sentiment="Neutral",
+            twitter_sentiment="Neutral",
+        ).dict()
+        for i in range(count)
+    ]
+
+
+class LoadRecorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client, method: str, url: str, recording: bool = True):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url)
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if recording:
+            name = endpoint_name(method, url)
+            self.latencies[name].append(elapsed_ms)
+            if not ok:
+                self.errors[name] += 1
+
+
+async def virtual_user(client, recorder: LoadRecorder, rng: random.Random, deadline: float,
+                       think_ms: float, trigger_probability: float):
+    await asyncio.sleep(rng.uniform(0, think_ms) / 1000)  # users don't all refresh in lockstep
+    while time.perf_counter() < deadline:
+        requests = list(DASHBOARD_REQUESTS)
+        if trigger_probability and rng.random() < trigger_probability:
+            requests.append(TRIGGER_REQUEST)
+        await asyncio.gather(*(recorder.request(client, method, url) for method, url in requests))
+        await asyncio.sleep(think_ms / 1000)
+
+
+async def run_load(users: int = 10, duration: float = 20.0, think_ms: float = 1000.0,
+                   trigger_probability: float = 0.05, seed_trades: int = 500, warmup: int = 2,
+                   seed: int = 0) -> Dict:
+    import httpx
+    import server  # configured by the environment set in main()
+
+    await server.app.router.startup()
+    try:
+        await server.trade_store.insert_many(synthetic_trades(server, seed_trades, seed))
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            warm = LoadRecorder()
+            for _ in range(warmup):
+                await asyncio.gather(*(warm.request(client, method, url, recording=False)
+                                       for method, url in DASHBOARD_REQUESTS + [TRIGGER_REQUEST]))
+
+            recorder = LoadRecorder()
+            rngs = [random.Random(seed * 1000 + i) for i in range(users)]
+            started = time.perf_counter()
+            deadline = started + duration
+            await asyncio.gather(*(
+                virtual_user(client, recorder, rng, deadline, think_ms, trigger_probability) for rng in rngs
+            ))
+            elapsed = time.perf_counter() - started
+    finally:
+        await server.app.router.shutdown()
+    return summarize(recorder.latencies, recorder.errors, elapsed)
+
+
+def print_report(report: Dict[str, Dict], regressions: Optional[List[Dict]] = None):
+    print(f"{'endpoint':40} {'reqs':>6} {'errs':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, stats in report.items():
+        print(f"{name:40} {stats['requests']:6d} {stats['errors']:5d} {stats['throughput_rps']:8.2f} "
+              f"{stats['p50_ms']:8.1f}ms {stats['p95_ms']:8.1f}ms {stats['p99_ms']:8.1f}ms")
+    for regression in regressions or []:
+        print(f"REGRESSION {regression['endpoint']} {regression['metric']}: "
+              f"{regression['baseline']} -> {regression['current']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline dashboard load test with local upstream stubs")
+    parser.add_argument("--users", type=int, default=10, help="concurrent dashboards")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of measured load")
+    parser.add_argument("--think-ms", type=float, default=1000.0, help="pause between a user's refreshes")
+    parser.add_argument("--trigger-probability", type=float, default=0.05,
+                        help="chance a refresh also triggers the LLM trade pipeline")
+    parser.add_argument("--seed-trades", type=int, default=500, help="trades stored before the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=80.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=40.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=400.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--mongo-url", default="memory://", help="memory:// (optionally ?latency_ms=N) or a mongod URL")
+    parser.add_argument("--output", help="save the report as JSON")
+    parser.add_argument("--baseline", help="compare with a saved report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    upstream = StubBehavior(args.upstream_latency_ms, args.upstream_jitter_ms, args.upstream_error_rate)
+    stubs = UpstreamStubs(prices=upstream, news=upstream,
+                          llm=StubBehavior(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate),
+                          seed=args.seed).start()
+    os.environ.update(stubs.env())
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = f"loadtest_{uuid.uuid4().hex[:8]}"  # fresh database, dropped afterwards
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["SHARED_STATE_BACKEND"] = "memory"
+    # The stubs have no quota; keep the server's rate limiters out of the measured latencies
+    for key, value in STUB_RATE_LIMITS.items():
+        os.environ.setdefault(key, value)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    try:
+        report = asyncio.run(run_load(args.users, args.duration, args.think_ms, args.trigger_probability,
+                                      args.seed_trades, seed=args.seed))
+    finally:
+        stubs.stop()
+        if not args.mongo_url.startswith("memory://"):
+            from pymongo import MongoClient
+            MongoClient(args.mongo_url).drop_database(os.environ["DB_NAME"])
+
+    regressions = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("warning: baseline was recorded with a different configuration", file=sys.stderr)
+        regressions = compare(report, baseline["endpoints"], args.tolerance)
+    print_report(report, regressions)
+    print(f"upstream stubs: {dict(stubs.stats)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": config, "recorded_at": datetime.utcnow().isoformat(), "endpoints": report}, f, indent=2)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+"""In-process stand-in for the subset of Motor this app uses
+
+Selected with MONGO_URL=memory:// (optionally memory://?latency_ms=2), so the
+load-test suite runs with no mongod. It covers the operations the server,
+trade store, shared state, leader lease and retention job use:
+
+- find (with projection, sort, skip and limit), find_one and
+  find_one_and_update;
+- insert_one/many, update_one/many, replace_one, delete_one/many and
+  bulk_write;
+- the update operators $set, $unset, $inc, $min, $max, $setOnInsert and
+  $push (with $each and $slice);
+- the query operators $eq, $ne, $gt(e), $lt(e), $in, $nin, $exists, $or,
+  $and and $nor, on dotted paths.
+
+Only `_id` is unique; other indexes are accepted and ignored. Documents are
+deep-copied in and out, like a real round trip. Each operation yields to
+the event loop, or sleeps `latency_ms`, so concurrency looks like real I/O.
+It is meant for measuring the app, not Mongo: query costs are not modelled.
+"""
+import asyncio
+import copy
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import bson
+from bson import ObjectId
+from pymongo import InsertOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY = 11000
+_MISSING = object()
+
+
+def get_path(doc: Dict[str, Any], path: str):
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def set_path(doc: Dict[str, Any], path: str, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+
+def unset_path(doc: Dict[str, Any], path: str):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(last, None)
+
+
+def _compare(value, op, arg) -> bool:
+    if value is _MISSING or value is None or arg is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > arg
+        if op == "$gte":
+            return value >= arg
+        if op == "$lt":
+            return value < arg
+        return value <= arg
+    except TypeError:
+        return False
+
+
+def _equals(value, arg) -> bool:
+    if value is _MISSING:
+        return arg is None
+    if isinstance(value, list) and not isinstance(arg, list):
+        return arg in value
+    return value == arg
+
+
+def _match_operator(value, op, arg) -> bool:
+    if op == "$eq":
+        return _equals(value, arg)
+    if op == "$ne":
+        return not _equals(value, arg)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return _compare(value, op, arg)
+    if op == "$in":
+        return any(_equals(value, item) for item in arg)
+    if op == "$nin":
+        return not any(_equals(value, item) for item in arg)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    raise NotImplementedError(f"Query operator {op} is not supported by the in-memory stand-in")
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in condition):
+                return False
+        else:
+            value = get_path(doc, key)
+            if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+                if not all(_match_operator(value, op, arg) for op, arg in condition.items()):
+                    return False
+            elif not _equals(value, condition):
+                return False
+    return True
+
+
+def project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return doc
+    include_id = projection.get("_id", 1)
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(fields.values()):
+        result = {key: doc[key] for key in fields if key in doc}
+        if include_id and "_id" in doc:
+            result = {"_id": doc["_id"], **result}
+        return result
+    result = {key: value for key, value in doc.items() if key not in fields}
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+
+def apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool = False):
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            current = get_path(doc, path)
+            if op in ("$set", "$setOnInsert"):
+                set_path(doc, path, copy.deepcopy(value))
+            elif op == "$unset":
+                unset_path(doc, path)
+            elif op == "$inc":
+                set_path(doc, path, (0 if current is _MISSING else current) + value)
+            elif op == "$min":
+                if current is _MISSING or value < current:
+                    set_path(doc, path, value)
+            elif op == "$max":
+                if current is _MISSING or value > current:
+                    set_path(doc, path, value)
+            elif op == "$push":
+                items = list(current) if current is not _MISSING else []
+                if isinstance(value, dict) and "$each" in value:
+                    items.extend(copy.deepcopy(value["$each"]))
+                    if "$slice" in value:
+                        n = value["$slice"]
+                        items = items[n:] if n < 0 else items[:n]
+                else:
+                    items.append(copy.deepcopy(value))
+                set_path(doc, path, items)
+            else:
+                raise NotImplementedError(f"Update operator {op} is not supported by the in-memory stand-in")
+
+
+def upsert_seed(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Equality fields of a query, which an upsert copies into the new document"""
+    seed = {}
+    for key, condition in query.items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            if "$eq" in condition:
+                set_path(seed, key, copy.deepcopy(condition["$eq"]))
+            continue
+        set_path(seed, key, copy.deepcopy(condition))
+    return seed
+
+
+def _sort_key(value):
+    # Missing and null sort first, as in Mongo
+    return (0, 0) if value is _MISSING or value is None else (1, value)
+
+
+class UpdateResult:
+    def __init__(self, matched_count=0, modified_count=0, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    def __init__(self, deleted_count=0):
+        self.deleted_count = deleted_count
+
+
+class InsertResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+        self.inserted_id = inserted_ids[0] if inserted_ids else None
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query, projection):
+        self.collection = collection
+        self.query = query
+        self.projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction if direction is not None else 1)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def _results(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = [doc for doc in self.collection._docs.values() if matches(doc, self.query)]
+        for key, direction in reversed(self._sort):
+            docs.sort(key=lambda doc: _sort_key(get_path(doc, key)), reverse=direction < 0)
+        docs = docs[self._skip:]
+        limit = min(n for n in (self._limit, length) if n) if (self._limit or length) else None
+        if limit is not None:
+            docs = docs[:limit]
+        return [project(copy.deepcopy(doc), self.projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        await self.collection.database.client.round_trip()
+        return self._results(length)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self.to_list(None):
+            yield doc
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self.indexes: List[Any] = []
+
+    async def _io(self):
+        await self.database.client.round_trip()
+
+    def _insert(self, doc: Dict[str, Any]):
+        if "_id" not in doc:
+            doc["_id"] = ObjectId()  # like pymongo, the caller's document gets the _id
+        if doc["_id"] in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} _id: {doc['_id']!r}",
+                                    DUPLICATE_KEY)
+        self._docs[doc["_id"]] = copy.deepcopy(doc)
+        return doc["_id"]
+
+    def _find_first(self, query) -> Optional[Dict[str, Any]]:
+        if set(query) == {"_id"} and not isinstance(query["_id"], dict):
+            return self._docs.get(query["_id"])
+        return next((doc for doc in self._docs.values() if matches(doc, query)), None)
+
+    def _update(self, query, update, upsert=False, many=False) -> UpdateResult:
+        targets = [doc for doc in self._docs.values() if matches(doc, query)]
+        if not many:
+            targets = targets[:1]
+        for doc in targets:
+            apply_update(doc, update)
+        if targets or not upsert:
+            return UpdateResult(len(targets), len(targets))
+        doc = upsert_seed(query)
+        apply_update(doc, update, inserting=True)
+        return UpdateResult(upserted_id=self._insert(doc))
+
+    def find(self, query=None, projection=None) -> MemoryCursor:
+        return MemoryCursor(self, query or {}, projection)
+
+    async def find_one(self, query=None, projection=None):
+        await self._io()
+        doc = self._find_first(query or {})
+        return project(copy.deepcopy(doc), projection) if doc is not None else None
+
+    async def count_documents(self, query) -> int:
+        await self._io()
+        return sum(1 for doc in self._docs.values() if matches(doc, query))
+
+    async def insert_one(self, doc):
+        await self._io()
+        return InsertResult([self._insert(doc)])
+
+    async def insert_many(self, docs: Iterable[Dict[str, Any]], ordered: bool = True):
+        await self._io()
+        inserted, errors = [], []
+        for index, doc in enumerate(docs):
+            try:
+                inserted.append(self._insert(doc))
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return InsertResult(inserted)
+
+    async def update_one(self, query, update, upsert=False):
+        await self._io()
+        return self._update(query, update, upsert)
+
+    async def update_many(self, query, update, upsert=False):
+        await self._io()
+        return self._update(query, update, upsert, many=True)
+
+    async def replace_one(self, query, replacement, upsert=False):
+        await self._io()
+        doc = self._find_first(query)
+        if doc is None:
+            if not upsert:
+                return UpdateResult()
+            new = {**upsert_seed(query), **copy.deepcopy(replacement)}
+            return UpdateResult(upserted_id=self._insert(new))
+        new = {**copy.deepcopy(replacement), "_id": doc["_id"]}
+        self._docs[doc["_id"]] = new
+        return UpdateResult(1, 1)
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=ReturnDocument.BEFORE,
+                                  projection=None):
+        await self._io()
+        doc = self._find_first(query)
+        if doc is None:
+            if not upsert:
+                return None
+            new = upsert_seed(query)
+            apply_update(new, update, inserting=True)
+            self._insert(new)
+            return project(copy.deepcopy(new), projection) if return_document == ReturnDocument.AFTER else None
+        before = copy.deepcopy(doc)
+        apply_update(doc, update)
+        result = copy.deepcopy(doc) if return_document == ReturnDocument.AFTER else before
+        return project(result, projection)
+
+    async def delete_one(self, query):
+        await self._io()
+        doc = self._find_first(query)
+        if doc is None:
+            return DeleteResult()
+        del self._docs[doc["_id"]]
+        return DeleteResult(1)
+
+    async def delete_many(self, query):
+        await self._io()
+        ids = [doc_id for doc_id, doc in self._docs.items() if matches(doc, query)]
+        for doc_id in ids:
+            del self._docs[doc_id]
+        return DeleteResult(len(ids))
+
+    async def bulk_write(self, requests, ordered: bool = True):
+        await self._io()
+        errors = []
+        for index, request in enumerate(requests):
+            spec = request._doc if isinstance(request, InsertOne) else None
+            try:
+                if spec is not None:
+                    self._insert(spec)
+                elif isinstance(request, (UpdateOne, UpdateMany)):
+                    self._update(request._filter, request._doc, request._upsert, many=isinstance(request, UpdateMany))
+                else:
+                    raise NotImplementedError(f"{type(request).__name__} is not supported by the in-memory stand-in")
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def create_index(self, keys, **kwargs):
+        self.indexes.append((keys, kwargs))
+        return keys if isinstance(keys, str) else "_".join(f"{k}_{d}" for k, d in keys)
+
+    def storage_size(self) -> int:
+        return sum(len(bson.encode(doc)) for doc in self._docs.values())
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryMongoClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, name: str, value=None, **kwargs):
+        await self.client.round_trip()
+        if name == "collStats":
+            collection = self[value]
+            size = collection.storage_size()
+            return {"ok": 1, "count": len(collection._docs), "size": size, "storageSize": size}
+        if name in ("collMod", "ping"):
+            return {"ok": 1}
+        raise NotImplementedError(f"Command {name} is not supported by the in-memory stand-in")
+
+
+class MemoryMongoClient:
+    def __init__(self, url: str = "memory://", latency_ms: Optional[float] = None):
+        if latency_ms is None:
+            latency_ms = float(parse_qs(urlparse(url).query).get("latency_ms", ["0"])[0])
+        self.latency = latency_ms / 1000.0
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    async def round_trip(self):
+        await asyncio.sleep(self.latency)
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self, name)
+        return self._databases[name]
+
+    def close(self):
+        pass
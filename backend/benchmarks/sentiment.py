@@ -0,0 +1,96 @@
+"""Sentiment backend throughput and label agreement: lexicon vs TextBlob
+
+Scores the same synthetic crypto headlines with both backends and reports
+headlines per second, and how often the two agree on the headline's label
+(Positive / Negative / Neutral, each backend with its own neutral band).
+The exit code is 1 if the share of disagreeing labels exceeds --tolerance.
+
+Usage (from backend/):
+    python -m benchmarks.sentiment --count 100000
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+from sentiment import LexiconBackend, TextBlobBackend
+
+SUBJECTS = [
+    "Bitcoin", "Ether", "Solana", "Crypto markets", "Stablecoin issuers", "Exchange volumes", "Miners",
+    "Institutional desks", "DeFi protocols", "Altcoins", "Crypto funds", "Bitcoin ETF flows",
+]
+POSITIVE = [
+    "post strong gains", "see a great week", "rally to the best month since 2021", "show positive momentum",
+    "deliver excellent returns", "look good for buyers", "enjoy better liquidity", "report successful upgrade",
+    "surge as ETF approval nears",  # crypto vocabulary TextBlob has no polarity for
+]
+NEGATIVE = [
+    "suffer terrible losses", "post the worst week of the year", "face bad news from regulators",
+    "show weak demand", "see poor liquidity", "turn negative after hack", "look worse after selloff",
+    "suffer a sad collapse", "plunge after exchange exploit",
+]
+NEUTRAL = [
+    "trade sideways", "publish quarterly report", "hold annual meeting", "wait for rate decision",
+    "track the index", "move with equities", "open new office", "list two tokens",
+]
+QUALIFIERS = [
+    "", "", "", " as traders weigh rate outlook", " ahead of jobs data", " this week", " in Asian hours",
+    " after network update", " on Tuesday",
+]
+
+
+def synthetic_headlines(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    predicates = POSITIVE + NEGATIVE + NEUTRAL
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(predicates)}{rng.choice(QUALIFIERS)}" for _ in range(count)]
+
+
+def throughput(backend, headlines: List[str], batch_size: int):
+    started = time.perf_counter()
+    scores = []
+    for i in range(0, len(headlines), batch_size):
+        scores.extend(backend.score_batch(headlines[i:i + batch_size]))
+    elapsed = time.perf_counter() - started
+    return [backend.label(score) for score in scores], elapsed
+
+
+def run(count: int = 100_000, batch_size: int = 1000, seed: int = 0) -> Dict:
+    headlines = synthetic_headlines(count, seed)
+    results = {}
+    labels = {}
+    for backend in (LexiconBackend(), TextBlobBackend()):
+        backend.score_batch(headlines[:10])  # warm up (TextBlob loads its lexicon on first use)
+        labels[backend.name], elapsed = throughput(backend, headlines, batch_size)
+        results[backend.name] = {
+            "seconds": round(elapsed, 3),
+            "headlines_per_second": round(count / elapsed) if elapsed else None,
+            "labels": dict(Counter(labels[backend.name])),
+        }
+    agree = sum(a == b for a, b in zip(labels["lexicon"], labels["textblob"]))
+    results["agreement"] = round(agree / count, 4) if count else 1.0
+    results["speedup"] = round(results["textblob"]["seconds"] / results["lexicon"]["seconds"], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentiment backend throughput and label agreement")
+    parser.add_argument("--count", type=int, default=100_000, help="headlines to score")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed share of disagreeing labels")
+    args = parser.parse_args()
+
+    results = run(args.count, args.batch_size, args.seed)
+    for name in ("lexicon", "textblob"):
+        stats = results[name]
+        print(f"{name:9} {stats['seconds']:8.3f} s  {stats['headlines_per_second']:>10,} headlines/s  {stats['labels']}")
+    print(f"speedup {results['speedup']}x, label agreement {results['agreement']:.2%}")
+    if 1 - results["agreement"] > args.tolerance:
+        print(f"FAIL: labels disagree on more than {args.tolerance:.0%} of headlines", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
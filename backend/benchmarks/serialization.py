@@ -0,0 +1,151 @@
+"""Serialization CPU cost of the list endpoints: validated vs fast path
+
+Builds the documents `/trade/history?limit=1000` and `/trades/chart-data`
+read from Mongo and times only the response-building work, with no I/O:
+
+    default  Model(**doc) validation -> jsonable_encoder -> json.dumps (FastAPI's JSONResponse)
+    fast     Model.model_construct(**doc) -> orjson (FastJSONResponse)
+
+Usage (from backend/, with MONGO_URL and DB_NAME set; nothing connects):
+    python -m benchmarks.serialization --repeat 20
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+from fast_json import FastJSONResponse, construct_many
+from server import ChartData, ChartDataPoint, PortfolioSnapshot, TradeMarker, TradeSummary
+
+
+def trade_docs(count, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": str(uuid.uuid4()),
+            "id": str(uuid.uuid4()),
+            "timestamp": start + timedelta(minutes=5 * i),
+            "symbol": "BTC",
+            "price": 40000 + rng.uniform(-2000, 2000),
+            "decision": rng.choice(["BUY", "SELL", "HOLD"]),
+            "confidence": rng.random(),
+            "is_valid": True,
+            "profit_loss": rng.uniform(-50, 50),
+            "news_sentiment": "Neutral",
+            "twitter_sentiment": "Positive",
+            "prompt_tokens": {"decision": 640, "verification": 410},
+            "risk_blocked": None,
+            "evidence_count": 5,
+            "has_detail": True,
+        }
+        for i in range(count)
+    ]
+
+
+def chart_parts(points=100, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    price_history = [
+        ChartDataPoint(timestamp=start + timedelta(minutes=i), price=40000 + i, volume=rng.random(), rsi=50.0)
+        for i in range(points)
+    ]
+    portfolio = [
+        PortfolioSnapshot(timestamp=start + timedelta(minutes=i), total_value=1000 + i, usd_balance=500,
+                          btc_amount=0.01, btc_value=500 + i, asset_amounts={"BTC": 0.01}, asset_values={"BTC": 500 + i})
+        for i in range(points)
+    ]
+    sentiment = [
+        {"timestamp": start + timedelta(minutes=i), "news_sentiment": "Neutral", "twitter_sentiment": "Positive",
+         "news_items": ["Bitcoin steady as markets wait for data"] * 3, "tweets": []}
+        for i in range(points // 2)
+    ]
+    return price_history, portfolio, sentiment
+
+
+def marker_kwargs(trade):
+    return dict(
+        timestamp=trade["timestamp"], symbol=trade["symbol"], price=trade["price"], decision=trade["decision"],
+        confidence=trade["confidence"], profit_loss=trade.get("profit_loss", 0.0),
+        news_sentiment=trade.get("news_sentiment"), twitter_sentiment=trade.get("twitter_sentiment"),
+    )
+
+
+def default_render(content) -> bytes:
+    """What FastAPI does for a returned model without a response class"""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def history_default(docs):
+    return default_render([TradeSummary(**doc) for doc in docs])
+
+
+def history_fast(docs):
+    return FastJSONResponse(construct_many(TradeSummary, docs)).body
+
+
+def chart_default(docs, parts):
+    price_history, portfolio, sentiment = parts
+    markers = [TradeMarker(**marker_kwargs(t)) for t in docs]
+    return default_render(ChartData(price_history=price_history, trade_markers=markers, portfolio_history=portfolio,
+                                    sentiment_timeline=sentiment, timeframe="24h", symbol="BTC"))
+
+
+def chart_fast(docs, parts):
+    price_history, portfolio, sentiment = parts
+    markers = [TradeMarker.model_construct(**marker_kwargs(t)) for t in docs]
+    return FastJSONResponse(ChartData.model_construct(
+        price_history=price_history, trade_markers=markers, portfolio_history=portfolio,
+        sentiment_timeline=sentiment, timeframe="24h", symbol="BTC",
+    )).body
+
+
+def cpu_ms(fn, repeat):
+    fn()  # warm up
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000
+
+
+def run(repeat=20):
+    history = trade_docs(1000)
+    chart_trades = trade_docs(50, seed=1)
+    parts = chart_parts()
+
+    # Same JSON either way (timestamps of the chart are generated per call, so compare history only)
+    assert json.loads(history_default(history)) == json.loads(history_fast(history))
+
+    cases = {
+        "/trade/history?limit=1000": (lambda: history_default(history), lambda: history_fast(history)),
+        "/trades/chart-data": (lambda: chart_default(chart_trades, parts), lambda: chart_fast(chart_trades, parts)),
+    }
+    results = {}
+    for name, (default, fast) in cases.items():
+        default_ms, fast_ms = cpu_ms(default, repeat), cpu_ms(fast, repeat)
+        results[name] = {
+            "default_cpu_ms": round(default_ms, 3),
+            "fast_cpu_ms": round(fast_ms, 3),
+            "saved_pct": round((1 - fast_ms / default_ms) * 100, 1) if default_ms else 0.0,
+            "speedup": round(default_ms / fast_ms, 1) if fast_ms else None,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization CPU time of the list endpoints")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for name, stats in run(args.repeat).items():
+        print(f"{name:28} default {stats['default_cpu_ms']:8.2f} ms  fast {stats['fast_cpu_ms']:8.2f} ms  "
+              f"saved {stats['saved_pct']:5.1f}%  ({stats['speedup']}x)")
+
+
+if __name__ == "__main__":
+    main()
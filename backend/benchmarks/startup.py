@@ -0,0 +1,119 @@
+"""Cold start: time from process start to the first successful /api/ response
+
+Starts uvicorn with server:app in a fresh process, polls GET /api/ until it
+answers 200 and reports the wall time from spawning the process. Also
+reports the worker's own import-time breakdown from /api/startup/imports.
+
+    lazy   the server as it is: heavy optional modules are deferred
+    eager  same server, but the deferred modules are imported first, as
+           server.py did before they were made lazy
+
+Startup loads settings from Mongo, so MONGO_URL must point at a reachable
+server; otherwise each run waits out the driver's server selection timeout.
+
+Usage (from backend/, with MONGO_URL and DB_NAME set):
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFERRED_MODULES = ("emergentintegrations.llm.chat", "tweepy", "feedparser", "bs4", "textblob")
+
+SERVE = "import uvicorn; uvicorn.run('server:app', host='127.0.0.1', port={port}, log_level='warning')"
+EAGER = (
+    "import importlib\n"
+    "for name in {modules!r}:\n"
+    "    try:\n"
+    "        importlib.import_module(name)\n"
+    "    except ImportError:\n"
+    "        pass\n"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url, timeout=1.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def measure(mode="lazy", timeout=60.0):
+    """Milliseconds from spawning the server to its first 200 on /api/, and its import breakdown"""
+    port = free_port()
+    code = SERVE.format(port=port)
+    if mode == "eager":
+        code = EAGER.format(modules=DEFERRED_MODULES) + code
+    env = {**os.environ, "LAZY_IMPORT_PRELOAD": "false"}
+
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"no response from /api/ within {timeout}s")
+            try:
+                status, _ = get(f"http://127.0.0.1:{port}/api/")
+                if status == 200:
+                    break
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(0.01)
+        first_response_ms = (time.perf_counter() - started) * 1000
+        _, body = get(f"http://127.0.0.1:{port}/api/startup/imports")
+        return first_response_ms, json.loads(body)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def run(runs=5, modes=("eager", "lazy")):
+    results = {}
+    for mode in modes:
+        timings, breakdown = [], None
+        for _ in range(runs):
+            ms, breakdown = measure(mode)
+            timings.append(ms)
+        results[mode] = {
+            "first_response_ms_median": round(statistics.median(timings), 1),
+            "first_response_ms_min": round(min(timings), 1),
+            "eager_import_ms": breakdown.get("eager_import_ms"),
+            "eager_by_package_ms": breakdown.get("eager_by_package_ms"),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process start to first /api/ response")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=["eager", "lazy", "both"], default="both")
+    args = parser.parse_args()
+    modes = ("eager", "lazy") if args.mode == "both" else (args.mode,)
+    results = run(args.runs, modes)
+    for mode, stats in results.items():
+        top = ", ".join(f"{name} {ms:.0f}ms" for name, ms in list(stats["eager_by_package_ms"].items())[:5])
+        print(f"{mode:6} first response {stats['first_response_ms_median']:8.1f} ms median "
+              f"({stats['first_response_ms_min']:.1f} min)  server.py imports {stats['eager_import_ms']} ms: {top}")
+    if len(results) == 2:
+        saved = results["eager"]["first_response_ms_median"] - results["lazy"]["first_response_ms_median"]
+        print(f"lazy imports save {saved:.1f} ms to first response")
+
+
+if __name__ == "__main__":
+    main()
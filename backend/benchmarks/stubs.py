@@ -0,0 +1,191 @@
+"""Local stand-ins for the upstream services, for offline load tests
+
+One aiohttp server, on its own thread and event loop so its work doesn't
+land on the app's loop, answers for:
+
+    /coingecko/api/v3/simple/price     CoinGecko simple price (random walk)
+    /coindesk/rss                      CoinDesk RSS feed (rotating headlines)
+    /llm/v1/chat/completions           OpenAI-compatible chat completions that
+                                       answer the decision, verifier and batch
+                                       prompts with valid JSON
+
+Each upstream has its own `StubBehavior`: a fixed latency plus uniform
+jitter, and an error rate. Errors are HTTP 503 responses. Point the server
+at the stubs with COINGECKO_API_URL, COINDESK_RSS_URL and LLM_API_BASE
+(see `UpstreamStubs.env()`).
+"""
+import asyncio
+import json
+import random
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, NamedTuple, Optional
+
+from aiohttp import web
+
+COINGECKO_PRICES = {
+    "bitcoin": 42000.0, "ethereum": 2300.0, "solana": 95.0, "binancecoin": 310.0,
+    "ripple": 0.6, "cardano": 0.55, "dogecoin": 0.08,
+}
+HEADLINES = [
+    "Bitcoin steadies as traders weigh rate outlook",
+    "Ether gains after network upgrade goes live",
+    "Crypto funds see fourth week of inflows",
+    "Regulators publish draft rules for stablecoin issuers",
+    "Miners sell more coins as fees fall",
+    "Exchange volumes slip to monthly low",
+    "Institutional desks report rising options demand",
+    "Solana outage resolved after validator restart",
+]
+
+
+class StubBehavior(NamedTuple):
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+
+def rss_feed(headlines) -> str:
+    items = "".join(f"<item><title>{title}</title><link>https://example.invalid/{i}</link></item>"
+                    for i, title in enumerate(headlines))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Stub</title>{items}</channel></rss>'
+
+
+def decision_payload(rng: random.Random) -> Dict:
+    return {
+        "chain_of_thought": {
+            "market_analysis": "RSI is neutral and volume is flat.",
+            "risk_assessment": "Moderate risk; sentiment is mixed.",
+            "reasoning_steps": ["Check trend", "Weigh sentiment", "Size the position"],
+        },
+        "trading_decision": {
+            "action": rng.choice(["BUY", "SELL", "HOLD", "HOLD"]),
+            "confidence": round(rng.uniform(0.5, 0.95), 2),
+            "reasoning": "Signals are balanced; following the short-term trend.",
+        },
+    }
+
+
+def verification_payload() -> Dict:
+    return {"is_valid": True, "verdict": "Reasoning is consistent with the evidence", "issues": []}
+
+
+def llm_answer(system_message: str, prompt: str, rng: random.Random) -> Dict:
+    """Valid JSON for whichever of the server's prompts this is"""
+    if '"decisions"' in system_message:
+        match = re.search(r"Assets: ([A-Z0-9, ]+)", prompt)
+        symbols = [s.strip() for s in match.group(1).split(",")] if match else ["BTC"]
+        return {"decisions": {symbol: decision_payload(rng) for symbol in symbols}}
+    if '"verifications"' in system_message:
+        symbols = re.findall(r"^\[([A-Z0-9]+)\]", prompt, flags=re.MULTILINE) or ["BTC"]
+        return {"verifications": {symbol: verification_payload() for symbol in symbols}}
+    if "verifier" in system_message:
+        return verification_payload()
+    return decision_payload(rng)
+
+
+class UpstreamStubs:
+    def __init__(self, prices: StubBehavior = StubBehavior(), news: StubBehavior = StubBehavior(),
+                 llm: StubBehavior = StubBehavior(), seed: int = 0):
+        self.behaviors = {"prices": prices, "news": news, "llm": llm}
+        self.rng = random.Random(seed)
+        self.stats = defaultdict(lambda: {"requests": 0, "errors": 0})
+        self.port: Optional[int] = None
+        self._prices = dict(COINGECKO_PRICES)
+        self._headline_offset = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment for the server under test"""
+        return {
+            "COINGECKO_API_URL": f"{self.base_url}/coingecko/api/v3",
+            "COINDESK_RSS_URL": f"{self.base_url}/coindesk/rss",
+            "LLM_API_BASE": f"{self.base_url}/llm/v1",
+        }
+
+    async def _behave(self, name: str) -> bool:
+        """Apply latency; True if this request should fail"""
+        behavior = self.behaviors[name]
+        self.stats[name]["requests"] += 1
+        delay = behavior.latency_ms + (self.rng.uniform(0, behavior.jitter_ms) if behavior.jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        if behavior.error_rate and self.rng.random() < behavior.error_rate:
+            self.stats[name]["errors"] += 1
+            return True
+        return False
+
+    async def price(self, request: web.Request) -> web.Response:
+        if await self._behave("prices"):
+            return web.Response(status=503, text="stub error")
+        result = {}
+        for coin in request.query.get("ids", "").split(","):
+            if coin not in self._prices:
+                continue
+            self._prices[coin] *= 1 + self.rng.gauss(0, 0.002)
+            result[coin] = {
+                "usd": round(self._prices[coin], 6),
+                "usd_24h_change": round(self.rng.uniform(-5, 5), 3),
+                "usd_24h_vol": round(self.rng.uniform(1e6, 1e9), 0),
+            }
+        return web.json_response(result)
+
+    async def rss(self, request: web.Request) -> web.Response:
+        if await self._behave("news"):
+            return web.Response(status=503, text="stub error")
+        self._headline_offset = (self._headline_offset + 1) % len(HEADLINES)
+        headlines = (HEADLINES[self._headline_offset:] + HEADLINES[:self._headline_offset])[:5]
+        return web.Response(text=rss_feed(headlines), content_type="application/rss+xml")
+
+    async def chat(self, request: web.Request) -> web.Response:
+        if await self._behave("llm"):
+            return web.Response(status=503, text="stub error")
+        body = await request.json()
+        messages = {m["role"]: m["content"] for m in body.get("messages", [])}
+        answer = llm_answer(messages.get("system", ""), messages.get("user", ""), self.rng)
+        return web.json_response({
+            "id": "stub", "object": "chat.completion", "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(answer)},
+                         "finish_reason": "stop"}],
+        })
+
+    async def _serve(self):
+        app = web.Application()
+        app.router.add_get("/coingecko/api/v3/simple/price", self.price)
+        app.router.add_get("/coindesk/rss", self.rss)
+        app.router.add_post("/llm/v1/chat/completions", self.chat)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._serve())
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self) -> "UpstreamStubs":
+        self._thread = threading.Thread(target=self._run, name="upstream-stubs", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(10):
+            raise RuntimeError("Upstream stubs did not start")
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._loop.close()
+        self._loop = None
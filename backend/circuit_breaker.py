@@ -0,0 +1,228 @@
+"""Circuit breakers and stale-while-revalidate caching for upstream sources
+
+`CircuitBreaker` tracks the health of one upstream:
+
+    closed      calls go through; `failure_threshold` consecutive failures
+                open the circuit
+    open        calls are refused for `reset_timeout` seconds
+    half_open   one probe call is let through; success closes the circuit,
+                failure opens it again for another `reset_timeout`
+
+`UpstreamSource` puts a breaker and a timeout around a fetch coroutine and
+keeps the last good value per key. While the source is healthy every read
+fetches (or shares a fetch already in flight). When a fetch fails or times
+out, or the circuit is open, the read is answered with the last good value,
+tagged with its age, instead of waiting on the upstream. Once the circuit
+goes half-open, the probe runs in the background and the reader still gets
+the stale value right away. Only a source that has never answered raises
+`SourceUnavailable`.
+
+With a `limiter` (rate_limiter.RateLimiter), every fetch first takes a token
+in the reader's lane. A reader that gets no token in time, or that is in a
+`stale_ok` lane when the bucket is empty, is also answered with the last
+good value (as is one whose lane `reuse_within` covers the age of the last
+good value), and a reader whose wait was ended by someone
+else's fetch gets that fresh value without fetching again.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional
+
+from rate_limiter import LANE_DASHBOARD
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class SourceUnavailable(Exception):
+    """The upstream failed and there is no last good value to serve"""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self._probing or self.clock() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream now; in half-open only one probe is let through"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self.stats["successes"] += 1
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._probing:
+                self.stats["opened"] += 1
+                logging.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+            self.opened_at = self.clock()
+        self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(self.reset_timeout - (self.clock() - self.opened_at), 3)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_seconds": self.reset_timeout,
+            "retry_in_seconds": retry_in,
+            **self.stats,
+        }
+
+
+class Reading(NamedTuple):
+    value: Any
+    fetched_at: datetime  # when the upstream produced this value (UTC)
+    age_seconds: float
+    stale: bool
+
+    @property
+    def source(self) -> str:
+        return "stale" if self.stale else "live"
+
+
+class UpstreamSource:
+    def __init__(self, name: str, fetch: Callable[..., Awaitable[Any]], breaker: Optional[CircuitBreaker] = None,
+                 timeout: float = 5.0, fresh_for: float = 0.0, clock: Callable[[], float] = time.monotonic,
+                 limiter=None):
+        self.name = name
+        self.fetch = fetch
+        self.breaker = breaker or CircuitBreaker(name, clock=clock)
+        self.timeout = timeout
+        self.fresh_for = fresh_for
+        self.clock = clock
+        self.limiter = limiter
+        self._last_good: Dict[Hashable, tuple] = {}  # key -> (value, fetched_at, monotonic time)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"fetches": 0, "fetch_errors": 0, "timeouts": 0, "stale_served": 0,
+                      "background_refreshes": 0, "unavailable": 0, "throttled": 0}
+
+    def _reading(self, key: Hashable, stale: bool) -> Reading:
+        value, fetched_at, at = self._last_good[key]
+        return Reading(value, fetched_at, round(self.clock() - at, 3), stale)
+
+    async def _fetch(self, key: Hashable, args: tuple):
+        self.stats["fetches"] += 1
+        try:
+            value = await asyncio.wait_for(self.fetch(*args), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            self.breaker.record_failure()
+            raise SourceUnavailable(f"{self.name} timed out after {self.timeout}s")
+        except Exception as e:
+            self.stats["fetch_errors"] += 1
+            self.breaker.record_failure()
+            raise SourceUnavailable(f"{self.name} failed: {e}") from e
+        self.breaker.record_success()
+        self._last_good[key] = (value, datetime.utcnow(), self.clock())
+        return value
+
+    def _start_fetch(self, key: Hashable, args: tuple) -> asyncio.Task:
+        task = asyncio.create_task(self._fetch(key, args))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return task
+
+    def _fetch_done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(str(task.exception()))
+
+    def _stale(self, key: Hashable) -> Reading:
+        self.stats["stale_served"] += 1
+        return self._reading(key, stale=True)
+
+    def _stale_or_raise(self, key: Hashable, reason: str) -> Reading:
+        if key in self._last_good:
+            return self._stale(key)
+        self.stats["unavailable"] += 1
+        raise SourceUnavailable(reason)
+
+    def _fetched_since(self, key: Hashable, since: float) -> bool:
+        return key in self._last_good and self._last_good[key][2] >= since
+
+    async def get(self, key: Hashable = None, *args, lane: str = LANE_DASHBOARD) -> Reading:
+        """Latest value for `key`; `args` are passed to the fetch coroutine, `lane` to the limiter"""
+        if key in self._last_good and self.clock() - self._last_good[key][2] < self.fresh_for:
+            return self._reading(key, stale=False)
+
+        task = self._inflight.get(key)
+        if task is None:
+            token = False
+            if self.limiter is not None and self.breaker.state != OPEN:
+                requested = self.clock()
+                settings = self.limiter.lanes[lane]
+                wait = not (key in self._last_good and (
+                    settings.stale_ok or self.clock() - self._last_good[key][2] < settings.reuse_within
+                ))
+                token = await self.limiter.acquire(lane, wait)
+                task = self._inflight.get(key)
+                if token and (task is not None or self._fetched_since(key, requested)):
+                    self.limiter.refund()  # someone else fetched while we waited
+                    token = False
+                if self._fetched_since(key, requested):
+                    return self._reading(key, stale=False)
+                if task is None and not token:
+                    self.stats["throttled"] += 1
+                    return self._stale_or_raise(key, f"{self.name} rate limit reached")
+        if task is None:
+            if not self.breaker.allow():
+                if token:
+                    self.limiter.refund()
+                return self._stale_or_raise(key, f"{self.name} circuit is open")
+            recovering = self.breaker.state == HALF_OPEN
+            task = self._start_fetch(key, args)
+            if recovering and key in self._last_good:
+                # Revalidate in the background; this reader gets the last good value now
+                self.stats["background_refreshes"] += 1
+                return self._stale(key)
+        elif self.breaker.state != CLOSED and key in self._last_good:
+            return self._stale(key)
+
+        try:
+            await asyncio.shield(task)
+        except SourceUnavailable as e:
+            return self._stale_or_raise(key, str(e))
+        return self._reading(key, stale=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ages = {str(key): round(self.clock() - at, 3) for key, (_, _, at) in self._last_good.items()}
+        snapshot = {"breaker": self.breaker.snapshot(), "timeout_seconds": self.timeout,
+                    "last_good_age_seconds": ages, **self.stats}
+        if self.limiter is not None:
+            snapshot["rate_limit"] = self.limiter.snapshot()
+        return snapshot
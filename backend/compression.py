@@ -0,0 +1,162 @@
+"""Response compression with per-route ratio and CPU accounting
+
+`CompressionMiddleware` is a plain ASGI middleware. It compresses complete
+JSON/text bodies of at least `minimum_size` bytes, using brotli when the
+client accepts it and the `brotli` package is installed, and gzip otherwise.
+It passes through small responses, streaming responses and bodies that are
+already encoded.
+
+`CompressionStats` keeps, per route template, how many responses were
+compressed or skipped, bytes in and out and the CPU time spent. The ratio
+and cost can then be tuned per payload.
+"""
+import gzip
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+UNMATCHED_ROUTE = "<unmatched>"  # stats bucket for requests no route matched
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map of encoding -> q value from an Accept-Encoding header"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name.strip().lower()] = q
+    return encodings
+
+
+def choose_encoding(header: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = (["br"] if brotli_available else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionStats:
+    def __init__(self):
+        self._routes = defaultdict(lambda: {
+            "responses": 0, "compressed": 0, "skipped_small": 0, "skipped_other": 0,
+            "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0,
+        })
+
+    def record(self, route: str, outcome: str, bytes_in: int = 0, bytes_out: int = 0, cpu_seconds: float = 0.0):
+        stats = self._routes[route]
+        stats["responses"] += 1
+        stats[outcome] += 1
+        if outcome == "compressed":
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            stats["cpu_seconds"] += cpu_seconds
+
+    def snapshot(self):
+        routes = {}
+        for route, stats in sorted(self._routes.items()):
+            compressed = stats["compressed"]
+            routes[route] = {
+                **{key: value for key, value in stats.items() if key != "cpu_seconds"},
+                "ratio": round(stats["bytes_out"] / stats["bytes_in"], 4) if stats["bytes_in"] else None,
+                "cpu_ms_total": round(stats["cpu_seconds"] * 1000, 3),
+                "cpu_ms_per_response": round(stats["cpu_seconds"] * 1000 / compressed, 3) if compressed else 0.0,
+            }
+        return routes
+
+    def reset(self):
+        self._routes.clear()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 stats: Optional[CompressionStats] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = stats if stats is not None else CompressionStats()
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict((key.lower(), value) for key, value in scope.get("headers", []))
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"), brotli is not None)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        def route_name():
+            # Route templates only: raw paths (404s, probes) would grow the stats without bound
+            route = scope.get("route")
+            return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message  # held until the body shows whether to compress
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            response_headers = [(k.lower(), v) for k, v in start["headers"]]
+            content_type = dict(response_headers).get(b"content-type", b"").decode("latin-1")
+            body = message.get("body", b"")
+            if (
+                message.get("more_body")
+                or dict(response_headers).get(b"content-encoding")
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                self.stats.record(route_name(), "skipped_other")
+                await send(start)
+                await send(message)
+                return
+            if len(body) < self.minimum_size:
+                self.stats.record(route_name(), "skipped_small")
+                await send(start)
+                await send(message)
+                return
+
+            cpu_start = time.thread_time()
+            compressed = self.compress(body, encoding)
+            cpu_seconds = time.thread_time() - cpu_start
+            self.stats.record(route_name(), "compressed", len(body), len(compressed), cpu_seconds)
+
+            response_headers = [(k, v) for k, v in response_headers if k != b"content-length"]
+            response_headers += [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(compressed)).encode("latin-1")),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": response_headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,61 @@
+"""Bounded set of recently seen keys, for dropping items an upstream repeats
+
+Polled feeds return overlapping pages, so the same post or headline comes
+back on every poll until it scrolls out. `SeenSet` remembers the last
+`max_size` keys; once full, the key seen longest ago is forgotten first.
+With a `ttl`, a key not seen again for `ttl` seconds is forgotten as well.
+"""
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+_URL = re.compile(r"https?://\S+")
+_MENTION = re.compile(r"(^rt\s+)?@\w+:?")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+
+
+def text_key(text: str) -> str:
+    """Hash of a post's text without links, mentions, retweet prefix, punctuation, case or extra spacing"""
+    normalized = _MENTION.sub(" ", _URL.sub(" ", text.lower()))
+    normalized = _SPACE.sub(" ", _PUNCTUATION.sub(" ", normalized)).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class SeenSet:
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._keys: "OrderedDict[Hashable, float]" = OrderedDict()  # key -> last seen, oldest first
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._expire()
+        return key in self._keys
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._keys)
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        cutoff = self.clock() - self.ttl
+        while self._keys:
+            key, seen_at = next(iter(self._keys.items()))
+            if seen_at >= cutoff:
+                break
+            del self._keys[key]
+
+    def add(self, key: Hashable) -> bool:
+        """Remember `key` (or refresh when it was last seen); False if it was already there"""
+        self._expire()
+        known = key in self._keys
+        self._keys[key] = self.clock()
+        self._keys.move_to_end(key)
+        if len(self._keys) > self.max_size:
+            self._keys.popitem(last=False)
+        return not known
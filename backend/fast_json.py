@@ -0,0 +1,41 @@
+"""Fast response path for data we wrote ourselves
+
+FastAPI's default path validates every model and then runs jsonable_encoder
+and json.dumps over the result. For documents read back from Mongo, the
+validation repeats work already done when they were written. Use
+`construct_many` to build models without validation, and return them in a
+`FastJSONResponse`, which serializes models, datetimes and ObjectIds
+directly with orjson.
+"""
+from typing import Any, Iterable, List, Type, TypeVar
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+Model = TypeVar("Model", bound=BaseModel)
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.__dict__  # field values; nested models come back through here
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def construct_many(model: Type[Model], docs: Iterable[dict]) -> List[Model]:
+    """Models from trusted DB documents, skipping validation; unknown keys are dropped"""
+    return [model.model_construct(**doc) for doc in docs]
@@ -0,0 +1,144 @@
+"""Deferred imports and an import-time breakdown for cold starts
+
+Heavy optional dependencies (the LLM client, tweepy, feedparser, textblob)
+are wrapped in `LazyModule` and imported on first attribute access. A cold
+start only pays for what the first requests use.
+
+`start_tracking()`/`stop_tracking()` bracket server.py's import block. While
+active, every outermost import is timed, so `report()` breaks the eager
+import cost down by top-level package. Lazy loads record their own cost.
+
+Only the standard library is used here, so importing this module first
+doesn't skew the numbers.
+"""
+import builtins
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+MODULE_LOADED_AT = time.time()
+
+_original_import = builtins.__import__
+_eager_seconds: Dict[str, float] = defaultdict(float)
+_tracking = {"depth": 0, "started": None, "finished": None}
+_lock = threading.Lock()
+
+
+def process_start_time() -> float:
+    """Epoch seconds at which this process started (Linux /proc), else when this module loaded"""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])  # field 22 (starttime), counted after pid and comm
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return MODULE_LOADED_AT
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only the outermost import of a module not yet loaded is timed; nested ones are part of its cost
+    if level or _tracking["depth"] or name in sys.modules or threading.current_thread() is not threading.main_thread():
+        return _original_import(name, globals, locals, fromlist, level)
+    _tracking["depth"] += 1
+    started = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _tracking["depth"] -= 1
+        _eager_seconds[name.partition(".")[0]] += time.perf_counter() - started
+
+
+def start_tracking():
+    _tracking["started"] = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def stop_tracking():
+    builtins.__import__ = _original_import
+    _tracking["finished"] = time.perf_counter()
+
+
+class LazyModule:
+    """Module proxy that imports `name` on first attribute access"""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self.import_seconds: Optional[float] = None
+
+    def load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    self.import_seconds = time.perf_counter() - started
+                    logging.info(f"Lazy import of {self._name} took {self.import_seconds * 1000:.0f} ms")
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self._name} ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+_registry: Dict[str, LazyModule] = {}
+
+
+def lazy_import(name: str) -> LazyModule:
+    if name not in _registry:
+        _registry[name] = LazyModule(name)
+    return _registry[name]
+
+
+def preload(names: Optional[list] = None):
+    """Import lazy modules ahead of first use, e.g. from a thread after startup"""
+    for name in names or list(_registry):
+        try:
+            _registry[name].load()
+        except ImportError as e:
+            logging.warning(f"Lazy import of {name} failed: {e}")
+
+
+def report(ready_at: Optional[float] = None) -> dict:
+    """Import-time breakdown; `ready_at` (epoch seconds) adds time since process start"""
+    eager = dict(sorted(_eager_seconds.items(), key=lambda item: item[1], reverse=True))
+    started, finished = _tracking["started"], _tracking["finished"]
+    result = {
+        "eager_import_ms": round((finished - started) * 1000, 1) if started and finished else None,
+        "eager_by_package_ms": {name: round(seconds * 1000, 1) for name, seconds in eager.items()},
+        "lazy": {
+            name: {
+                "loaded": module.loaded,
+                "import_ms": round(module.import_seconds * 1000, 1) if module.loaded else None,
+            }
+            for name, module in _registry.items()
+        },
+    }
+    if ready_at is not None:
+        result["process_start_to_ready_ms"] = round((ready_at - process_start_time()) * 1000, 1)
+    return result
+
+
+def format_report(data: dict, top: int = 8) -> str:
+    parts = [f"{name} {ms:.0f}ms" for name, ms in list(data["eager_by_package_ms"].items())[:top]]
+    line = f"eager imports {data['eager_import_ms']}ms ({', '.join(parts)})"
+    if "process_start_to_ready_ms" in data:
+        line += f"; process start to ready {data['process_start_to_ready_ms']}ms"
+    deferred = [name for name, info in data["lazy"].items() if not info["loaded"]]
+    if deferred:
+        line += f"; deferred: {', '.join(deferred)}"
+    return line
@@ -0,0 +1,114 @@
+"""Single-leader election for background work across API workers
+
+Each worker repeatedly tries to take or renew a lease document in Mongo.
+Only the worker holding an unexpired lease is leader and runs the
+auto-trading scheduler and the risk tick monitor. The leader renews the
+lease every `heartbeat_seconds`. If it dies, the lease expires after
+`ttl_seconds` and another worker takes over on its next heartbeat.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+def default_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LocalLease:
+    """Always-leader lease for a single-worker deployment"""
+
+    def __init__(self, holder: Optional[str] = None, heartbeat_seconds: float = 5.0):
+        self.holder = holder or default_holder()
+        self.heartbeat_seconds = heartbeat_seconds
+        self.is_leader = False
+        self.stats = {"acquired": 0, "lost": 0, "renewed": 0}
+
+    async def try_acquire(self) -> bool:
+        if not self.is_leader:
+            self.stats["acquired"] += 1
+        else:
+            self.stats["renewed"] += 1
+        self.is_leader = True
+        return True
+
+    def step_down(self):
+        pass
+
+    async def release(self):
+        self.is_leader = False
+
+    def snapshot(self):
+        return {"backend": "memory", "holder": self.holder, "is_leader": self.is_leader, **self.stats}
+
+
+class LeaderLease:
+    """Lease document `{_id: name, holder, expires_at, heartbeat_at}` in a Mongo collection"""
+
+    def __init__(self, collection, name: str = "background_tasks", ttl_seconds: float = 30.0,
+                 heartbeat_seconds: Optional[float] = None, holder: Optional[str] = None):
+        self.collection = collection
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds or ttl_seconds / 3
+        self.holder = holder or default_holder()
+        self.is_leader = False
+        self.current_holder: Optional[str] = None
+        self.stats = {"acquired": 0, "lost": 0, "renewed": 0}
+
+    async def try_acquire(self, now: Optional[datetime] = None) -> bool:
+        """Take the lease if it is free or expired, or renew it if we hold it"""
+        now = now or datetime.utcnow()
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": self.name, "$or": [{"holder": self.holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {
+                    "holder": self.holder,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                    "heartbeat_at": now,
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The filter missed an existing lease held by another worker, so the upsert collided
+            doc = None
+        return self._update(doc is not None and doc["holder"] == self.holder, doc)
+
+    def _update(self, leader: bool, doc) -> bool:
+        if leader:
+            self.stats["renewed" if self.is_leader else "acquired"] += 1
+            self.current_holder = self.holder
+        else:
+            if self.is_leader:
+                self.stats["lost"] += 1
+            self.current_holder = doc["holder"] if doc else None
+        self.is_leader = leader
+        return leader
+
+    def step_down(self):
+        """Stop acting as leader without a round trip, e.g. when renewing failed"""
+        self._update(False, None)
+
+    async def release(self):
+        """Give the lease up so another worker can take over without waiting for expiry"""
+        if self.is_leader:
+            await self.collection.update_one(
+                {"_id": self.name, "holder": self.holder}, {"$set": {"expires_at": datetime.utcfromtimestamp(0)}}
+            )
+        self.is_leader = False
+
+    def snapshot(self):
+        return {
+            "backend": "mongo",
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "ttl_seconds": self.ttl_seconds,
+            "heartbeat_seconds": self.heartbeat_seconds,
+            **self.stats,
+        }
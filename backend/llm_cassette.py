@@ -0,0 +1,172 @@
+"""Record/replay layer for LLM chat calls
+
+In record mode every request/response pair sent through a wrapped chat is
+appended to a JSONL cassette keyed by a hash of the request. In replay mode
+responses are served from the cassette, with optional simulated latency, so
+the trading pipeline can be run offline, deterministically and cheaply.
+
+Configured from the environment:
+    LLM_CASSETTE_MODE        off (default) | record | replay
+    LLM_CASSETTE_PATH        cassette file (default: llm_cassette.jsonl next to this module)
+    LLM_CASSETTE_LATENCY_MS  simulated latency per replayed call (default: 0)
+    LLM_CASSETTE_JITTER_MS   uniform jitter added to the latency (default: 0)
+    LLM_CASSETTE_ON_MISS     error (default) | any - on a replay miss, serve a
+                             recorded response for the same role and model
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+MODES = ("off", "record", "replay")
+MISS_POLICIES = ("error", "any")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no recorded response matches a request"""
+
+
+def request_key(role: str, model: str, system_message: str, prompt: str) -> str:
+    """Stable hash of everything that determines an LLM response"""
+    payload = json.dumps(
+        {"role": role, "model": model, "system": system_message, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCassette:
+    """On-disk store of request-hash -> LLM response"""
+
+    def __init__(self, path, mode="off", latency_ms=0.0, jitter_ms=0.0, on_miss="error", seed=None):
+        if mode not in MODES:
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        if on_miss not in MISS_POLICIES:
+            raise ValueError(f"Invalid cassette miss policy: {on_miss}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.on_miss = on_miss
+        self._random = random.Random(seed)
+        self._responses = {}
+        self._by_role = defaultdict(list)
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0, "fallbacks": 0}
+        if mode != "off":
+            self.load()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.environ.get("LLM_CASSETTE_PATH", Path(__file__).parent / "llm_cassette.jsonl"),
+            mode=os.environ.get("LLM_CASSETTE_MODE", "off").lower(),
+            latency_ms=float(os.environ.get("LLM_CASSETTE_LATENCY_MS", 0)),
+            jitter_ms=float(os.environ.get("LLM_CASSETTE_JITTER_MS", 0)),
+            on_miss=os.environ.get("LLM_CASSETTE_ON_MISS", "error").lower(),
+        )
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def load(self):
+        """Load recorded entries; later entries for the same key win"""
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping corrupt cassette line {line_number} in {self.path}")
+                    continue
+                self._store(entry)
+        logging.info(f"Loaded {len(self._responses)} LLM cassette entries from {self.path}")
+
+    def _store(self, entry):
+        if entry["key"] not in self._responses:
+            self._by_role[(entry["role"], entry["model"])].append(entry["key"])
+        self._responses[entry["key"]] = entry["response"]
+
+    def record(self, role, model, system_message, prompt, response):
+        entry = {
+            "key": request_key(role, model, system_message, prompt),
+            "role": role,
+            "model": model,
+            "prompt": prompt,
+            "response": response,
+            "recorded_at": datetime.utcnow().isoformat(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._store(entry)
+        self.stats["recorded"] += 1
+
+    def lookup(self, role, model, system_message, prompt):
+        key = request_key(role, model, system_message, prompt)
+        if key in self._responses:
+            self.stats["hits"] += 1
+            return self._responses[key]
+
+        self.stats["misses"] += 1
+        candidates = self._by_role.get((role, model))
+        if self.on_miss == "any" and candidates:
+            # Deterministic for a given prompt, so repeated runs stay reproducible
+            self.stats["fallbacks"] += 1
+            return self._responses[candidates[int(key, 16) % len(candidates)]]
+        raise CassetteMiss(f"No recorded {role} response for request {key[:12]}")
+
+    async def simulate_latency(self):
+        delay_ms = self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000.0)
+
+    def wrap(self, chat, role, model, system_message):
+        """Route a chat through the cassette; returns `chat` unchanged when disabled"""
+        if not self.enabled:
+            return chat
+        if chat is None and self.mode == "record":
+            return None
+        return CassetteChat(self, chat, role, model, system_message)
+
+    def snapshot(self):
+        return {
+            "mode": self.mode,
+            "path": str(self.path),
+            "entries": len(self._responses),
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "on_miss": self.on_miss,
+            **self.stats,
+        }
+
+
+class CassetteChat:
+    """Drop-in stand-in for LlmChat.send_message backed by an LLMCassette"""
+
+    def __init__(self, cassette, chat, role, model, system_message):
+        self.cassette = cassette
+        self.chat = chat
+        self.role = role
+        self.model = model
+        self.system_message = system_message
+
+    async def send_message(self, message):
+        prompt = getattr(message, "text", str(message))
+        if self.cassette.mode == "replay":
+            response = self.cassette.lookup(self.role, self.model, self.system_message, prompt)
+            await self.cassette.simulate_latency()
+            return response
+
+        response = await self.chat.send_message(message)
+        self.cassette.record(self.role, self.model, self.system_message, prompt, response)
+        return response
@@ -0,0 +1,181 @@
+"""Tolerant parsing of structured (JSON) output returned by the LLMs"""
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+FENCED_BLOCK_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+LITERAL_WORDS = {"True": "true", "False": "false", "None": "null"}
+
+
+class LLMOutputError(ValueError):
+    """Raised when no valid JSON object can be recovered from an LLM response"""
+
+
+def _balanced_object(text: str, start: int) -> Optional[str]:
+    """Return the {...} block starting at `start`, honouring quoted strings"""
+    depth = 0
+    quote = None
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+            continue
+        if ch in ('"', "'"):
+            quote = ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _candidates(text: str) -> List[str]:
+    """Yield the substrings of an LLM response that may hold the JSON payload"""
+    candidates = [text.strip()]
+    candidates.extend(block.strip() for block in FENCED_BLOCK_RE.findall(text))
+
+    first_brace = text.find("{")
+    if first_brace != -1:
+        block = _balanced_object(text, first_brace)
+        if block:
+            candidates.append(block)
+        else:
+            # Truncated response - let the repair step try to close it
+            candidates.append(text[first_brace:].strip())
+    return candidates
+
+
+def repair_json(text: str) -> str:
+    """Fix the common ways LLMs bend JSON: single quotes, trailing commas, Python literals"""
+    out = []
+    stack = []  # closers for the brackets still open, outside strings
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch in ('"', "'"):
+            # Re-emit every string as a properly escaped double-quoted string
+            j = i + 1
+            chars = []
+            while j < n and text[j] != ch:
+                if text[j] == "\\" and j + 1 < n:
+                    chars.append("'" if text[j + 1] == "'" else text[j:j + 2])
+                    j += 2
+                    continue
+                chars.append('\\"' if text[j] == '"' else text[j])
+                j += 1
+            raw = "".join(chars)
+            try:
+                value = json.loads(f'"{raw}"', strict=False)
+            except json.JSONDecodeError:
+                value = raw
+            out.append(json.dumps(value))
+            i = j + 1
+        elif ch == ",":
+            # Drop trailing commas before a closing bracket
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j < n and text[j] in "}]":
+                i += 1
+                continue
+            out.append(ch)
+            i += 1
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(LITERAL_WORDS.get(word, word))
+            i = j
+        else:
+            if ch in "{[":
+                stack.append("}" if ch == "{" else "]")
+            elif ch in "}]" and stack and stack[-1] == ch:
+                stack.pop()
+            out.append(ch)
+            i += 1
+
+    repaired = "".join(out)
+    # Close a truncated object, innermost bracket first, so at least the complete fields survive
+    if stack:
+        repaired = repaired.rstrip().rstrip(",") + "".join(reversed(stack))
+    return repaired
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """Recover the first JSON object from an LLM response"""
+    if not isinstance(text, str) or not text.strip():
+        raise LLMOutputError("Empty LLM response")
+
+    last_error = None
+    for candidate in _candidates(text):
+        for attempt in (candidate, None):
+            try:
+                payload = json.loads(attempt if attempt is not None else repair_json(candidate), strict=False)
+            except (json.JSONDecodeError, ValueError) as e:
+                last_error = e
+                continue
+            if isinstance(payload, dict):
+                return payload
+            last_error = LLMOutputError(f"Expected a JSON object, got {type(payload).__name__}")
+    raise LLMOutputError(f"No JSON object found in LLM response: {last_error}")
+
+
+def parse_llm_output(text: str, validate: Callable[[Dict[str, Any]], T]) -> T:
+    """Extract JSON from `text` and run it through `validate`
+
+    Any exception raised by the validator is reported as an LLMOutputError so
+    callers only have one failure type to handle.
+    """
+    payload = extract_json_object(text)
+    try:
+        return validate(payload)
+    except LLMOutputError:
+        raise
+    except Exception as e:
+        raise LLMOutputError(f"LLM response failed validation: {e}") from e
+
+
+class ParseStats:
+    """Per-model counters of how LLM responses were parsed"""
+
+    OUTCOMES = ("parsed", "repaired", "failed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: dict.fromkeys(self.OUTCOMES, 0))
+
+    def record(self, model: str, outcome: str):
+        with self._lock:
+            self._counts[model][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            counts = {model: dict(c) for model, c in self._counts.items()}
+        result = {}
+        for model, c in counts.items():
+            total = sum(c.values())
+            result[model] = {
+                **c,
+                "total": total,
+                "success_rate": (c["parsed"] + c["repaired"]) / total if total else 0.0,
+                "first_pass_rate": c["parsed"] / total if total else 0.0,
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
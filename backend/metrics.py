@@ -0,0 +1,257 @@
+"""Latency histograms and gauges in the Prometheus text format
+
+A small, dependency-free subset of the Prometheus client model:
+
+- `Histogram` with fixed buckets and labels, plus `time()` to time a block;
+- `Counter`;
+- `CallbackGauge`, which reads its values when scraped (history sizes,
+  cache hit rates), so nothing has to be kept in sync.
+
+`MongoCommandTimer` is a pymongo command listener. Registered on the client,
+it times every command the driver sends, by command and collection, so no
+call site needs wrapping. `EventLoopLagMonitor` measures how late the event
+loop wakes a sleeping task, which is time every request waits behind
+blocking work.
+
+`MetricsRegistry.render()` produces the text served at /api/metrics/prom.
+"""
+import asyncio
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs) + "}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()  # pymongo listeners report from driver threads
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+
+    def samples(self) -> Iterable[str]:
+        return ()
+
+    def render(self) -> Iterable[str]:
+        yield from self.header()
+        yield from self.samples()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # bucket counts (last is +Inf), then sum
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the block, including awaits inside it, even if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def total(self, **labels) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def samples(self):
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket{format_labels(self.labelnames, key, [('le', format_value(bound))])} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, key)} {format_value(series[-1])}"
+            yield f"{self.name}_count{format_labels(self.labelnames, key)} {cumulative}"
+
+
+GaugeValues = Union[float, Dict[Tuple[str, ...], float]]
+
+
+class CallbackGauge(Metric):
+    """Gauge read at scrape time; `callback` returns a number or {label values: number}"""
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], GaugeValues], labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        try:
+            values = self.callback()
+        except Exception as e:
+            logging.error(f"Metric {self.name} callback failed: {e}")
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in sorted(values.items()):
+            if value is None:
+                continue
+            key = key if isinstance(key, tuple) else (key,)
+            yield f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, callback, labelnames=()) -> CallbackGauge:
+        return self.register(CallbackGauge(name, help, callback, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Times every command the driver runs, by command name and collection"""
+
+    def __init__(self, durations: Histogram, failures: Counter):
+        self.durations = durations
+        self.failures = failures
+        self._pending: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _event_key(event):
+        return event.request_id, event.connection_id, event.operation_id
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection", "")
+        with self._lock:
+            self._pending[self._event_key(event)] = collection if isinstance(collection, str) else ""
+
+    def _finish(self, event) -> str:
+        with self._lock:
+            return self._pending.pop(self._event_key(event), "")
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        self.durations.observe(event.duration_micros / 1e6, command=event.command_name, collection=collection)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        self.durations.observe(event.duration_micros / 1e6, command=event.command_name, collection=collection)
+        self.failures.inc(command=event.command_name, collection=collection)
+
+
+class EventLoopLagMonitor:
+    """Samples how late a sleeping task wakes up, i.e. how long the loop was blocked"""
+
+    def __init__(self, lag: Histogram, interval: float = 0.5):
+        self.lag = lag
+        self.interval = interval
+        self.last_lag: Optional[float] = None
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - started - self.interval)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            self.lag.observe(self.last_lag)
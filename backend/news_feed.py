@@ -0,0 +1,104 @@
+"""Incremental processing of the polled news feed
+
+Each poll of the CoinDesk feed returns its top headlines, which mostly
+repeat the previous poll. `NewsFeed` keys every headline by its GUID, or by
+a hash of its title when the feed gives none, and checks the key against a
+`SeenSet` with expiry. Only headlines it has not seen are scored, and each
+one is emitted as a `NewsEvent` with a sequence number readers can page
+from. `generation` goes up on every fetch that brought something new, so a
+caller can tell whether the news changed since it last looked. `digest()`
+identifies the current headlines themselves, so it is the same in every
+worker polling the same feed.
+"""
+import hashlib
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from dedup import SeenSet, text_key
+from sentiment import NEUTRAL
+
+
+class Headline(NamedTuple):
+    key: str
+    title: str
+    published: Optional[str] = None
+
+
+def headline_key(guid: Optional[str], title: str) -> str:
+    return guid or text_key(title)
+
+
+class NewsEvent(NamedTuple):
+    seq: int
+    key: str
+    title: str
+    polarity: float
+    label: str
+    seen_at: datetime
+
+
+class NewsFeed:
+    def __init__(self, backend, seen_size: int = 2000, seen_ttl: Optional[float] = 86400.0,
+                 max_events: int = 200, clock: Callable[[], float] = time.monotonic):
+        self.backend = backend  # a sentiment.SentimentBackend
+        self.seen = SeenSet(seen_size, ttl=seen_ttl, clock=clock)
+        self.events = deque(maxlen=max_events)
+        self.generation = 0
+        self._seq = 0
+        self._scores: Dict[str, float] = {}  # polarity of each headline in the current fetch
+        self._last_fetched_at = None
+        self.stats = {"fetches": 0, "headlines": 0, "new": 0, "scored": 0}
+
+    def observe(self, headlines: Sequence[Headline], fetched_at=None) -> List[NewsEvent]:
+        """Process one fetch of the feed; returns an event for each headline not seen before
+
+        The same fetch served again from cache (same `fetched_at`) is ignored.
+        """
+        if fetched_at is not None and fetched_at == self._last_fetched_at:
+            return []
+        self._last_fetched_at = fetched_at
+        self.stats["fetches"] += 1
+        self.stats["headlines"] += len(headlines)
+        new = [headline for headline in headlines if self.seen.add(headline.key)]
+
+        scores = {h.key: self._scores[h.key] for h in headlines if h.key in self._scores}
+        unscored = [h for h in headlines if h.key not in scores]
+        if unscored:
+            scores.update(zip((h.key for h in unscored), self.backend.score_batch([h.title for h in unscored])))
+            self.stats["scored"] += len(unscored)
+        self._scores = scores
+
+        now = datetime.now(timezone.utc)
+        events = []
+        for headline in new:
+            self._seq += 1
+            polarity = scores[headline.key]
+            events.append(NewsEvent(self._seq, headline.key, headline.title, round(polarity, 4),
+                                    self.backend.label(polarity), now))
+        if events:
+            self.generation += 1
+            self.events.extend(events)
+            self.stats["new"] += len(events)
+        return events
+
+    def sentiment(self) -> str:
+        """Label of the mean polarity of the current headlines"""
+        if not self._scores:
+            return NEUTRAL
+        return self.backend.label(sum(self._scores.values()) / len(self._scores))
+
+    def digest(self) -> str:
+        """Hash of the keys of the current headlines; empty before the first fetch"""
+        if not self._scores:
+            return ""
+        return hashlib.sha1("\n".join(sorted(self._scores)).encode("utf-8")).hexdigest()
+
+    def events_since(self, seq: int = 0, limit: int = 50) -> List[NewsEvent]:
+        """Events after sequence number `seq`, oldest first"""
+        return [event for event in self.events if event.seq > seq][:limit]
+
+    def snapshot(self) -> Dict:
+        return {"generation": self.generation, "last_seq": self._seq, "seen": len(self.seen),
+                "current": len(self._scores), **self.stats}
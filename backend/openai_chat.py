@@ -0,0 +1,45 @@
+"""Minimal chat client for OpenAI-compatible /chat/completions endpoints
+
+Used instead of LlmChat when LLM_API_BASE is set: a self-hosted gateway or
+the local stub server of the load-test suite (benchmarks/stubs.py). It has
+the same `send_message` surface as LlmChat and accepts any message object
+with a `.text` attribute, so the pipeline code does not change.
+"""
+from typing import NamedTuple, Optional
+
+import aiohttp
+
+
+class PlainMessage(NamedTuple):
+    """User message for chat backends other than LlmChat"""
+    text: str
+
+
+class LLMHTTPError(RuntimeError):
+    pass
+
+
+class OpenAICompatibleChat:
+    def __init__(self, base_url: str, model: str, system_message: str, api_key: Optional[str] = None,
+                 timeout: float = 60.0):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.system_message = system_message
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def send_message(self, message) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_message},
+                {"role": "user", "content": getattr(message, "text", str(message))},
+            ],
+        }
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+            async with session.post(self.url, json=payload, headers=headers) as response:
+                if response.status != 200:
+                    raise LLMHTTPError(f"LLM endpoint returned status {response.status}")
+                data = await response.json()
+        return data["choices"][0]["message"]["content"]
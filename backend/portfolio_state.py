@@ -0,0 +1,209 @@
+"""Serialized, versioned paper-trading portfolio state
+
+All mutations go through `PortfolioManager.apply`, which runs them one at a
+time under a single lock and publishes a new immutable `PortfolioState`
+with an incremented version. Readers take `manager.state` without locking
+and always see one consistent version, even while a trade is in flight.
+
+With a shared `store` (see shared_state.py), the state is also written as a
+versioned document. Each mutation reloads the latest version and writes back
+with a compare-and-set. If another worker committed first, the mutation is
+retried on the newer state, so several API workers trade one portfolio
+without lost updates. The daily trade count lives in the same document, so
+the daily trade cap is checked and counted in that same compare-and-set and
+holds across all workers.
+"""
+import asyncio
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+EMPTY = MappingProxyType({})
+STORE_KEY = "portfolio"
+
+
+class PortfolioConflictError(RuntimeError):
+    """Raised when a mutation keeps losing the compare-and-set to other workers"""
+
+
+class PortfolioState(NamedTuple):
+    version: int
+    usd_balance: float
+    holdings: Mapping[str, float]  # symbol -> amount, only open positions
+    last_trade_prices: Mapping[str, float]  # symbol -> price of the last BUY
+    snapshots: Tuple[Any, ...]  # PortfolioSnapshot history for charts
+    trade_count: int
+    updated_at: datetime
+    trade_day: Optional[str] = None  # ISO date (UTC) that trades_today counts
+    trades_today: int = 0
+
+    def amount(self, symbol: str) -> float:
+        return self.holdings.get(symbol, 0.0)
+
+    def trades_on(self, day: date) -> int:
+        return self.trades_today if self.trade_day == day.isoformat() else 0
+
+
+class TradeExecution(NamedTuple):
+    action: str  # action actually executed (HOLD when the trade was a no-op)
+    profit_loss: float
+    amount: float
+    state: PortfolioState
+    capped: bool = False  # a BUY/SELL turned into HOLD by the daily trade cap
+
+
+def _frozen(mapping) -> Mapping[str, float]:
+    return MappingProxyType(dict(mapping))
+
+
+def state_to_doc(state: PortfolioState) -> dict:
+    doc = state._asdict()
+    doc["holdings"] = dict(state.holdings)
+    doc["last_trade_prices"] = dict(state.last_trade_prices)
+    doc["snapshots"] = [s.dict() if hasattr(s, "dict") else s for s in state.snapshots]
+    return doc
+
+
+def state_from_doc(doc: dict, decode_snapshot: Optional[Callable[[dict], Any]] = None) -> PortfolioState:
+    decode_snapshot = decode_snapshot or (lambda snapshot: snapshot)
+    return PortfolioState(
+        version=doc["version"],
+        usd_balance=doc["usd_balance"],
+        holdings=_frozen(doc["holdings"]),
+        last_trade_prices=_frozen(doc["last_trade_prices"]),
+        snapshots=tuple(decode_snapshot(s) for s in doc["snapshots"]),
+        trade_count=doc["trade_count"],
+        updated_at=doc["updated_at"],
+        trade_day=doc.get("trade_day"),
+        trades_today=doc.get("trades_today", 0),
+    )
+
+
+class PortfolioManager:
+    def __init__(self, usd_balance: float = 1000.0, store=None,
+                 decode_snapshot: Optional[Callable[[dict], Any]] = None, max_attempts: int = 10):
+        self._state = PortfolioState(
+            version=0,
+            usd_balance=usd_balance,
+            holdings=EMPTY,
+            last_trade_prices=EMPTY,
+            snapshots=(),
+            trade_count=0,
+            updated_at=datetime.utcnow(),
+        )
+        self._lock = asyncio.Lock()
+        self._store = store
+        self._decode_snapshot = decode_snapshot
+        self.max_attempts = max_attempts
+        self.stats = {"conflicts": 0}
+
+    @property
+    def state(self) -> PortfolioState:
+        """Current immutable snapshot; safe to read without the lock"""
+        return self._state
+
+    async def refresh(self) -> PortfolioState:
+        """Pick up a newer version committed by another worker; no-op without a store"""
+        if self._store is not None:
+            doc = await self._store.get(STORE_KEY)
+            if doc is not None and doc["version"] > self._state.version:
+                self._state = state_from_doc(doc, self._decode_snapshot)
+        return self._state
+
+    async def apply(self, mutate: Callable[[PortfolioState], Tuple[PortfolioState, Any]]):
+        """Run `mutate(state) -> (new_state, result)` atomically and publish the new version
+
+        `mutate` must be synchronous so nothing can interleave with it. With a
+        store it may run more than once, so it must not have side effects.
+        """
+        async with self._lock:
+            for _ in range(self.max_attempts):
+                base = await self.refresh()
+                new_state, result = mutate(base)
+                new_state = new_state._replace(version=base.version + 1, updated_at=datetime.utcnow())
+                if self._store is None or await self._store.compare_and_set(
+                    STORE_KEY, base.version, state_to_doc(new_state)
+                ):
+                    self._state = new_state
+                    return result, new_state
+                self.stats["conflicts"] += 1
+            raise PortfolioConflictError(f"Portfolio update lost {self.max_attempts} compare-and-set races")
+
+    async def execute_trade(
+        self,
+        action: str,
+        price: float,
+        symbol: str,
+        tracked_symbols: Iterable[str],
+        make_snapshot: Optional[Callable[[PortfolioState, float], Any]] = None,
+        snapshot_limit: int = 100,
+        max_trades_per_day: int = 0,
+        now: Optional[datetime] = None,
+    ) -> TradeExecution:
+        """Apply a paper trade with execute_paper_trade() semantics
+
+        BUY splits free USD equally across tracked symbols without a position
+        and is a no-op while `symbol` is already held; SELL closes the whole
+        position. The portfolio snapshot is appended in the same mutation.
+        Every executed trade counts toward today's total; with
+        `max_trades_per_day`, a trade that would exceed it is a HOLD instead.
+        """
+        tracked_symbols = list(tracked_symbols)
+        today = (now or datetime.utcnow()).date()
+
+        def mutate(state: PortfolioState):
+            holdings = dict(state.holdings)
+            last_prices = dict(state.last_trade_prices)
+            usd = state.usd_balance
+            executed, profit_loss, amount = "HOLD", 0.0, 0.0
+            trades_today = state.trades_on(today)
+            buy = action == "BUY" and usd > 0 and holdings.get(symbol, 0.0) == 0
+            sell = action == "SELL" and holdings.get(symbol, 0.0) > 0
+            capped = (buy or sell) and bool(max_trades_per_day) and trades_today >= max_trades_per_day
+
+            if buy and not capped:
+                open_slots = sum(1 for s in tracked_symbols if holdings.get(s, 0.0) == 0 and s != symbol) + 1
+                usd_spent = usd / open_slots
+                amount = usd_spent / price
+                holdings[symbol] = amount
+                usd -= usd_spent
+                last_prices[symbol] = price
+                executed = "BUY"
+            elif sell and not capped:
+                amount = holdings.pop(symbol)
+                usd_received = amount * price
+                profit_loss = usd_received - amount * last_prices.get(symbol, 0.0)
+                usd += usd_received
+                executed = "SELL"
+
+            new_state = state._replace(
+                usd_balance=usd,
+                holdings=_frozen(holdings) if executed != "HOLD" else state.holdings,
+                last_trade_prices=_frozen(last_prices) if executed == "BUY" else state.last_trade_prices,
+                trade_count=state.trade_count + (executed != "HOLD"),
+                trade_day=today.isoformat(),
+                trades_today=trades_today + (executed != "HOLD"),
+            )
+            if make_snapshot is not None:
+                snapshots = state.snapshots + (make_snapshot(new_state, price),)
+                new_state = new_state._replace(snapshots=snapshots[-snapshot_limit:] if snapshot_limit else snapshots)
+            return new_state, (executed, profit_loss, amount, capped)
+
+        (executed, profit_loss, amount, capped), state = await self.apply(mutate)
+        return TradeExecution(executed, profit_loss, amount, state, capped)
+
+    async def set_initial_balance(self, usd_balance: float) -> bool:
+        """Set the starting USD balance, only while no trade has been made"""
+        def mutate(state: PortfolioState):
+            if state.trade_count or state.holdings:
+                return state, False
+            return state._replace(usd_balance=usd_balance), True
+
+        changed, _ = await self.apply(mutate)
+        return changed
+
+    async def trim_snapshots(self, limit: int):
+        def mutate(state: PortfolioState):
+            return state._replace(snapshots=state.snapshots[-limit:] if limit else state.snapshots), None
+
+        await self.apply(mutate)
@@ -0,0 +1,201 @@
+"""On-demand sampling profiler for single requests
+
+`ProfilingMiddleware` profiles a request when it carries the trigger header
+(`X-Profile`), or when it is picked at `sample_rate`. Only then does it start
+a `StackSampler`: a thread that reads the event loop thread's stack every
+`interval` seconds and counts identical stacks. The result is saved in the
+folded format (`frame;frame;frame count`) that flamegraph.pl, speedscope and
+inferno read directly.
+
+Profiles are bounded on disk by `ProfileStore`, which evicts the oldest by
+count and total size. Profiling is opt-in: the server only installs the
+middleware when PROFILING_ENABLED is set, so a disabled deployment runs no
+profiling code at all.
+
+The sampler sees the whole event loop thread, so work from other requests
+interleaved with the profiled one shows up too. Only one request is
+profiled at a time. CPU-bound code holds the GIL, so while it runs samples
+come no faster than the interpreter's switch interval (5 ms by default).
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+
+def fold_stack(frame) -> str:
+    """Root-first `function (file:line)` frames joined by ';'"""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(frames))
+
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold_stack(frame)] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Folded profiles plus a JSON sidecar each, capped by count and total bytes"""
+
+    def __init__(self, directory, max_profiles: int = 50, max_bytes: int = 50 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, meta: Dict, folded: str) -> Dict:
+        data = folded.encode("utf-8")
+        meta = {**meta, "id": profile_id, "bytes": len(data), "created_at": datetime.utcnow().isoformat()}
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / f"{profile_id}.folded").write_bytes(data)
+            (self.directory / f"{profile_id}.json").write_text(json.dumps(meta))
+            self._evict()
+        return meta
+
+    def _evict(self):
+        profiles = sorted(self.directory.glob("*.folded"))  # ids sort by creation time
+        sizes = [p.stat().st_size for p in profiles]
+        total = sum(sizes)
+        while profiles and (len(profiles) > self.max_profiles or total > self.max_bytes):
+            oldest = profiles.pop(0)
+            total -= sizes.pop(0)
+            oldest.unlink(missing_ok=True)
+            oldest.with_suffix(".json").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict]:
+        metas = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                metas.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # evicted or half-written meanwhile
+        return metas
+
+    def read(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.folded"
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, store: ProfileStore, sample_rate: float = 0.0, interval: float = 0.005,
+                 header: str = "x-profile", token: Optional[str] = None, stats: Optional[Dict] = None):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.header = header.lower().encode("latin-1")
+        self.token = token
+        self._active = False
+        self.stats = stats if stats is not None else {}
+        for key in ("profiled", "skipped_busy", "failed"):
+            self.stats.setdefault(key, 0)
+
+    def trigger(self, scope) -> Optional[str]:
+        for key, value in scope.get("headers", []):
+            if key.lower() == self.header:
+                value = value.decode("latin-1")
+                if self.token is None or value == self.token:
+                    return "header"
+                return None
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self.trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        if self._active:
+            self.stats["skipped_busy"] += 1
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile_id = self.store.new_id()
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode("latin-1"))
+                ]}
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            duration = time.perf_counter() - started
+            self._active = False
+            meta = {
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status": status,
+                "trigger": trigger,
+                "duration_ms": round(duration * 1000, 2),
+                "samples": sampler.samples,
+                "interval_ms": self.interval * 1000,
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile_id, meta, sampler.folded())
+                self.stats["profiled"] += 1
+            except OSError as e:
+                self.stats["failed"] += 1
+                logging.error(f"Saving request profile failed: {e}")
@@ -0,0 +1,135 @@
+"""Token-budgeted prompt assembly for the trading and verification LLM calls"""
+import re
+from typing import List, NamedTuple, Optional, Sequence
+
+CHARS_PER_TOKEN = 4
+HEADLINE_MAX_CHARS = 100
+HEADLINE_SOURCE_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+(CoinDesk|Reuters|Bloomberg|Cointelegraph|Decrypt)\s*$", re.IGNORECASE)
+
+
+def count_tokens(text: str) -> int:
+    """Estimate prompt tokens (~4 characters per token for GPT-4 class tokenizers)"""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_text(text: str, max_chars: int) -> str:
+    """Collapse whitespace and cap the length of free text"""
+    text = " ".join(str(text).split())
+    if len(text) > max_chars:
+        text = text[:max_chars - 1].rstrip() + "…"
+    return text
+
+
+def compact_headline(headline: str, max_chars: int = HEADLINE_MAX_CHARS) -> str:
+    """Drop the source suffix and cap the length of a headline"""
+    text = HEADLINE_SOURCE_SUFFIX_RE.sub("", " ".join(str(headline).split()))
+    return compact_text(text, max_chars)
+
+
+def summarize_series(name: str, values: Sequence[float], fmt: str = ",.2f") -> Optional[str]:
+    """One-line summary of an indicator series instead of the raw list"""
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    last = values[-1]
+    if len(values) == 1:
+        return f"{name}: {last:{fmt}}"
+    first = values[0]
+    change = ((last - first) / first * 100) if first else 0.0
+    return (
+        f"{name}: last {last:{fmt}}, {change:+.2f}% over {len(values)} pts, "
+        f"range {min(values):{fmt}}-{max(values):{fmt}}, avg {sum(values) / len(values):{fmt}}"
+    )
+
+
+class BuiltPrompt(NamedTuple):
+    text: str
+    tokens: int
+    budget: int
+    dropped_items: int
+
+
+class PromptBuilder:
+    """Packs prompt sections into a token budget, most informative first
+
+    Sections are emitted in the order they were added, but when the budget is
+    tight they are admitted by priority (lower number = more important).
+    List sections are admitted item by item so a long headline list is cut
+    down instead of dropped entirely. Required sections are always included.
+    """
+
+    def __init__(self, budget_tokens: int):
+        self.budget_tokens = budget_tokens
+        self._sections = []
+
+    def add(self, text: Optional[str], priority: int = 0, required: bool = False):
+        if text:
+            self._sections.append({"title": None, "items": [text], "priority": priority, "required": required})
+        return self
+
+    def add_list(self, title: str, items: Sequence[str], priority: int = 1, max_items: Optional[int] = None):
+        items = [item for item in items if item]
+        if max_items is not None:
+            items = items[:max_items]
+        if items:
+            self._sections.append({"title": title, "items": items, "priority": priority, "required": False})
+        return self
+
+    @staticmethod
+    def _render(section, count):
+        items = section["items"][:count]
+        if section["title"] is None:
+            return items[0] if items else ""
+        if not items:
+            return ""
+        return section["title"] + "\n" + "\n".join(f"- {item}" for item in items)
+
+    def build(self) -> BuiltPrompt:
+        admitted = [0] * len(self._sections)
+        used = 0
+
+        for idx, section in enumerate(self._sections):
+            if section["required"]:
+                admitted[idx] = len(section["items"])
+                used += count_tokens(self._render(section, admitted[idx])) + 1
+
+        order = sorted(
+            (idx for idx, s in enumerate(self._sections) if not s["required"]),
+            key=lambda idx: self._sections[idx]["priority"]
+        )
+        for idx in order:
+            section = self._sections[idx]
+            if section["title"] is None:
+                cost = count_tokens(section["items"][0]) + 1
+                if used + cost <= self.budget_tokens:
+                    admitted[idx] = 1
+                    used += cost
+                continue
+            cost = count_tokens(section["title"]) + 1
+            for item in section["items"]:
+                cost += count_tokens(f"- {item}") + 1
+                if used + cost > self.budget_tokens:
+                    break
+                admitted[idx] += 1
+            if admitted[idx]:
+                used += count_tokens(self._render(section, admitted[idx])) + 1
+
+        parts = [self._render(s, admitted[idx]) for idx, s in enumerate(self._sections)]
+        text = "\n".join(part for part in parts if part)
+        dropped = sum(len(s["items"]) - admitted[idx] for idx, s in enumerate(self._sections))
+        return BuiltPrompt(text=text, tokens=count_tokens(text), budget=self.budget_tokens, dropped_items=dropped)
+
+
+def compact_list(items: Sequence[str], max_chars: int = HEADLINE_MAX_CHARS) -> List[str]:
+    """Compact and de-duplicate a list of headlines or tweets, preserving order"""
+    seen = set()
+    compacted = []
+    for item in items:
+        text = compact_headline(item, max_chars)
+        key = text.lower()
+        if text and key not in seen:
+            seen.add(key)
+            compacted.append(text)
+    return compacted
@@ -0,0 +1,140 @@
+"""Process-wide token-bucket rate limiting for upstream APIs, with priority lanes
+
+Each upstream gets one `RateLimiter`: a bucket of `burst` tokens refilled at
+`rate_per_minute`. Every call to the upstream takes a token. When the bucket
+is empty, callers queue by lane, and the lane with the lowest priority number
+is served first; within a lane, callers are served first come, first served.
+So the trading pipeline gets the next token ahead of chart refreshes. A caller
+gives up after its lane's `max_wait`, so the caller can fall back to a cached
+value instead of piling up. Callers in a `stale_ok` lane that already have
+one don't wait at all, and neither do callers whose cached value is younger
+than their lane's `reuse_within`.
+
+`penalize(seconds)` empties the bucket and holds it shut, e.g. for the
+Retry-After of a 429, so the quota recovers before the next call.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+LANE_TRADING = "trading"
+LANE_DASHBOARD = "dashboard"
+
+
+class Lane(NamedTuple):
+    priority: int  # lower is served first
+    max_wait: float  # seconds to wait for a token before giving up
+    stale_ok: bool = False  # a cached value is good enough; don't wait when there is one
+    reuse_within: float = 0.0  # don't wait either when the cached value is younger than this (seconds)
+
+
+DEFAULT_LANES = {LANE_TRADING: Lane(0, 10.0), LANE_DASHBOARD: Lane(1, 1.0, stale_ok=True)}
+
+
+class RateLimiter:
+    def __init__(self, name: str, rate_per_minute: float, burst: Optional[int] = None,
+                 lanes: Optional[Dict[str, Lane]] = None, clock=time.monotonic, throttled=None):
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_minute // 10)))
+        self.lanes = dict(lanes or DEFAULT_LANES)
+        self.clock = clock
+        self.throttled = throttled  # optional metrics Counter labelled (source, lane)
+        self.tokens = self.capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._waiters: List[Any] = []  # heap of (priority, sequence, future)
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.penalties = 0
+        self.stats = {lane: {"granted": 0, "throttled": 0, "rejected": 0, "wait_seconds": 0.0}
+                      for lane in self.lanes}
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self) -> bool:
+        self._refill()
+        if self.clock() < self._blocked_until or self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def _next_token_in(self) -> float:
+        self._refill()
+        refill = (1 - self.tokens) / self.rate if self.tokens < 1 and self.rate > 0 else 0.0
+        return max(self._blocked_until - self.clock(), refill, 0.001)
+
+    def _dispatch(self):
+        """Hand available tokens to the highest-priority waiters, then sleep until the next token"""
+        self._timer = None
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():  # gave up waiting
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take():
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(True)
+        if self._waiters and self.rate > 0:
+            self._timer = asyncio.get_running_loop().call_later(self._next_token_in(), self._dispatch)
+
+    async def acquire(self, lane: str = LANE_DASHBOARD, wait: bool = True) -> bool:
+        """Take a token, waiting up to the lane's max_wait (if `wait`); False if none came in time"""
+        settings = self.lanes[lane]
+        stats = self.stats[lane]
+        if not self._waiters and self._try_take():
+            stats["granted"] += 1
+            return True
+
+        stats["throttled"] += 1
+        if self.throttled is not None:
+            self.throttled.inc(source=self.name, lane=lane)
+        if not wait or settings.max_wait <= 0:
+            stats["rejected"] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (settings.priority, next(self._sequence), future))
+        if self._timer is None:
+            self._dispatch()
+        started = self.clock()
+        try:
+            await asyncio.wait_for(future, settings.max_wait)
+        except asyncio.TimeoutError:
+            stats["rejected"] += 1
+            return False
+        finally:
+            stats["wait_seconds"] += self.clock() - started
+        stats["granted"] += 1
+        return True
+
+    def refund(self):
+        """Return an unused token"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def penalize(self, seconds: float):
+        """The upstream said we are over quota: no calls for `seconds`"""
+        self.penalties += 1
+        self._refill()
+        self.tokens = 0.0
+        self._blocked_until = max(self._blocked_until, self.clock() + seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate_per_minute": round(self.rate * 60, 3),
+            "burst": self.capacity,
+            "tokens": round(self.tokens, 3),
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - self.clock()), 3),
+            "penalties": self.penalties,
+            "lanes": {lane: {**stats, "wait_seconds": round(stats["wait_seconds"], 3)}
+                      for lane, stats in self.stats.items()},
+        }
@@ -0,0 +1,274 @@
+"""Retention policy for the trades collection
+
+A run applies three stages, oldest data first:
+
+1. archive: trades older than `trade_archive_after_days` are written to
+   gzip-compressed JSONL files under the archive directory, then deleted.
+   Each chunk is written and renamed into place before its rows are removed,
+   so an interrupted run never loses a trade.
+2. compact: HOLD rows older than `hold_compaction_after_days` are folded into
+   one summary document per symbol and period in `trade_summaries`, then
+   deleted. Summaries are upserted with $inc/$min/$max, so a period split
+   across chunks or runs still ends up as a single document. Each summary
+   records the last row it merged (`last_timestamp` and `last_ids`), and
+   rows up to it are skipped, so a run interrupted between the merge and the
+   delete doesn't count its rows twice.
+3. expire: summaries carry a TTL index on `period_end`
+   (`trade_summary_ttl_days`, 0 keeps them forever).
+
+With a TradeStore, archived files hold the full trades (details and
+evidence included), and details are dropped along with their summaries.
+
+Recent trades stay in `trades` untouched. Each run reports the logical BSON
+bytes it removed and the change in collection storage size.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import bson
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+INDEX_OPTIONS_CONFLICT = 85
+
+
+def period_start(timestamp: datetime, period_hours: int) -> datetime:
+    """Start of the `period_hours` bucket containing `timestamp` (buckets aligned to midnight UTC)"""
+    day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day + timedelta(hours=(timestamp.hour // period_hours) * period_hours)
+
+
+def summarize_holds(trades: List[Dict[str, Any]], period_hours: int) -> List[Dict[str, Any]]:
+    """Fold HOLD rows into one partial summary per (symbol, period)"""
+    summaries = {}
+    for trade in sorted(trades, key=lambda trade: trade["timestamp"]):
+        symbol = trade.get("symbol", "BTC")
+        start = period_start(trade["timestamp"], period_hours)
+        summary = summaries.get((symbol, start))
+        if summary is None:
+            summary = summaries[(symbol, start)] = {
+                "symbol": symbol,
+                "period_start": start,
+                "period_end": start + timedelta(hours=period_hours),
+                "hold_count": 0,
+                "price_sum": 0.0,
+                "confidence_sum": 0.0,
+                "price_min": trade["price"],
+                "price_max": trade["price"],
+                "first_timestamp": trade["timestamp"],
+                "last_timestamp": trade["timestamp"],
+                "last_ids": [],
+                "news_sentiment": {},
+                "twitter_sentiment": {},
+            }
+        summary["hold_count"] += 1
+        summary["price_sum"] += trade["price"]
+        summary["confidence_sum"] += trade.get("confidence", 0.0)
+        summary["price_min"] = min(summary["price_min"], trade["price"])
+        summary["price_max"] = max(summary["price_max"], trade["price"])
+        summary["first_timestamp"] = min(summary["first_timestamp"], trade["timestamp"])
+        if trade["timestamp"] > summary["last_timestamp"]:
+            summary["last_ids"] = []
+        summary["last_timestamp"] = trade["timestamp"]
+        summary["last_ids"].append(row_id(trade))
+        for field in ("news_sentiment", "twitter_sentiment"):
+            label = trade.get(field) or "Unknown"
+            summary[field][label] = summary[field].get(label, 0) + 1
+    return list(summaries.values())
+
+
+def row_id(trade: Dict[str, Any]) -> str:
+    return str(trade.get("id") or trade.get("_id"))
+
+
+def already_summarized(trade: Dict[str, Any], summary: Optional[Dict[str, Any]]) -> bool:
+    """Whether `trade` was merged into its stored summary by an earlier, interrupted run"""
+    if summary is None or "last_timestamp" not in summary:
+        return False
+    last = summary["last_timestamp"]
+    return trade["timestamp"] < last or (trade["timestamp"] == last and row_id(trade) in summary.get("last_ids", []))
+
+
+def summary_update(summary: Dict[str, Any]):
+    """Upsert (filter, update) merging a partial summary into its stored document"""
+    increments = {name: summary[name] for name in ("hold_count", "price_sum", "confidence_sum")}
+    for field in ("news_sentiment", "twitter_sentiment"):
+        increments.update({f"{field}.{label}": count for label, count in summary[field].items()})
+    return (
+        {"symbol": summary["symbol"], "period_start": summary["period_start"]},
+        {
+            "$inc": increments,
+            "$min": {"price_min": summary["price_min"], "first_timestamp": summary["first_timestamp"]},
+            "$max": {"price_max": summary["price_max"], "last_timestamp": summary["last_timestamp"]},
+            "$set": {"last_ids": summary["last_ids"]},
+            "$setOnInsert": {"period_end": summary["period_end"]},
+        },
+    )
+
+
+def write_archive(archive_dir: Path, trades: List[Dict[str, Any]]) -> Path:
+    """Write trades to a gzip JSONL file, atomically and durably (temp file + fsync + rename)
+
+    The file and its directory entry are on disk when this returns, so the
+    rows can be deleted from Mongo.
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    first, last = trades[0]["timestamp"], trades[-1]["timestamp"]
+    name = f"trades-{first:%Y%m%dT%H%M%S}-{last:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+    path = archive_dir / name
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as raw:
+        with gzip.open(raw, "wt", encoding="utf-8") as f:
+            for trade in trades:
+                f.write(json.dumps(trade, default=str, ensure_ascii=False) + "\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    fsync_dir(archive_dir)
+    return path
+
+
+def fsync_dir(directory: Path):
+    """Persist a rename in `directory` (a no-op where directories can't be opened, e.g. Windows)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_archive(path: Path) -> List[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class RetentionJob:
+    def __init__(self, db, archive_dir, chunk_size: int = 1000, trade_store=None):
+        self.db = db
+        self.trade_store = trade_store
+        self.trades = db.trades
+        self.summaries = db.trade_summaries
+        self.archive_dir = Path(archive_dir)
+        self.chunk_size = chunk_size
+        self._lock = asyncio.Lock()  # summaries are $inc-merged, so runs must not overlap
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.stats = {"runs": 0, "archived": 0, "compacted": 0, "reclaimed_bytes": 0, "errors": 0}
+
+    async def ensure_indexes(self, summary_ttl_days: int = 0):
+        """Indexes for the history/metrics/chart queries and the retention scans"""
+        await self.trades.create_index([("timestamp", DESCENDING)])
+        await self.trades.create_index([("symbol", ASCENDING), ("timestamp", DESCENDING)])
+        await self.trades.create_index([("decision", ASCENDING), ("timestamp", ASCENDING)])
+        await self.trades.create_index("id")
+        await self.summaries.create_index([("symbol", ASCENDING), ("period_start", ASCENDING)], unique=True)
+        await self.ensure_summary_ttl(summary_ttl_days)
+
+    async def ensure_summary_ttl(self, ttl_days: int):
+        if not ttl_days:
+            try:
+                await self.summaries.drop_index("period_end_1")
+            except OperationFailure:
+                pass
+            return
+        seconds = int(ttl_days * 86400)
+        try:
+            await self.summaries.create_index("period_end", expireAfterSeconds=seconds)
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            await self.db.command("collMod", "trade_summaries",
+                                  index={"keyPattern": {"period_end": 1}, "expireAfterSeconds": seconds})
+
+    async def _storage_size(self) -> Optional[int]:
+        try:
+            stats = await self.db.command("collStats", "trades")
+            return stats.get("size")
+        except Exception:
+            return None
+
+    async def _chunks(self, query):
+        """Oldest-first chunks of matching trades; each chunk is deleted before the next is read"""
+        while True:
+            chunk = await self.trades.find(query).sort("timestamp", ASCENDING).limit(self.chunk_size).to_list(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    async def _delete(self, chunk) -> int:
+        await self.trades.delete_many({"_id": {"$in": [trade["_id"] for trade in chunk]}})
+        if self.trade_store is not None:
+            await self.trade_store.delete_details([trade["id"] for trade in chunk if trade.get("has_detail")])
+        return sum(len(bson.encode(trade)) for trade in chunk)
+
+    async def _stored_summaries(self, chunk, period_hours: int) -> Dict[Any, Dict[str, Any]]:
+        """Merge marks of the stored summaries the rows of `chunk` fall into, by (symbol, period_start)"""
+        keys = {(trade.get("symbol", "BTC"), period_start(trade["timestamp"], period_hours)) for trade in chunk}
+        query = {"$or": [{"symbol": symbol, "period_start": start} for symbol, start in keys]}
+        docs = await self.summaries.find(query, {"symbol": 1, "period_start": 1, "last_timestamp": 1, "last_ids": 1}).to_list(None)
+        return {(doc["symbol"], doc["period_start"]): doc for doc in docs}
+
+    async def run_once(self, settings, now: Optional[datetime] = None) -> Dict[str, Any]:
+        async with self._lock:
+            return await self._run(settings, now or datetime.utcnow())
+
+    async def _run(self, settings, now: datetime) -> Dict[str, Any]:
+        archive_cutoff = now - timedelta(days=settings.trade_archive_after_days)
+        compact_cutoff = now - timedelta(days=settings.hold_compaction_after_days)
+        size_before = await self._storage_size()
+        report = {"started_at": now, "archived": 0, "compacted": 0, "summaries_upserted": 0,
+                  "archive_files": [], "reclaimed_bytes": 0}
+
+        try:
+            if settings.trade_archive_after_days:
+                async for chunk in self._chunks({"timestamp": {"$lt": archive_cutoff}}):
+                    records = await self.trade_store.hydrate(chunk) if self.trade_store is not None else chunk
+                    # gzip + fsync off the event loop; rows are deleted only once the file is durable
+                    path = await asyncio.to_thread(write_archive, self.archive_dir, records)
+                    report["reclaimed_bytes"] += await self._delete(chunk)
+                    report["archived"] += len(chunk)
+                    report["archive_files"].append(path.name)
+
+            if settings.hold_compaction_after_days:
+                period_hours = settings.hold_summary_period_hours
+                async for chunk in self._chunks({"decision": "HOLD", "timestamp": {"$lt": compact_cutoff}}):
+                    stored = await self._stored_summaries(chunk, period_hours)
+                    fresh = [trade for trade in chunk if not already_summarized(
+                        trade, stored.get((trade.get("symbol", "BTC"), period_start(trade["timestamp"], period_hours))))]
+                    for summary in summarize_holds(fresh, period_hours):
+                        previous = stored.get((summary["symbol"], summary["period_start"]))
+                        if previous and previous.get("last_timestamp") == summary["last_timestamp"]:
+                            summary["last_ids"] = sorted(set(previous.get("last_ids", [])) | set(summary["last_ids"]))
+                        query, update = summary_update(summary)
+                        await self.summaries.update_one(query, update, upsert=True)
+                        report["summaries_upserted"] += 1
+                    report["reclaimed_bytes"] += await self._delete(chunk)
+                    report["compacted"] += len(chunk)
+        except Exception as e:
+            self.stats["errors"] += 1
+            report["error"] = str(e)
+            logging.error(f"Trade retention run failed: {e}")
+
+        size_after = await self._storage_size()
+        report["collection_size_before"] = size_before
+        report["collection_size_after"] = size_after
+        report["finished_at"] = datetime.utcnow()
+
+        self.stats["runs"] += 1
+        self.stats["archived"] += report["archived"]
+        self.stats["compacted"] += report["compacted"]
+        self.stats["reclaimed_bytes"] += report["reclaimed_bytes"]
+        self.last_report = report
+        return report
+
+    def snapshot(self):
+        return {"archive_dir": str(self.archive_dir), "last_report": self.last_report, **self.stats}
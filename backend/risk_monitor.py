@@ -0,0 +1,111 @@
+"""Tick-level enforcement of the TradingSettings risk limits
+
+The monitor keeps the stop-loss and take-profit levels of every open
+position, so checking a price tick is a dict lookup and two comparisons.
+It also gates LLM-driven trades on the confidence threshold. The daily trade
+cap is counted in the shared portfolio document (see portfolio_state.py), so
+it holds across workers; the monitor only holds the limit and reports blocks.
+It holds no I/O; server.py feeds it ticks and executes the exits.
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+STOP_LOSS = "stop_loss"
+TAKE_PROFIT = "take_profit"
+
+
+class PositionLevels(NamedTuple):
+    entry_price: float
+    stop_price: Optional[float]
+    take_price: Optional[float]
+
+
+class RiskMonitor:
+    def __init__(self, stop_loss_percentage=5.0, take_profit_percentage=10.0,
+                 max_trades_per_day=10, confidence_threshold=0.6):
+        self.stop_loss_percentage = stop_loss_percentage
+        self.take_profit_percentage = take_profit_percentage
+        self.max_trades_per_day = max_trades_per_day
+        self.confidence_threshold = confidence_threshold
+        self._positions: Dict[str, PositionLevels] = {}
+        self.stats = {"ticks": 0, STOP_LOSS: 0, TAKE_PROFIT: 0, "blocked_confidence": 0, "blocked_daily_cap": 0}
+
+    def configure(self, settings):
+        """Apply TradingSettings limits; levels of open positions are recomputed"""
+        self.stop_loss_percentage = settings.stop_loss_percentage
+        self.take_profit_percentage = settings.take_profit_percentage
+        self.max_trades_per_day = settings.max_trades_per_day
+        self.confidence_threshold = settings.confidence_threshold
+        for symbol, levels in list(self._positions.items()):
+            self.open_position(symbol, levels.entry_price)
+
+    def _levels(self, entry_price: float) -> PositionLevels:
+        stop = entry_price * (1 - self.stop_loss_percentage / 100) if self.stop_loss_percentage > 0 else None
+        take = entry_price * (1 + self.take_profit_percentage / 100) if self.take_profit_percentage > 0 else None
+        return PositionLevels(entry_price, stop, take)
+
+    def open_position(self, symbol: str, entry_price: float):
+        self._positions[symbol] = self._levels(entry_price)
+
+    def close_position(self, symbol: str):
+        self._positions.pop(symbol, None)
+
+    def sync_positions(self, entry_prices: Dict[str, float]):
+        """Track exactly the positions in `entry_prices` (symbol -> entry price)
+
+        Used when positions are opened or closed by another worker; levels of
+        unchanged positions are kept as they are.
+        """
+        for symbol in list(self._positions):
+            if symbol not in entry_prices:
+                del self._positions[symbol]
+        for symbol, entry_price in entry_prices.items():
+            levels = self._positions.get(symbol)
+            if levels is None or levels.entry_price != entry_price:
+                self.open_position(symbol, entry_price)
+
+    def has_open_positions(self) -> bool:
+        return bool(self._positions)
+
+    def on_tick(self, symbol: str, price: float) -> Optional[str]:
+        """Return STOP_LOSS or TAKE_PROFIT when `price` crosses a level of the open position
+
+        The position is closed in the monitor as soon as an exit fires, so a
+        burst of ticks triggers the exit only once.
+        """
+        self.stats["ticks"] += 1
+        levels = self._positions.get(symbol)
+        if levels is None:
+            return None
+        if levels.stop_price is not None and price <= levels.stop_price:
+            reason = STOP_LOSS
+        elif levels.take_price is not None and price >= levels.take_price:
+            reason = TAKE_PROFIT
+        else:
+            return None
+        del self._positions[symbol]
+        self.stats[reason] += 1
+        return reason
+
+    def check_decision(self, action: str, confidence: float) -> Tuple[bool, Optional[str]]:
+        """Whether an LLM-driven BUY/SELL passes the confidence gate; HOLD always passes"""
+        if action not in ("BUY", "SELL"):
+            return True, None
+        if confidence < self.confidence_threshold:
+            self.stats["blocked_confidence"] += 1
+            return False, f"{action} blocked: confidence {confidence:.2f} below threshold {self.confidence_threshold:.2f}"
+        return True, None
+
+    def daily_cap_blocked(self, action: str) -> str:
+        """Count a trade the portfolio refused at the daily cap; returns the reason to record"""
+        self.stats["blocked_daily_cap"] += 1
+        return f"{action} blocked: daily trade cap of {self.max_trades_per_day} reached"
+
+    def snapshot(self):
+        return {
+            "stop_loss_percentage": self.stop_loss_percentage,
+            "take_profit_percentage": self.take_profit_percentage,
+            "max_trades_per_day": self.max_trades_per_day,
+            "confidence_threshold": self.confidence_threshold,
+            "open_positions": {symbol: levels._asdict() for symbol, levels in self._positions.items()},
+            **self.stats,
+        }
@@ -0,0 +1,131 @@
+"""Fixed-cadence scheduler for the auto-trading loop
+
+Ticks are placed on a grid anchored at the first run (t0, t0 + interval,
+t0 + 2 * interval, ...), so the time a run takes never shifts later ticks.
+A per-tick random jitter delays the run inside its slot without moving the
+grid. When a run overruns one or more ticks, the missed-tick policy decides
+what happens next:
+
+    skip      drop the missed ticks and wait for the next future tick
+    catch_up  run the missed ticks back-to-back (at most `max_catch_up`)
+
+`configure()` wakes a sleeping scheduler, so a new interval takes effect
+immediately instead of after the current sleep.
+"""
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+MISSED_TICK_POLICIES = ("skip", "catch_up")
+
+
+class TickScheduler:
+    def __init__(self, job: Callable[[], Awaitable], interval: float, jitter: float = 0.0,
+                 missed_tick_policy: str = "skip", max_catch_up: int = 3,
+                 clock: Callable[[], float] = time.monotonic, seed: Optional[int] = None,
+                 lateness_window: int = 100):
+        self.job = job
+        self.max_catch_up = max_catch_up
+        self._clock = clock
+        self._random = random.Random(seed)
+        self._wake = asyncio.Event()
+        self._next_tick: Optional[float] = None  # grid time of the next run
+        self._last_tick: Optional[float] = None  # grid time of the last run
+        self._jitter_offset = 0.0
+        self._lateness = deque(maxlen=lateness_window)
+        self.stats = {"ticks": 0, "errors": 0, "skipped": 0, "caught_up": 0, "reschedules": 0,
+                      "last_duration": 0.0}
+        self.configure(interval, jitter, missed_tick_policy)
+
+    def configure(self, interval: float, jitter: float = 0.0, missed_tick_policy: str = "skip"):
+        """Apply new timing; a sleeping run loop re-plans its next tick right away"""
+        if interval <= 0:
+            raise ValueError(f"Scheduler interval must be positive, got {interval}")
+        if missed_tick_policy not in MISSED_TICK_POLICIES:
+            raise ValueError(f"Invalid missed tick policy: {missed_tick_policy}")
+        changed = (getattr(self, "interval", None), getattr(self, "jitter", None)) != (interval, jitter)
+        self.interval = float(interval)
+        self.jitter = max(0.0, min(float(jitter), self.interval))
+        self.missed_tick_policy = missed_tick_policy
+        if changed and self._last_tick is not None:
+            self._next_tick = self._last_tick + self.interval
+            self._jitter_offset = self._draw_jitter()
+            self.stats["reschedules"] += 1
+            self._wake.set()
+
+    def _draw_jitter(self) -> float:
+        return self._random.uniform(0, self.jitter) if self.jitter else 0.0
+
+    async def _sleep_until(self, deadline: float) -> bool:
+        """Sleep until `deadline`; returns False when woken early by configure()"""
+        delay = deadline - self._clock()
+        if delay <= 0:
+            return True
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), delay)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    async def run(self):
+        """Run the job on the grid until cancelled; the first run is immediate"""
+        self._next_tick = self._clock()
+        self._jitter_offset = 0.0
+        while True:
+            target = self._next_tick + self._jitter_offset
+            if not await self._sleep_until(target):
+                continue  # re-planned by configure()
+
+            started = self._clock()
+            self._lateness.append(max(0.0, started - target))
+            self._last_tick = self._next_tick
+            try:
+                await self.job()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logging.error(f"Scheduled job error: {e}")
+            self.stats["ticks"] += 1
+            self.stats["last_duration"] = self._clock() - started
+            self._advance(self._clock())
+
+    def _advance(self, now: float):
+        """Pick the next grid tick after a run finished at `now`"""
+        due = self._last_tick + self.interval
+        self._jitter_offset = self._draw_jitter()
+        if due >= now:
+            self._next_tick = due
+            return
+
+        missed = int(math.floor((now - due) / self.interval)) + 1
+        if self.missed_tick_policy == "catch_up":
+            replay = min(missed, self.max_catch_up)
+            if replay:
+                self.stats["caught_up"] += 1  # the run scheduled next is overdue
+            self.stats["skipped"] += missed - replay
+            self._next_tick = due + (missed - replay) * self.interval
+            self._jitter_offset = 0.0  # catch-up runs go immediately
+        else:
+            self.stats["skipped"] += missed
+            self._next_tick = due + missed * self.interval
+
+    def snapshot(self):
+        lateness = sorted(self._lateness)
+        next_run = self._next_tick + self._jitter_offset if self._next_tick is not None else None
+        return {
+            "interval_seconds": self.interval,
+            "jitter_seconds": self.jitter,
+            "missed_tick_policy": self.missed_tick_policy,
+            "next_run_in_seconds": max(0.0, next_run - self._clock()) if next_run is not None else None,
+            "lateness_seconds": {
+                "last": self._lateness[-1] if self._lateness else 0.0,
+                "p50": lateness[len(lateness) // 2] if lateness else 0.0,
+                "p95": lateness[min(len(lateness) - 1, int(len(lateness) * 0.95))] if lateness else 0.0,
+                "max": lateness[-1] if lateness else 0.0,
+            },
+            **self.stats,
+        }
@@ -0,0 +1,197 @@
+"""Pluggable sentiment scoring for headlines and posts
+
+A backend turns a batch of texts into polarities in [-1, 1] and labels the
+mean with its own neutral band:
+
+    lexicon   (default) VADER-style lexicon scorer with a crypto-tuned
+              lexicon. The batch is tokenized once and scored with numpy
+              lookups over precompiled arrays; no per-text objects.
+    textblob  TextBlob's pattern analyzer, one TextBlob per text
+
+Selected with SENTIMENT_BACKEND=lexicon | textblob.
+
+The lexicon scorer follows VADER's rules. Word valences are on a -4..4
+scale. A booster word ("sharply") just before a scored word adds 0.293 in
+that word's direction. A negation ("not", "isn't", "without") within the
+three words before a scored word scales it by -0.74. After "but", words
+count 1.5x and words before it count 0.5x. The sum s of a text is
+normalized to s / sqrt(s^2 + 15).
+"""
+import re
+from itertools import chain, repeat
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+POSITIVE = "Positive"
+NEGATIVE = "Negative"
+NEUTRAL = "Neutral"
+BACKENDS = ("lexicon", "textblob")
+
+BOOSTER_INCREMENT = 0.293
+NEGATION_SCALAR = -0.74
+NEGATION_WINDOW = 3
+NORMALIZATION_ALPHA = 15.0
+
+# word valence (-4..4); general sentiment words plus market and crypto vocabulary
+LEXICON_TEXT = """
+good 1.9  great 3.1  excellent 3.2  positive 2.6  best 3.2  better 1.9  strong 2.3  stronger 2.1
+strength 2.2  optimism 2.5  optimistic 2.3  confident 2.2  confidence 2.0  success 2.7  successful 2.8
+win 2.8  wins 2.7  winning 2.4  boost 1.7  boosts 1.7  boosted 1.5  support 1.7  supports 1.5
+bad -2.5  worse -2.1  worst -3.1  terrible -2.9  poor -2.1  negative -2.7  weak -1.9  weaker -1.9
+weakness -1.8  pessimism -2.0  pessimistic -2.1  fail -2.5  fails -2.3  failed -2.3  failure -2.6
+lose -2.1  loses -2.0  losing -2.0  lost -1.8  loss -2.0  losses -2.0  fear -2.2  fears -2.0  panic -2.6
+worry -1.9  worries -1.8  concern -1.4  concerns -1.4  uncertainty -1.4  uncertain -1.2  risk -0.9
+risks -0.9  risky -1.4  threat -2.4  threatens -2.2  warning -1.4  warns -1.5  warn -1.5  trouble -2.0
+bull 1.8  bulls 1.8  bullish 2.4  bear -1.8  bears -1.8  bearish -2.4  rally 2.0  rallies 2.0
+rallied 2.0  rallying 2.0  surge 2.1  surges 2.1  surged 2.1  surging 2.1  soar 2.3  soars 2.3
+soared 2.3  soaring 2.3  jump 1.6  jumps 1.6  jumped 1.6  climb 1.4  climbs 1.4  climbed 1.4
+gain 1.6  gains 1.6  gained 1.6  rise 1.3  rises 1.3  rising 1.3  rose 1.3  rebound 1.8
+rebounds 1.8  rebounded 1.8  recover 1.5  recovers 1.5  recovered 1.5  recovery 1.6  breakout 1.9
+high 0.8  highs 1.0  ath 2.4  record 0.9  moon 2.2  mooning 2.4  pump 0.9  hodl 0.8  inflows 1.5
+inflow 1.5  adoption 1.8  adopt 1.4  adopts 1.4  approval 2.0  approve 1.7  approves 1.8
+approved 1.9  upgrade 1.5  upgrades 1.5  partnership 1.5  launch 0.8  launches 0.8  growth 1.7
+grow 1.3  grows 1.3  growing 1.3  outperform 1.9  outperforms 1.9  profit 1.9  profits 1.9
+profitable 2.1  steady 0.6  steadies 0.6  stable 0.9  resilient 1.7  upbeat 2.0  demand 0.6
+crash -3.0  crashes -3.0  crashed -3.0  crashing -3.0  plunge -2.7  plunges -2.7  plunged -2.7
+plunging -2.7  tumble -2.3  tumbles -2.3  tumbled -2.3  slump -2.2  slumps -2.2  slumped -2.2
+slide -1.5  slides -1.5  slid -1.5  drop -1.4  drops -1.4  dropped -1.4  fall -1.4  falls -1.4
+fell -1.4  falling -1.5  decline -1.5  declines -1.5  declined -1.5  sink -1.7  sinks -1.7
+sank -1.7  slip -1.1  slips -1.1  slipped -1.1  dip -0.9  dips -0.9  low -0.8  lows -1.0
+selloff -2.3  dump -2.2  dumps -2.2  dumping -2.2  liquidation -2.0  liquidations -2.0
+liquidated -2.2  outflows -1.5  outflow -1.5  downturn -2.0  correction -1.1  volatility -0.8
+volatile -1.0  hack -2.8  hacked -2.9  hackers -2.4  exploit -2.5  exploited -2.6  theft -2.8
+stolen -2.7  scam -3.0  scams -2.9  fraud -3.1  rug -2.6  ponzi -3.0  collapse -3.1  collapses -3.1
+collapsed -3.1  bankrupt -3.0  bankruptcy -3.0  insolvent -2.9  insolvency -2.9  default -2.0
+outage -2.0  halt -1.6  halts -1.6  halted -1.6  delay -1.1  delays -1.1  delayed -1.1  ban -2.3
+bans -2.3  banned -2.4  crackdown -2.3  lawsuit -2.0  sues -2.0  sued -2.0  probe -1.3
+fined -1.9  penalty -1.8  charges -1.5  charged -1.6  arrest -2.2  arrested -2.3  fud -2.0
+bubble -1.6  capitulation -2.4  sell -0.6  selling -0.8  underperform -1.7  underperforms -1.7
+"""
+
+NEGATORS = {
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without", "cannot", "hardly",
+    "isn't", "aren't", "wasn't", "weren't", "don't", "doesn't", "didn't", "can't", "won't", "wouldn't",
+    "couldn't", "shouldn't", "hasn't", "haven't", "hadn't", "ain't",
+}
+BOOSTERS = {
+    "very", "extremely", "sharply", "hugely", "massive", "massively", "huge", "significantly", "strongly",
+    "deeply", "highly", "incredibly", "biggest", "sharp", "steep", "steeply", "major", "most",
+}
+CONTRASTS = {"but", "however", "yet"}
+
+TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def parse_lexicon(text: str) -> Dict[str, float]:
+    fields = text.split()
+    return {word: float(value) for word, value in zip(fields[::2], fields[1::2])}
+
+
+def sentiment_label(polarity: float, threshold: float = 0.1) -> str:
+    if polarity > threshold:
+        return POSITIVE
+    if polarity < -threshold:
+        return NEGATIVE
+    return NEUTRAL
+
+
+class SentimentBackend:
+    name = "base"
+    threshold = 0.1  # |mean polarity| at or below this is Neutral
+
+    def score_batch(self, texts: Sequence[str]) -> List[float]:
+        raise NotImplementedError
+
+    def label(self, polarity: float) -> str:
+        return sentiment_label(polarity, self.threshold)
+
+    def overall(self, texts: Sequence[str]) -> str:
+        """Label of the mean polarity of `texts` (Neutral if there are none)"""
+        if not texts:
+            return NEUTRAL
+        scores = self.score_batch(texts)
+        return self.label(sum(scores) / len(scores))
+
+
+class LexiconBackend(SentimentBackend):
+    name = "lexicon"
+    threshold = 0.05  # VADER's neutral band for the normalized score
+
+    def __init__(self, lexicon: Dict[str, float] = None):
+        lexicon = dict(lexicon if lexicon is not None else parse_lexicon(LEXICON_TEXT))
+        vocabulary = sorted(set(lexicon) | NEGATORS | BOOSTERS | CONTRASTS)
+        # id 0 is every word outside the vocabulary
+        self._ids = {word: i for i, word in enumerate(vocabulary, start=1)}
+        size = len(vocabulary) + 1
+        self._valence = np.zeros(size)
+        self._negator = np.zeros(size, dtype=bool)
+        self._booster = np.zeros(size)
+        self._contrast = np.zeros(size, dtype=np.int64)
+        for word, i in self._ids.items():
+            self._valence[i] = lexicon.get(word, 0.0)
+            self._negator[i] = word in NEGATORS
+            self._booster[i] = BOOSTER_INCREMENT if word in BOOSTERS else 0.0
+            self._contrast[i] = word in CONTRASTS
+
+    def score_batch(self, texts: Sequence[str]) -> List[float]:
+        count = len(texts)
+        if not count:
+            return []
+        token_lists = [TOKEN.findall(text.lower().replace("’", "'")) for text in texts]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=count)
+        total = int(lengths.sum())
+        if not total:
+            return [0.0] * count
+        ids = np.fromiter(map(self._ids.get, chain.from_iterable(token_lists), repeat(0)),
+                          dtype=np.int64, count=total)
+        doc = np.repeat(np.arange(count), lengths)
+        same_doc = doc[1:] == doc[:-1]
+
+        valence = self._valence[ids]
+        # A booster raises the magnitude of the word right after it
+        boost = np.zeros(total)
+        boost[1:] = self._booster[ids[:-1]] * same_doc
+        valence = valence + np.sign(valence) * boost
+        # A negation flips and damps words up to NEGATION_WINDOW after it
+        negator = self._negator[ids]
+        negated = np.zeros(total, dtype=bool)
+        for k in range(1, NEGATION_WINDOW + 1):
+            if k < total:
+                negated[k:] |= negator[:-k] & (doc[k:] == doc[:-k])
+        valence = np.where(negated, valence * NEGATION_SCALAR, valence)
+        # Words after a contrast count more, words before it less
+        contrast = self._contrast[ids]
+        seen = np.cumsum(contrast)
+        offsets = np.cumsum(lengths) - lengths
+        before_doc = np.concatenate(([0], seen))[offsets]
+        after = (seen - before_doc[doc]) > 0
+        has_contrast = np.bincount(doc, weights=contrast, minlength=count) > 0
+        weight = np.where(after, 1.5, np.where(has_contrast[doc], 0.5, 1.0))
+
+        sums = np.bincount(doc, weights=valence * weight, minlength=count)
+        return (sums / np.sqrt(sums * sums + NORMALIZATION_ALPHA)).tolist()
+
+
+class TextBlobBackend(SentimentBackend):
+    name = "textblob"
+    threshold = 0.1
+
+    def __init__(self, module=None):
+        self._module = module  # textblob, or a lazy stand-in for it; imported on first use if None
+
+    def score_batch(self, texts: Sequence[str]) -> List[float]:
+        if self._module is None:
+            import textblob
+            self._module = textblob
+        blob = self._module.TextBlob
+        return [blob(text).sentiment.polarity for text in texts]
+
+
+def create_backend(name: str = "lexicon", textblob_module=None) -> SentimentBackend:
+    name = (name or "lexicon").lower()
+    if name == "lexicon":
+        return LexiconBackend()
+    if name == "textblob":
+        return TextBlobBackend(textblob_module)
+    raise ValueError(f"Invalid SENTIMENT_BACKEND: {name} (expected one of {BACKENDS})")
@@ -1,4 +1,7 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks
+import lazy_imports
+
+lazy_imports.start_tracking()  # per-package import times, reported at startup
+from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -6,30 +9,73 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Literal, NamedTuple
 import uuid
 from datetime import datetime, timedelta
-import json
+import time
 import asyncio
 import aiohttp
-from emergentintegrations.llm.chat import LlmChat, UserMessage
-import tweepy
-import feedparser
-from bs4 import BeautifulSoup
-from textblob import TextBlob
 import re
 from collections import defaultdict
+from llm_cassette import LLMCassette
+from llm_parsing import LLMOutputError, ParseStats, parse_llm_output
+from openai_chat import OpenAICompatibleChat, PlainMessage
+from metrics import CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE, LAG_BUCKETS, EventLoopLagMonitor, MetricsRegistry, MongoCommandTimer
+from circuit_breaker import STATE_CODES, CircuitBreaker, SourceUnavailable, UpstreamSource
+from rate_limiter import LANE_DASHBOARD, LANE_TRADING, Lane, RateLimiter
+from compression import CompressionMiddleware, CompressionStats
+from fast_json import FastJSONResponse, construct_many
+from leader_election import LeaderLease, LocalLease
+from portfolio_state import PortfolioManager
+from profiling import ProfileStore, ProfilingMiddleware
+from retention import RetentionJob
+from risk_monitor import RiskMonitor
+from scheduler import TickScheduler
+from tweet_ingest import ReplayTweetSource, SentimentWindow, TweetIngestor, TwitterSearchSource
+from trade_store import SUMMARY_PROJECTION, TradeStore
+from write_behind import WriteBehindQueue
+from news_feed import Headline, NewsFeed, headline_key
+from sentiment import create_backend as create_sentiment_backend
+from shared_state import MemoryHistoryStore, MemoryStateStore, MongoHistoryStore, MongoStateStore, backend_from_env
+from prompt_builder import PromptBuilder, compact_list, compact_text, summarize_series
+lazy_imports.stop_tracking()
+
+# Heavy optional dependencies, imported on first use
+llm_chat = lazy_imports.lazy_import("emergentintegrations.llm.chat")
+tweepy = lazy_imports.lazy_import("tweepy")
+feedparser = lazy_imports.lazy_import("feedparser")
+textblob = lazy_imports.lazy_import("textblob")
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Latency histograms and gauges, served in Prometheus format at /api/metrics/prom
+metrics_registry = MetricsRegistry()
+stage_latency = metrics_registry.histogram(
+    "trading_stage_duration_seconds", "Wall time of each market data and trading pipeline stage", ["stage"]
+)
+mongo_latency = metrics_registry.histogram(
+    "mongo_command_duration_seconds", "Duration of MongoDB commands", ["command", "collection"]
+)
+mongo_failures = metrics_registry.counter(
+    "mongo_command_failures_total", "MongoDB commands that failed", ["command", "collection"]
+)
+event_loop_lag = EventLoopLagMonitor(metrics_registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping task", buckets=LAG_BUCKETS
+))
+
+# MongoDB connection (every command is timed by the listener)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+if mongo_url.startswith("memory://"):
+    # In-process stand-in for offline benchmarks and load tests (benchmarks/load.py)
+    from benchmarks.memory_mongo import MemoryMongoClient
+    client = MemoryMongoClient(mongo_url)
+else:
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandTimer(mongo_latency, mongo_failures)])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -48,6 +94,7 @@ class ChainOfThought(BaseModel):
 class TradeResult(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    symbol: str = "BTC"
     price: float
     decision: str
     confidence: float
@@ -59,6 +106,24 @@ class TradeResult(BaseModel):
     chain_of_thought: Optional[Dict[str, Any]] = None
     news_sentiment: Optional[str] = None
     twitter_sentiment: Optional[str] = None
+    prompt_tokens: Optional[Dict[str, int]] = None
+    risk_blocked: Optional[str] = None
+
+class TradeSummary(BaseModel):
+    """Trade without reasoning, chain of thought, verdict and evidence; see /trade/{trade_id}"""
+    id: str
+    timestamp: datetime
+    symbol: str = "BTC"
+    price: float
+    decision: str
+    confidence: float
+    is_valid: bool = True
+    profit_loss: Optional[float] = None
+    news_sentiment: Optional[str] = None
+    twitter_sentiment: Optional[str] = None
+    prompt_tokens: Optional[Dict[str, int]] = None
+    risk_blocked: Optional[str] = None
+    evidence_count: int = 0
 
 class TradeResultCreate(BaseModel):
     price: float
@@ -73,6 +138,7 @@ class VerificationResult(BaseModel):
     issues: List[str]
 
 class MarketData(BaseModel):
+    symbol: str = "BTC"
     price: float
     volume: float
     rsi: float
@@ -81,6 +147,13 @@ class MarketData(BaseModel):
     news_sentiment: str
     twitter_sentiment: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # "live", "stale" (last good value while the upstream is failing) or "fallback"/"unavailable"
+    price_source: str = "live"
+    price_age_seconds: Optional[float] = None
+    news_source: str = "live"
+    news_age_seconds: Optional[float] = None
+    news_generation: int = 0  # bumped by every fetch that brought unseen headlines
+    news_digest: str = ""  # identifies the current headlines, the same in every worker
 
 class TradingMetrics(BaseModel):
     total_trades: int
@@ -98,6 +171,7 @@ class ChartDataPoint(BaseModel):
 
 class TradeMarker(BaseModel):
     timestamp: datetime
+    symbol: str = "BTC"
     price: float
     decision: str
     confidence: float
@@ -111,6 +185,8 @@ class PortfolioSnapshot(BaseModel):
     usd_balance: float
     btc_amount: float
     btc_value: float
+    asset_amounts: Dict[str, float] = Field(default_factory=dict)
+    asset_values: Dict[str, float] = Field(default_factory=dict)
 
 class ChartData(BaseModel):
     price_history: List[ChartDataPoint]
@@ -118,12 +194,21 @@ class ChartData(BaseModel):
     portfolio_history: List[PortfolioSnapshot]
     sentiment_timeline: List[Dict[str, Any]]
     timeframe: str
+    symbol: str = "BTC"
     last_updated: datetime = Field(default_factory=datetime.utcnow)
 
+class BatchTradeResult(BaseModel):
+    results: Dict[str, TradeResult] = Field(default_factory=dict)
+    errors: Dict[str, str] = Field(default_factory=dict)
+    batches: int = 0
+
 class TradingSettings(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     initial_portfolio_value: float = 1000.0
-    auto_trading_interval_minutes: int = 5
+    tracked_symbols: List[str] = Field(default_factory=lambda: ["BTC"])
+    auto_trading_interval_minutes: int = Field(5, ge=1)
+    auto_trading_jitter_seconds: float = Field(0.0, ge=0)
+    auto_trading_missed_tick_policy: Literal["skip", "catch_up"] = "skip"
     price_history_limit: int = 100
     portfolio_snapshots_limit: int = 100
     sentiment_history_limit: int = 50
@@ -133,20 +218,96 @@ class TradingSettings(BaseModel):
     max_trades_per_day: int = 10
     stop_loss_percentage: float = 5.0
     take_profit_percentage: float = 10.0
+    decision_prompt_token_budget: int = 700
+    verification_prompt_token_budget: int = 500
+    llm_batch_size: int = 5
+    llm_batch_concurrency: int = 2
+    llm_skip_price_change_percentage: float = 1.0  # with no new news, re-ask the LLM only past this move (0 = always ask)
+    risk_tick_interval_seconds: int = 15
+    hold_compaction_after_days: int = Field(7, ge=0, le=3650)  # HOLD rows older than this are folded into summaries (0 = never)
+    hold_summary_period_hours: int = Field(24, ge=1, le=24)  # summary buckets are aligned to midnight UTC
+    trade_archive_after_days: int = Field(90, ge=0, le=3650)  # trades older than this move to compressed files (0 = never)
+    trade_summary_ttl_days: int = Field(365, ge=0, le=3650)  # 0 = keep summaries forever
+    retention_interval_minutes: int = Field(60, ge=1, le=1440)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Supported assets: trading symbol -> CoinGecko id
+SUPPORTED_ASSETS = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "SOL": "solana",
+    "BNB": "binancecoin",
+    "XRP": "ripple",
+    "ADA": "cardano",
+    "DOGE": "dogecoin",
+}
+DEFAULT_SYMBOL = "BTC"
+FALLBACK_PRICES = {"BTC": 45000.0, "ETH": 2500.0, "SOL": 100.0}
+
+# State shared by all API workers: "memory" for a single worker, "mongo" for uvicorn --workers N
+SHARED_STATE_BACKEND = backend_from_env()
+if SHARED_STATE_BACKEND == "mongo":
+    state_store = MongoStateStore(db.shared_state)
+    price_history_store = MongoHistoryStore(
+        db.shared_history, "price", encode=lambda point: point.dict(), decode=lambda doc: ChartDataPoint(**doc)
+    )
+    sentiment_history_store = MongoHistoryStore(db.shared_history, "sentiment")
+    # Only the lease holder runs the auto-trading scheduler and the risk tick monitor
+    leader_lease = LeaderLease(db.leases, ttl_seconds=float(os.environ.get("LEADER_LEASE_TTL_SECONDS", 30)))
+else:
+    state_store = MemoryStateStore()
+    price_history_store = MemoryHistoryStore()
+    sentiment_history_store = MemoryHistoryStore()
+    leader_lease = LocalLease()
+
 # Global variables for trading state
-current_portfolio_value = 1000.0  # Starting with $1000 USDT - Will be loaded from settings
-current_btc_amount = 0.0
-last_trade_price = 0.0
-auto_trading_enabled = False
+# USD balance, holdings, last trade prices and portfolio snapshots; all
+# mutations are serialized through the manager, reads use portfolio.state
+portfolio = PortfolioManager(
+    1000.0,  # Starting with $1000 USDT - Will be loaded from settings
+    store=state_store if SHARED_STATE_BACKEND == "mongo" else None,
+    decode_snapshot=lambda doc: PortfolioSnapshot(**doc)
+)
+# Trades are stored as a compact summary plus a detail document loaded only by /trade/{trade_id}
+trade_store = TradeStore(db)
+
+# Trade documents are written behind the request path in insert_many batches
+trade_writer = WriteBehindQueue(
+    trade_store,
+    max_batch=int(os.environ.get("TRADE_WRITE_BATCH_SIZE", 100)),
+    flush_interval=float(os.environ.get("TRADE_WRITE_FLUSH_MS", 500)) / 1000,
+    max_queue=int(os.environ.get("TRADE_WRITE_MAX_QUEUE", 10000)),
+    max_retries=int(os.environ.get("TRADE_WRITE_MAX_RETRIES", 5)),
+    dead_letter_path=os.environ.get("TRADE_DEAD_LETTER_FILE", ROOT_DIR / "dead_letter" / "trades.jsonl")
+)
+# Archives and compacts old trades; runs on the leader
+retention_job = RetentionJob(db, os.environ.get("TRADE_ARCHIVE_DIR", ROOT_DIR / "archive"), trade_store=trade_store)
+retention_task = None
+# Per-route compression ratio and CPU cost, filled by CompressionMiddleware
+compression_stats = CompressionStats()
+# Opt-in per-request sampling profiles (PROFILING_ENABLED), kept in a bounded directory
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+profile_store = ProfileStore(
+    os.environ.get("PROFILE_DIR", ROOT_DIR / "profiles"),
+    max_profiles=int(os.environ.get("PROFILE_MAX_COUNT", 50)),
+    max_bytes=int(float(os.environ.get("PROFILE_MAX_MB", 50)) * 1024 * 1024)
+)
+profiling_stats = {}
+# Import-time breakdown, filled in once startup completes
+startup_report = None
+AUTO_TRADING_KEY = "auto_trading"  # shared on/off flag; the leader runs the scheduler
 auto_trading_task = None
+leader_task = None
 trading_settings = None  # Will be loaded from database
 
+# Stop-loss/take-profit exits and trade gating, checked on every price tick
+risk_monitor = RiskMonitor()
+risk_tick_task = None
+
 # Store historical data for charts and technical analysis
-price_history = []
-portfolio_snapshots = []
+# Local copies of the shared histories, refreshed on every append and read
+price_histories = defaultdict(list)  # symbol -> List[ChartDataPoint]
 sentiment_history = []
 rsi_price_history = []  # Dedicated for RSI calculation (stores last 14+ prices)
 
@@ -154,28 +315,152 @@ rsi_price_history = []  # Dedicated for RSI calculation (stores last 14+ prices)
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 TWITTER_API_KEY = os.environ.get('TWITTER_API_KEY')
 TWITTER_API_SECRET = os.environ.get('TWITTER_API_SECRET')
+TWITTER_BEARER_TOKEN = os.environ.get('TWITTER_BEARER_TOKEN')  # recent search needs app auth
 COINDESK_API_KEY = os.environ.get('COINDESK_API_KEY')
 
-# Twitter API Setup
+# Upstream endpoints (overridden by the load-test suite to point at local stubs)
+COINGECKO_API_URL = os.environ.get('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
+COINDESK_RSS_URL = os.environ.get('COINDESK_RSS_URL', 'https://www.coindesk.com/arc/outboundfeeds/rss/')
+LLM_API_BASE = os.environ.get('LLM_API_BASE')  # OpenAI-compatible endpoint used instead of LlmChat
+
+# Upstream health: per-request timeout, and a circuit breaker per source that
+# serves the last good value while the source is failing
+UPSTREAM_TIMEOUT_SECONDS = float(os.environ.get('UPSTREAM_TIMEOUT_SECONDS', 5))
+UPSTREAM_FAILURE_THRESHOLD = int(os.environ.get('UPSTREAM_FAILURE_THRESHOLD', 3))
+UPSTREAM_RESET_SECONDS = float(os.environ.get('UPSTREAM_RESET_SECONDS', 30))
+UPSTREAM_CLIENT_TIMEOUT = aiohttp.ClientTimeout(total=UPSTREAM_TIMEOUT_SECONDS)
+# Shared call budget per upstream (CoinGecko's free tier allows only a few calls per minute);
+# the trading pipeline and risk ticks get tokens ahead of dashboard refreshes
+COINGECKO_RATE_PER_MINUTE = float(os.environ.get('COINGECKO_RATE_PER_MINUTE', 10))
+COINGECKO_BURST = int(os.environ.get('COINGECKO_BURST', 3))
+COINDESK_RATE_PER_MINUTE = float(os.environ.get('COINDESK_RATE_PER_MINUTE', 30))
+COINDESK_BURST = int(os.environ.get('COINDESK_BURST', 5))
+# Quotes younger than this are shared by every reader without another call
+COINGECKO_FRESH_SECONDS = float(os.environ.get('COINGECKO_FRESH_SECONDS', 5))
+# The trading lane waits for a token only when its cached value is older than UPSTREAM_TRADING_REUSE_SECONDS
+UPSTREAM_LANES = {
+    LANE_TRADING: Lane(0, float(os.environ.get('UPSTREAM_TRADING_MAX_WAIT_SECONDS', 10)),
+                       reuse_within=float(os.environ.get('UPSTREAM_TRADING_REUSE_SECONDS', 60))),
+    LANE_DASHBOARD: Lane(1, float(os.environ.get('UPSTREAM_DASHBOARD_MAX_WAIT_SECONDS', 1)), stale_ok=True),
+}
+
+# LLM models
+LLM_PROVIDER = "openai"
+TRADING_LLM_MODEL = "gpt-4-turbo"
+VERIFICATION_LLM_MODEL = "gpt-4-turbo"
+REPAIR_LLM_MODEL = "gpt-4o-mini"  # Cheap model, only used to fix malformed JSON
+TRADING_ACTIONS = ("BUY", "SELL", "HOLD")
+
+# Parse success counters per LLM model
+parse_stats = ParseStats()
+
+# Record/replay of LLM calls (LLM_CASSETTE_MODE=record|replay)
+llm_cassette = LLMCassette.from_env()
+
+def history_sizes():
+    sizes = {("price", symbol): len(history) for symbol, history in price_histories.items()}
+    sizes[("sentiment", "all")] = len(sentiment_history)
+    sizes[("portfolio_snapshots", "all")] = len(portfolio.state.snapshots)
+    return sizes
+
+def cache_hit_ratios():
+    lookups = llm_cassette.stats["hits"] + llm_cassette.stats["misses"]
+    return {("llm_cassette",): llm_cassette.stats["hits"] / lookups if lookups else None}
+
+metrics_registry.gauge("history_points", "Points held in the in-memory histories", history_sizes, ["history", "symbol"])
+metrics_registry.gauge("cache_hit_ratio", "Share of lookups answered from cache", cache_hit_ratios, ["cache"])
+metrics_registry.gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample", lambda: event_loop_lag.last_lag)
+upstream_throttled = metrics_registry.counter(
+    "upstream_throttled_total", "Upstream calls that found the rate limit bucket empty", ["source", "lane"]
+)
+metrics_registry.gauge("upstream_circuit_state", "Upstream circuit breaker state (0 closed, 1 half-open, 2 open)",
+                       lambda: {(source.name,): STATE_CODES[source.breaker.state] for source in upstream_sources},
+                       ["source"])
+
+# Headline and post sentiment: SENTIMENT_BACKEND=lexicon (default, batched numpy scorer) | textblob
+sentiment_backend = create_sentiment_backend(os.environ.get('SENTIMENT_BACKEND', 'lexicon'), textblob)
+
+# Headlines are processed incrementally: only those not seen within NEWS_SEEN_TTL_HOURS
+# are scored and emitted as "new news" events (tracked per worker; decisions compare news_feed.digest())
+news_feed = NewsFeed(
+    sentiment_backend,
+    seen_size=int(os.environ.get('NEWS_SEEN_SIZE', 2000)),
+    seen_ttl=float(os.environ.get('NEWS_SEEN_TTL_HOURS', 24)) * 3600,
+    max_events=int(os.environ.get('NEWS_EVENTS_LIMIT', 200))
+)
+news_headlines_new = metrics_registry.counter("news_headlines_new_total", "Headlines seen for the first time")
+llm_decisions_skipped = metrics_registry.counter(
+    "llm_decisions_skipped_total", "Decisions not sent to the LLM because nothing changed since the last one", ["pipeline"]
+)
+
+# Twitter API Setup (built on first use; importing tweepy is slow)
 twitter_client = None
-if TWITTER_API_KEY and TWITTER_API_SECRET:
-    try:
-        twitter_client = tweepy.Client(
-            bearer_token=None,
-            consumer_key=TWITTER_API_KEY,
-            consumer_secret=TWITTER_API_SECRET,
-            access_token=None,
-            access_token_secret=None,
-            wait_on_rate_limit=True
+
+def get_twitter_client():
+    global twitter_client
+    if twitter_client is None and (TWITTER_BEARER_TOKEN or (TWITTER_API_KEY and TWITTER_API_SECRET)):
+        try:
+            twitter_client = tweepy.Client(
+                bearer_token=TWITTER_BEARER_TOKEN,
+                consumer_key=TWITTER_API_KEY,
+                consumer_secret=TWITTER_API_SECRET,
+                access_token=None,
+                access_token_secret=None,
+                wait_on_rate_limit=False  # the ingestion worker backs off through its rate limiter
+            )
+        except Exception as e:
+            logging.warning(f"Twitter API initialization failed: {e}")
+    return twitter_client
+
+# Twitter/X sentiment: a leader-only worker polls recent posts into a rolling
+# window; ticks read its aggregate. TWITTER_REPLAY_FILE replays recorded posts
+# instead (offline runs), TWITTER_RECORD_FILE records what the API returns.
+TWITTER_SENTIMENT_KEY = "twitter_sentiment"  # aggregate published for the other workers
+TWITTER_POLL_SECONDS = float(os.environ.get('TWITTER_POLL_SECONDS', 60))
+TWITTER_PROMPT_TWEETS = int(os.environ.get('TWITTER_PROMPT_TWEETS', 5))
+twitter_window = SentimentWindow(
+    max_size=int(os.environ.get('TWITTER_BUFFER_SIZE', 1000)),
+    window_seconds=float(os.environ.get('TWITTER_WINDOW_MINUTES', 60)) * 60,
+    threshold=sentiment_backend.threshold
+)
+twitter_limiter = RateLimiter("twitter", float(os.environ.get('TWITTER_RATE_PER_MINUTE', 1)), 1,
+                              UPSTREAM_LANES, throttled=upstream_throttled)
+twitter_task = None
+
+def build_tweet_source():
+    replay_file = os.environ.get('TWITTER_REPLAY_FILE')
+    if replay_file:
+        return ReplayTweetSource(replay_file, per_poll=int(os.environ.get('TWITTER_REPLAY_PER_POLL', 20)))
+    if TWITTER_BEARER_TOKEN:
+        return TwitterSearchSource(
+            get_twitter_client(),
+            os.environ.get('TWITTER_QUERY', '(bitcoin OR btc OR ethereum OR crypto) -is:retweet lang:en'),
+            max_results=int(os.environ.get('TWITTER_MAX_RESULTS', 50)),
+            record_path=os.environ.get('TWITTER_RECORD_FILE')
         )
-    except Exception as e:
-        logging.warning(f"Twitter API initialization failed: {e}")
+    return None
 
 # Initialize LLM chats
+def build_chat(role, system_message, model):
+    """Create an LLM chat, routed through the record/replay cassette when enabled"""
+    chat = None
+    if LLM_API_BASE:
+        chat = OpenAICompatibleChat(LLM_API_BASE, model, system_message, api_key=OPENAI_API_KEY)
+    elif OPENAI_API_KEY:
+        chat = llm_chat.LlmChat(
+            api_key=OPENAI_API_KEY,
+            session_id=f"crypto-{role}-{uuid.uuid4()}",
+            system_message=system_message
+        ).with_model(LLM_PROVIDER, model)
+    return llm_cassette.wrap(chat, role, model, system_message)
+
+def make_user_message(text):
+    """Message for send_message; only LlmChat needs its own UserMessage type"""
+    if LLM_API_BASE or llm_cassette.mode == "replay":
+        return PlainMessage(text=text)
+    return llm_chat.UserMessage(text=text)
+
 def create_trading_chat():
-    if not OPENAI_API_KEY:
-        return None
-    
     system_message = """You are a crypto trading decision assistant. Always respond with structured JSON output containing your Chain of Thought reasoning and final trading decision.
 
 Analyze the provided market data including price, volume, RSI, news, tweets, and sentiment analysis. Make a trading decision based on technical analysis, news sentiment, and social media sentiment.
@@ -202,16 +487,9 @@ Rules:
 - Consider news sentiment and social media sentiment heavily
 - Factor in technical indicators (RSI, volume, price trends)"""
     
-    return LlmChat(
-        api_key=OPENAI_API_KEY,
-        session_id=f"crypto-trading-{uuid.uuid4()}",
-        system_message=system_message
-    ).with_model("openai", "gpt-4-turbo")
+    return build_chat("trading", system_message, TRADING_LLM_MODEL)
 
 def create_verification_chat():
-    if not OPENAI_API_KEY:
-        return None
-    
     system_message = """You are a crypto trading decision verifier. Review the trading decision and evidence to determine if it's valid.
 
 Check for:
@@ -229,111 +507,424 @@ Format your response as valid JSON:
 
 Only respond with valid JSON."""
     
-    return LlmChat(
-        api_key=OPENAI_API_KEY,
-        session_id=f"crypto-verification-{uuid.uuid4()}",
-        system_message=system_message
-    ).with_model("openai", "gpt-4-turbo")
+    return build_chat("verification", system_message, VERIFICATION_LLM_MODEL)
+
+def create_batch_trading_chat():
+    system_message = """You are a crypto trading decision assistant. You receive market data for several assets at once and must make an independent decision for each asset. Always respond with structured JSON output containing your Chain of Thought reasoning and final trading decision per asset.
+
+Format your response as valid JSON, with one entry per asset symbol you were given:
+{
+  "decisions": {
+    "BTC": {
+      "chain_of_thought": {
+        "market_analysis": "your technical analysis here",
+        "risk_assessment": "risk evaluation",
+        "reasoning_steps": ["step 1", "step 2", "step 3"]
+      },
+      "trading_decision": {
+        "action": "BUY|SELL|HOLD",
+        "confidence": 0.85,
+        "reasoning": "final decision reasoning"
+      }
+    }
+  }
+}
+
+Rules:
+- Only respond with valid JSON
+- Include every asset symbol exactly once
+- Confidence should be between 0.0 and 1.0
+- Action must be exactly BUY, SELL, or HOLD
+- Base decisions on provided data only
+- Consider news sentiment and social media sentiment heavily
+- Factor in technical indicators (RSI, volume, price trends)"""
+    
+    return build_chat("batch-trading", system_message, TRADING_LLM_MODEL)
+
+def create_batch_verification_chat():
+    system_message = """You are a crypto trading decision verifier. Review the trading decision and evidence for each asset to determine if it's valid.
+
+Check for:
+- Logical consistency between evidence and decision
+- No hallucinated facts
+- Reasonable confidence levels
+- Sound reasoning considering sentiment analysis
+
+Format your response as valid JSON, with one entry per asset symbol you were given:
+{
+  "verifications": {
+    "BTC": {
+      "is_valid": true,
+      "verdict": "Reasoning is sound and well-supported",
+      "issues": []
+    }
+  }
+}
+
+Only respond with valid JSON."""
+    
+    return build_chat("batch-verification", system_message, VERIFICATION_LLM_MODEL)
+
+def create_repair_chat():
+    system_message = """You repair malformed JSON produced by another model. Return only the corrected JSON object that matches the requested schema, keeping the original values. Do not add commentary or markdown."""
+    
+    return build_chat("repair", system_message, REPAIR_LLM_MODEL)
+
+# Structured output parsing
+TRADING_RESPONSE_SCHEMA = """{"chain_of_thought": {"market_analysis": str, "risk_assessment": str, "reasoning_steps": [str]}, "trading_decision": {"action": "BUY|SELL|HOLD", "confidence": float 0.0-1.0, "reasoning": str}}"""
+
+def validate_trading_response(payload):
+    """Validate a decision LLM payload against TradingDecision and ChainOfThought"""
+    decision = TradingDecision(**payload["trading_decision"])
+    decision.action = decision.action.strip().upper()
+    if decision.action not in TRADING_ACTIONS:
+        raise ValueError(f"Invalid action: {decision.action}")
+    decision.confidence = max(0.0, min(1.0, decision.confidence))
+    chain_of_thought = ChainOfThought(**payload["chain_of_thought"])
+    return decision.dict(), chain_of_thought.dict()
+
+def validate_verification_response(payload):
+    """Validate a verifier LLM payload against VerificationResult"""
+    return VerificationResult(**payload).dict()
+
+def validate_per_symbol(key, validate):
+    """Build a validator for a {key: {symbol: payload}} batch response
+
+    Each symbol is validated independently, so one malformed entry only fails
+    that symbol. Invalid entries are returned as error strings.
+    """
+    def validate_batch(payload):
+        entries = payload[key]
+        if not isinstance(entries, dict):
+            raise ValueError(f"'{key}' must be an object keyed by symbol")
+        results = {}
+        for symbol, entry in entries.items():
+            try:
+                results[str(symbol).upper()] = validate(entry)
+            except Exception as e:
+                results[str(symbol).upper()] = f"Invalid entry: {e}"
+        return results
+    return validate_batch
+
+BATCH_TRADING_RESPONSE_SCHEMA = f"""{{"decisions": {{"<SYMBOL>": {TRADING_RESPONSE_SCHEMA}}}}}"""
+
+async def parse_llm_response(llm_response, validate, model_name, schema=None):
+    """Parse an LLM response, re-prompting a cheap repair model only if extraction fails"""
+    try:
+        result = parse_llm_output(llm_response, validate)
+        parse_stats.record(model_name, "parsed")
+        return result
+    except LLMOutputError as e:
+        logging.warning(f"Could not parse {model_name} response: {e}")
+        parse_error = e
+    
+    repair_chat = create_repair_chat() if schema else None
+    if repair_chat:
+        try:
+            repair_input = f"""
+            Expected schema: {schema}
+            Parse error: {parse_error}
+            Malformed output:
+            {str(llm_response)[:4000]}
+            """
+            repaired_response = await repair_chat.send_message(make_user_message(repair_input))
+            result = parse_llm_output(repaired_response, validate)
+            parse_stats.record(model_name, "repaired")
+            logging.info(f"Repaired {model_name} response with {REPAIR_LLM_MODEL}")
+            return result
+        except Exception as e:
+            logging.error(f"LLM response repair failed: {e}")
+    
+    parse_stats.record(model_name, "failed")
+    raise parse_error
+
+# Prompt building
+INDICATOR_SUMMARY_POINTS = 20
+REASONING_MAX_CHARS = 400
+BATCH_PROMPT_TOKENS_PER_SYMBOL = 150
+
+def summarize_indicators(symbol=DEFAULT_SYMBOL):
+    """Summarize recent price/RSI history instead of sending raw lists"""
+    recent = price_histories[symbol][-INDICATOR_SUMMARY_POINTS:]
+    lines = [
+        summarize_series("Price trend", [point.price for point in recent]),
+        summarize_series("RSI trend", [point.rsi for point in recent], ".1f"),
+    ]
+    lines = [line for line in lines if line]
+    return "Indicators:\n" + "\n".join(f"- {line}" for line in lines) if lines else None
+
+def build_market_summary(market_data):
+    """Key market figures shared by the decision and verification prompts"""
+    return f"""Current Market Data ({market_data.symbol}):
+- Price: ${market_data.price:,.2f}
+- Volume: {market_data.volume:.2f}
+- RSI: {market_data.rsi:.1f}
+- News Sentiment: {market_data.news_sentiment}
+- Twitter Sentiment: {market_data.twitter_sentiment}"""
+
+def build_trading_prompt(market_data):
+    """Build the decision prompt within the configured token budget"""
+    budget = trading_settings.decision_prompt_token_budget if trading_settings else 700
+    builder = PromptBuilder(budget)
+    builder.add(build_market_summary(market_data), required=True)
+    symbol = market_data.symbol
+    state = portfolio.state
+    builder.add(f"Current Portfolio: ${state.usd_balance:.2f} USD, {state.amount(symbol):.6f} {symbol}", required=True)
+    builder.add(summarize_indicators(symbol), priority=1)
+    builder.add_list("News Headlines:", compact_list(market_data.news), priority=2)
+    builder.add_list("Recent Tweets:", compact_list(market_data.tweets), priority=3)
+    builder.add("Provide your trading decision based on this real-time data including sentiment analysis.", required=True)
+    return builder.build()
+
+def build_verification_prompt(trading_decision, chain_of_thought, market_data):
+    """Build the verification prompt from compact decision fields instead of raw dict reprs"""
+    budget = trading_settings.verification_prompt_token_budget if trading_settings else 500
+    builder = PromptBuilder(budget)
+    builder.add(
+        f"Trading Decision: {trading_decision['action']} (confidence {trading_decision['confidence']:.2f})\n"
+        f"Decision Reasoning: {compact_text(trading_decision['reasoning'], REASONING_MAX_CHARS)}",
+        required=True
+    )
+    builder.add(build_market_summary(market_data), required=True)
+    builder.add(f"Market Analysis: {compact_text(chain_of_thought['market_analysis'], REASONING_MAX_CHARS)}", priority=1)
+    builder.add(f"Risk Assessment: {compact_text(chain_of_thought['risk_assessment'], REASONING_MAX_CHARS)}", priority=1)
+    builder.add_list(
+        "Reasoning Steps:",
+        [compact_text(step, REASONING_MAX_CHARS) for step in chain_of_thought["reasoning_steps"]],
+        priority=2
+    )
+    builder.add(summarize_indicators(market_data.symbol), priority=3)
+    builder.add_list("News Headlines:", compact_list(market_data.news), priority=4)
+    builder.add_list("Recent Tweets:", compact_list(market_data.tweets), priority=5)
+    builder.add("Verify if this decision is valid and well-reasoned considering the sentiment analysis.", required=True)
+    return builder.build()
+
+def build_batch_trading_prompt(market_datas):
+    """Build one decision prompt covering several assets, sharing news and tweets"""
+    budget = trading_settings.decision_prompt_token_budget if trading_settings else 700
+    builder = PromptBuilder(budget + BATCH_PROMPT_TOKENS_PER_SYMBOL * (len(market_datas) - 1))
+    builder.add(f"Assets: {', '.join(m.symbol for m in market_datas)}", required=True)
+    for market_data in market_datas:
+        builder.add(build_market_summary(market_data), required=True)
+    state = portfolio.state
+    holdings = ", ".join(f"{state.amount(m.symbol):.6f} {m.symbol}" for m in market_datas)
+    builder.add(f"Current Portfolio: ${state.usd_balance:.2f} USD, {holdings}", required=True)
+    for market_data in market_datas:
+        builder.add(summarize_indicators(market_data.symbol), priority=1)
+    first = market_datas[0]
+    builder.add_list("News Headlines:", compact_list(first.news), priority=2)
+    builder.add_list("Recent Tweets:", compact_list(first.tweets), priority=3)
+    builder.add("Provide a trading decision for every asset listed based on this real-time data including sentiment analysis.", required=True)
+    return builder.build()
+
+def build_batch_verification_prompt(decisions, market_datas):
+    """Build one verification prompt for the decisions made in a batch"""
+    budget = trading_settings.verification_prompt_token_budget if trading_settings else 500
+    builder = PromptBuilder(budget + BATCH_PROMPT_TOKENS_PER_SYMBOL * (len(market_datas) - 1))
+    for market_data in market_datas:
+        trading_decision, chain_of_thought = decisions[market_data.symbol]
+        builder.add(
+            f"[{market_data.symbol}] Trading Decision: {trading_decision['action']} (confidence {trading_decision['confidence']:.2f})\n"
+            f"Decision Reasoning: {compact_text(trading_decision['reasoning'], REASONING_MAX_CHARS)}",
+            required=True
+        )
+        builder.add(build_market_summary(market_data), required=True)
+        builder.add(f"Risk Assessment: {compact_text(chain_of_thought['risk_assessment'], REASONING_MAX_CHARS)}", priority=1)
+    first = market_datas[0]
+    builder.add_list("News Headlines:", compact_list(first.news), priority=4)
+    builder.add_list("Recent Tweets:", compact_list(first.tweets), priority=5)
+    builder.add("Verify if each decision is valid and well-reasoned considering the sentiment analysis.", required=True)
+    return builder.build()
 
 # Real-world data fetching functions
+def get_tracked_symbols():
+    """Symbols currently being paper-traded"""
+    symbols = trading_settings.tracked_symbols if trading_settings else [DEFAULT_SYMBOL]
+    return [symbol for symbol in symbols if symbol in SUPPORTED_ASSETS] or [DEFAULT_SYMBOL]
+
+def resolve_symbol(symbol: str):
+    """Normalize a symbol query parameter, rejecting unsupported assets"""
+    symbol = (symbol or DEFAULT_SYMBOL).upper()
+    if symbol not in SUPPORTED_ASSETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported symbol: {symbol}")
+    return symbol
+
+def symbol_query(symbol: str):
+    """Mongo filter for a symbol's trades (trades saved before multi-asset support are BTC)"""
+    if symbol == DEFAULT_SYMBOL:
+        return {"$or": [{"symbol": symbol}, {"symbol": {"$exists": False}}]}
+    return {"symbol": symbol}
+
+def fallback_price(symbol: str):
+    return FALLBACK_PRICES.get(symbol, 1.0), 1.0, 50.0
+
+price_limiter = RateLimiter("coingecko", COINGECKO_RATE_PER_MINUTE, COINGECKO_BURST, UPSTREAM_LANES, throttled=upstream_throttled)
+news_limiter = RateLimiter("coindesk", COINDESK_RATE_PER_MINUTE, COINDESK_BURST, UPSTREAM_LANES, throttled=upstream_throttled)
+
+def check_rate_limited(response, limiter: RateLimiter):
+    """On a 429, hold the upstream's bucket shut for its Retry-After (60s if absent)"""
+    if response.status == 429:
+        try:
+            retry_after = float(response.headers.get("Retry-After", 60))
+        except ValueError:
+            retry_after = 60.0
+        limiter.penalize(retry_after)
+        raise RuntimeError(f"{limiter.name} rate limit exceeded, retrying after {retry_after:.0f}s")
+
+async def fetch_coingecko_prices(symbols):
+    """One batched CoinGecko request; raises unless at least one symbol was quoted"""
+    ids = ",".join(SUPPORTED_ASSETS[symbol] for symbol in symbols)
+    async with aiohttp.ClientSession(timeout=UPSTREAM_CLIENT_TIMEOUT) as session:
+        async with session.get(
+            f"{COINGECKO_API_URL}/simple/price?ids={ids}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true"
+        ) as response:
+            check_rate_limited(response, price_limiter)
+            if response.status != 200:
+                raise RuntimeError(f"CoinGecko API returned status {response.status}")
+            data = await response.json()
+    logging.info(f"CoinGecko API response: {data}")
+    
+    prices = {}
+    for symbol in symbols:
+        coin = data.get(SUPPORTED_ASSETS[symbol])
+        if not coin:
+            logging.error(f"{symbol} not found in CoinGecko response: {data}")
+            continue
+        price = coin["usd"]
+        volume_change = coin.get("usd_24h_change", 0)
+        
+        # Simulate RSI calculation (in real app, you'd use proper technical analysis)
+        rsi = 50 + (volume_change / 2)  # Simplified RSI approximation
+        rsi = max(0, min(100, rsi))  # Clamp between 0-100
+        
+        prices[symbol] = (price, abs(volume_change / 100), rsi)
+    if not prices:
+        raise RuntimeError(f"None of {symbols} in CoinGecko response")
+    return prices
+
+async def fetch_coindesk_headlines():
+    """Latest 5 headlines from the CoinDesk RSS feed, keyed by GUID (or title hash without one)"""
+    headers = {
+        'X-CoinAPI-Key': COINDESK_API_KEY
+    } if COINDESK_API_KEY else {}
+    async with aiohttp.ClientSession(timeout=UPSTREAM_CLIENT_TIMEOUT) as session:
+        async with session.get(COINDESK_RSS_URL, headers=headers) as response:
+            check_rate_limited(response, news_limiter)
+            if response.status != 200:
+                raise RuntimeError(f"CoinDesk RSS returned status {response.status}")
+            content = await response.text()
+    feed = feedparser.parse(content)
+    if not feed.entries:
+        raise RuntimeError("CoinDesk RSS feed has no entries")
+    headlines = []
+    for entry in feed.entries[:5]:
+        # Clean up the titles
+        title = re.sub(r'<[^>]+>', '', entry.title)
+        headlines.append(Headline(headline_key(entry.get('id'), title), title, entry.get('published')))
+    return headlines
+
+def upstream_breaker(name: str):
+    return CircuitBreaker(name, UPSTREAM_FAILURE_THRESHOLD, UPSTREAM_RESET_SECONDS)
+
+price_source = UpstreamSource("coingecko", fetch_coingecko_prices, upstream_breaker("coingecko"),
+                              UPSTREAM_TIMEOUT_SECONDS, fresh_for=COINGECKO_FRESH_SECONDS, limiter=price_limiter)
+news_source = UpstreamSource("coindesk", fetch_coindesk_headlines, upstream_breaker("coindesk"),
+                             UPSTREAM_TIMEOUT_SECONDS, limiter=news_limiter)
+upstream_sources = [price_source, news_source]
+# fetched_at of the last quote fed to the risk monitor, per symbol
+price_tick_times: Dict[str, datetime] = {}
+
+async def get_price_reading(symbols=None, lane=LANE_DASHBOARD):
+    """Quotes for several assets from one batched CoinGecko request, through its circuit breaker
+
+    Returns (prices, reading): prices maps symbol to (price, volume, rsi), and
+    reading says whether they are live or the last good quotes and how old
+    they are. Both are empty/None when CoinGecko has never answered for these
+    symbols. `lane` is the rate limit lane the call waits in.
+
+    The request always covers the whole tracked basket (plus any other
+    `symbols`), so every caller shares one cached quote and one token.
+    """
+    symbols = symbols or get_tracked_symbols()
+    basket = list(dict.fromkeys(get_tracked_symbols() + list(symbols)))
+    try:
+        reading = await price_source.get(tuple(basket), basket, lane=lane)
+    except SourceUnavailable as e:
+        logging.error(f"No prices for {symbols}: {e}")
+        return {}, None
+    
+    # Feed each live quote to the risk monitor once (stale and fallback values never trigger exits)
+    if not reading.stale and leader_lease.is_leader:
+        for symbol, (price, _, _) in reading.value.items():
+            if price_tick_times.get(symbol, datetime.min) < reading.fetched_at:
+                price_tick_times[symbol] = reading.fetched_at
+                await handle_price_tick(symbol, price)
+    return {symbol: reading.value[symbol] for symbol in symbols if symbol in reading.value}, reading
+
+async def get_market_prices(symbols=None, lane=LANE_DASHBOARD):
+    """Get current prices for several assets, with fallback values for assets that have no quote"""
+    symbols = symbols or get_tracked_symbols()
+    prices, _ = await get_price_reading(symbols, lane)
+    for symbol in symbols:
+        if symbol not in prices:
+            prices[symbol] = fallback_price(symbol)  # Fallback values
+    return prices
+
 async def get_bitcoin_price():
     """Get current Bitcoin price from CoinGecko API"""
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true"
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    logging.info(f"CoinGecko API response: {data}")
-                    
-                    if "bitcoin" in data:
-                        price = data["bitcoin"]["usd"]
-                        volume_change = data["bitcoin"].get("usd_24h_change", 0)
-                        
-                        # Simulate RSI calculation (in real app, you'd use proper technical analysis)
-                        rsi = 50 + (volume_change / 2)  # Simplified RSI approximation
-                        rsi = max(0, min(100, rsi))  # Clamp between 0-100
-                        
-                        return price, abs(volume_change / 100), rsi
-                    else:
-                        logging.error(f"Bitcoin not found in CoinGecko response: {data}")
-                        return 45000.0, 1.0, 50.0  # Fallback values
-                else:
-                    logging.error(f"CoinGecko API returned status {response.status}")
-                    return 45000.0, 1.0, 50.0  # Fallback values
-    except Exception as e:
-        logging.error(f"Error fetching Bitcoin price: {e}")
-        return 45000.0, 1.0, 50.0  # Fallback values
+    prices = await get_market_prices([DEFAULT_SYMBOL])
+    return prices[DEFAULT_SYMBOL]
+
+async def get_coindesk_news(lane=LANE_DASHBOARD):
+    """Get crypto news from the CoinDesk RSS feed
 
-async def get_coindesk_news():
-    """Get crypto news from CoinDesk API"""
+    Returns (titles, reading); reading.value holds the `Headline`s. While
+    CoinDesk is failing the last good headlines are served, and when it has
+    never answered there are none.
+    """
     try:
-        async with aiohttp.ClientSession() as session:
-            headers = {
-                'X-CoinAPI-Key': COINDESK_API_KEY
-            } if COINDESK_API_KEY else {}
-            
-            # Using CoinDesk RSS feed as fallback
-            async with session.get(
-                "https://www.coindesk.com/arc/outboundfeeds/rss/"
-            ) as response:
-                content = await response.text()
-                feed = feedparser.parse(content)
-                
-                news_items = []
-                for entry in feed.entries[:5]:  # Get latest 5 news
-                    title = entry.title
-                    # Clean up the title
-                    cleaned_title = re.sub(r'<[^>]+>', '', title)
-                    news_items.append(cleaned_title)
-                
-                return news_items
-    except Exception as e:
+        reading = await news_source.get(lane=lane)
+    except SourceUnavailable as e:
         logging.error(f"Error fetching CoinDesk news: {e}")
-        return [
-            "Bitcoin price shows volatility amid market uncertainty",
-            "Institutional adoption continues to grow",
-            "Regulatory clarity remains a key market driver",
-            "Crypto market sentiment shows mixed signals",
-            "Bitcoin ETF developments continue to influence market"
-        ]
+        return [], None
+    return [headline.title for headline in reading.value], reading
+
+tweet_source = build_tweet_source()
+tweet_ingestor = TweetIngestor(
+    tweet_source, sentiment_backend.score_batch, twitter_window,
+    batch_size=int(os.environ.get('TWITTER_SCORE_BATCH', 100)),
+    max_pending=int(os.environ.get('TWITTER_MAX_PENDING', 1000)),
+    limiter=None if isinstance(tweet_source, ReplayTweetSource) else twitter_limiter
+) if tweet_source else None
+
+async def twitter_ingest_loop():
+    """Poll recent posts into the sentiment window; publish the aggregate for the other workers"""
+    while True:
+        with stage_latency.time(stage="twitter_ingest"):
+            await tweet_ingestor.poll()
+        if SHARED_STATE_BACKEND == "mongo":
+            try:
+                await state_store.put(TWITTER_SENTIMENT_KEY, {
+                    "label": twitter_window.aggregate().label,
+                    "tweets": twitter_window.recent(TWITTER_PROMPT_TWEETS)
+                })
+            except Exception as e:
+                logging.error(f"Error publishing Twitter sentiment: {e}")
+        await asyncio.sleep(TWITTER_POLL_SECONDS)
 
 async def get_twitter_sentiment():
-    """Get Twitter sentiment about Bitcoin"""
-    try:
-        # For now, return fallback data to avoid API errors
-        return [
-            "Twitter sentiment: Market shows mixed signals",
-            "Social media indicates cautious optimism", 
-            "Crypto Twitter remains divided on short-term outlook"
-        ], "Neutral"
-        
-    except Exception as e:
-        logging.error(f"Error fetching Twitter data: {e}")
-        return [
-            "Twitter sentiment: Market shows mixed signals",
-            "Social media indicates cautious optimism",
-            "Crypto Twitter remains divided on short-term outlook"
-        ], "Neutral"
+    """Recent posts and the rolling Twitter/X sentiment label, as aggregated by the ingestion worker"""
+    if tweet_ingestor is None:
+        return [], "Neutral"
+    if SHARED_STATE_BACKEND == "mongo" and not leader_lease.is_leader:
+        doc = await state_store.get(TWITTER_SENTIMENT_KEY)
+        return (doc["tweets"], doc["label"]) if doc else ([], "Neutral")
+    return twitter_window.recent(TWITTER_PROMPT_TWEETS), twitter_window.aggregate().label
 
 def analyze_news_sentiment(news_items):
     """Analyze sentiment of news headlines"""
     try:
-        sentiments = []
-        for news in news_items:
-            blob = TextBlob(news)
-            sentiments.append(blob.sentiment.polarity)
-        
-        if sentiments:
-            avg_sentiment = sum(sentiments) / len(sentiments)
-            if avg_sentiment > 0.1:
-                return "Positive"
-            elif avg_sentiment < -0.1:
-                return "Negative"
-            else:
-                return "Neutral"
-        return "Neutral"
+        return sentiment_backend.overall(news_items)
     except Exception as e:
         logging.error(f"Error analyzing news sentiment: {e}")
         return "Neutral"
@@ -365,7 +956,7 @@ async def get_trading_settings():
 
 async def update_trading_settings(new_settings: TradingSettings):
     """Update trading settings in database"""
-    global trading_settings, current_portfolio_value
+    global trading_settings
     
     try:
         new_settings.updated_at = datetime.utcnow()
@@ -380,9 +971,8 @@ async def update_trading_settings(new_settings: TradingSettings):
         # Update global variables
         trading_settings = new_settings
         
-        # Update portfolio value if it's the initial value
-        if current_portfolio_value == 1000.0:  # Only update if it's still the default
-            current_portfolio_value = new_settings.initial_portfolio_value
+        # Update portfolio value if no trade has been made yet
+        await portfolio.set_initial_balance(new_settings.initial_portfolio_value)
             
         logging.info("Updated trading settings successfully")
         return trading_settings
@@ -393,154 +983,221 @@ async def update_trading_settings(new_settings: TradingSettings):
 
 async def apply_settings_to_system():
     """Apply current settings to system variables"""
-    global current_portfolio_value, price_history, portfolio_snapshots, sentiment_history
+    global sentiment_history
     
     if not trading_settings:
         await get_trading_settings()
     
+    # Apply risk limits
+    risk_monitor.configure(trading_settings)
+    
+    # Apply the auto-trading cadence; a sleeping scheduler picks it up immediately
+    configure_auto_trade_schedule()
+    
+    try:
+        await retention_job.ensure_summary_ttl(trading_settings.trade_summary_ttl_days)
+    except Exception as e:
+        logging.error(f"Error applying trade summary TTL: {e}")
+    
     # Apply history limits
-    if len(price_history) > trading_settings.price_history_limit:
-        price_history = price_history[-trading_settings.price_history_limit:]
+    for symbol, history in price_histories.items():
+        if len(history) > trading_settings.price_history_limit:
+            await price_history_store.trim(symbol, trading_settings.price_history_limit)
+            price_histories[symbol] = history[-trading_settings.price_history_limit:]
     
-    if len(portfolio_snapshots) > trading_settings.portfolio_snapshots_limit:
-        portfolio_snapshots = portfolio_snapshots[-trading_settings.portfolio_snapshots_limit:]
+    if len(portfolio.state.snapshots) > trading_settings.portfolio_snapshots_limit:
+        await portfolio.trim_snapshots(trading_settings.portfolio_snapshots_limit)
     
     if len(sentiment_history) > trading_settings.sentiment_history_limit:
+        await sentiment_history_store.trim("all", trading_settings.sentiment_history_limit)
         sentiment_history = sentiment_history[-trading_settings.sentiment_history_limit:]
 
-async def get_real_market_data():
-    """Get real-time market data from multiple sources"""
-    global price_history, sentiment_history
+async def get_market_snapshot(symbols=None, lane=LANE_DASHBOARD):
+    """Get real-time market data for all tracked assets, with one batched price request"""
+    global sentiment_history
     
+    symbols = symbols or get_tracked_symbols()
     try:
-        # Get Bitcoin price and technical indicators
-        price, volume, rsi = await get_bitcoin_price()
+        # Get prices and technical indicators for every asset at once
+        with stage_latency.time(stage="market_prices"):
+            prices, price_reading = await get_price_reading(symbols, lane)
         
         # Get news data
-        news_items = await get_coindesk_news()
+        with stage_latency.time(stage="news_rss"):
+            news_items, news_reading = await get_coindesk_news(lane)
         
-        # Calculate sentiment using TextBlob
-        sentiments = []
-        for news in news_items:
-            blob = TextBlob(news)
-            sentiments.append(blob.sentiment.polarity)
-        
-        # Determine overall sentiment
-        if sentiments:
-            avg_sentiment = sum(sentiments) / len(sentiments)
-            if avg_sentiment > 0.1:
-                news_sentiment = "Positive"
-            elif avg_sentiment < -0.1:
-                news_sentiment = "Negative"
-            else:
-                news_sentiment = "Neutral"
-        else:
-            news_sentiment = "Neutral"
+        # Score only headlines not seen before; the rest keep their scores
+        with stage_latency.time(stage="news_sentiment"):
+            new_news = news_feed.observe(news_reading.value, news_reading.fetched_at) if news_reading else []
+            news_sentiment = news_feed.sentiment()
+        if new_news:
+            news_headlines_new.inc(len(new_news))
         
         # Get Twitter data
-        tweets, twitter_sentiment = await get_twitter_sentiment()
+        with stage_latency.time(stage="twitter"):
+            tweets, twitter_sentiment = await get_twitter_sentiment()
         
-        # Store price history for charts
+        # Store price history for charts: live quotes only, each once (stale and fallback values are never stored)
         current_time = datetime.utcnow()
-        price_point = ChartDataPoint(
-            timestamp=current_time,
-            price=price,
-            volume=volume,
-            rsi=rsi
-        )
-        price_history.append(price_point)
-        
-        # Keep only configured number of price points
-        if trading_settings and len(price_history) > trading_settings.price_history_limit:
-            price_history = price_history[-trading_settings.price_history_limit:]
-        elif not trading_settings and len(price_history) > 100:  # fallback
-            price_history = price_history[-100:]
-        
-        # Store sentiment history
-        sentiment_point = {
-            "timestamp": current_time,
-            "news_sentiment": news_sentiment,
-            "twitter_sentiment": twitter_sentiment,
-            "news_items": news_items[:3],  # Store top 3 news items
-            "tweets": tweets[:3] if isinstance(tweets, list) else []
-        }
-        sentiment_history.append(sentiment_point)
-        
-        # Keep only configured number of sentiment points
-        if trading_settings and len(sentiment_history) > trading_settings.sentiment_history_limit:
-            sentiment_history = sentiment_history[-trading_settings.sentiment_history_limit:]
-        elif not trading_settings and len(sentiment_history) > 50:  # fallback
-            sentiment_history = sentiment_history[-50:]
+        price_limit = trading_settings.price_history_limit if trading_settings else 100
+        with stage_latency.time(stage="history_write"):
+            if price_reading and not price_reading.stale:
+                # Mongo keeps milliseconds; truncate so a stored point compares equal to its quote
+                quoted_at = price_reading.fetched_at.replace(microsecond=price_reading.fetched_at.microsecond // 1000 * 1000)
+                for symbol, (price, volume, rsi) in prices.items():
+                    history = price_histories.get(symbol)
+                    if history and history[-1].timestamp >= quoted_at:
+                        continue
+                    # Keep only configured number of price points
+                    price_histories[symbol] = await price_history_store.append(symbol, ChartDataPoint(
+                        timestamp=quoted_at,
+                        price=price,
+                        volume=volume,
+                        rsi=rsi
+                    ), price_limit)
+            
+            # Store a sentiment point only when new headlines arrived or the Twitter label changed
+            twitter_changed = bool(sentiment_history) and sentiment_history[-1].get("twitter_sentiment") != twitter_sentiment
+            if new_news or twitter_changed:
+                sentiment_point = {
+                    "timestamp": current_time,
+                    "news_sentiment": news_sentiment,
+                    "twitter_sentiment": twitter_sentiment,
+                    "news_items": [event.title for event in new_news[:3]],  # Store top 3 new items
+                    "tweets": tweets[:3] if isinstance(tweets, list) else []
+                }
+                # Keep only configured number of sentiment points
+                sentiment_limit = trading_settings.sentiment_history_limit if trading_settings else 50  # fallback
+                sentiment_history = await sentiment_history_store.append("all", sentiment_point, sentiment_limit)
         
-        return MarketData(
-            price=price,
-            volume=volume,
-            rsi=rsi,
-            news=news_items,
-            tweets=tweets,
-            news_sentiment=news_sentiment,
-            twitter_sentiment=twitter_sentiment
-        )
+        snapshot = {}
+        for symbol in symbols:
+            if symbol in prices:
+                price, volume, rsi = prices[symbol]
+                quote_source, quote_age = price_reading.source, price_reading.age_seconds
+            else:
+                price, volume, rsi = fallback_price(symbol)
+                quote_source, quote_age = "fallback", None
+            snapshot[symbol] = MarketData(
+                symbol=symbol,
+                price=price,
+                volume=volume,
+                rsi=rsi,
+                news=news_items,
+                tweets=tweets,
+                news_sentiment=news_sentiment,
+                twitter_sentiment=twitter_sentiment,
+                price_source=quote_source,
+                price_age_seconds=quote_age,
+                news_source=news_reading.source if news_reading else "unavailable",
+                news_age_seconds=news_reading.age_seconds if news_reading else None,
+                news_generation=news_feed.generation,
+                news_digest=news_feed.digest()
+            )
+        return snapshot
     except Exception as e:
         logging.error(f"Error getting real market data: {e}")
         # Return fallback data
-        return MarketData(
-            price=45000.0,
-            volume=1.0,
-            rsi=50.0,
-            news=["Fallback: Bitcoin market shows mixed signals"],
-            tweets=["Fallback: Social sentiment remains neutral"],
-            news_sentiment="Neutral",
-            twitter_sentiment="Neutral"
-        )
+        return {
+            symbol: MarketData(
+                symbol=symbol,
+                price=fallback_price(symbol)[0],
+                volume=1.0,
+                rsi=50.0,
+                news=["Fallback: Crypto market shows mixed signals"],
+                tweets=["Fallback: Social sentiment remains neutral"],
+                news_sentiment="Neutral",
+                twitter_sentiment="Neutral",
+                price_source="fallback",
+                news_source="unavailable",
+                news_generation=news_feed.generation,
+                news_digest=news_feed.digest()
+            )
+            for symbol in symbols
+        }
 
-async def execute_paper_trade(decision: str, price: float, confidence: float):
-    """Execute paper trading logic"""
-    global current_portfolio_value, current_btc_amount, last_trade_price, portfolio_snapshots
-    
-    profit_loss = 0.0
-    
-    if decision == "BUY" and current_portfolio_value > 0:
-        # Buy BTC with available USD
-        btc_bought = current_portfolio_value / price
-        current_btc_amount += btc_bought
-        current_portfolio_value = 0.0
-        last_trade_price = price
-        
-    elif decision == "SELL" and current_btc_amount > 0:
-        # Sell BTC for USD
-        usd_received = current_btc_amount * price
-        profit_loss = usd_received - (current_btc_amount * last_trade_price)
-        current_portfolio_value = usd_received
-        current_btc_amount = 0.0
+async def get_real_market_data(symbol: str = DEFAULT_SYMBOL, lane=LANE_DASHBOARD):
+    """Get real-time market data for one asset (prices for all tracked assets are refreshed together)"""
+    symbols = get_tracked_symbols()
+    if symbol not in symbols:
+        symbols = symbols + [symbol]
+    snapshot = await get_market_snapshot(symbols, lane)
+    return snapshot[symbol]
+
+def latest_price(symbol: str):
+    """Most recent known price for a symbol"""
+    history = price_histories.get(symbol)
+    if history:
+        return history[-1].price
+    return portfolio.state.last_trade_prices.get(symbol) or fallback_price(symbol)[0]
+
+def create_portfolio_snapshot(prices=None, state=None):
+    """Value the whole portfolio at `prices`, using the latest known price for other assets"""
+    prices = prices or {}
+    state = state or portfolio.state
+    asset_amounts = {symbol: amount for symbol, amount in state.holdings.items() if amount > 0}
+    asset_values = {
+        symbol: amount * (prices.get(symbol) or latest_price(symbol))
+        for symbol, amount in asset_amounts.items()
+    }
     
-    # Create portfolio snapshot for charts
-    current_time = datetime.utcnow()
-    btc_value = current_btc_amount * price
-    total_value = current_portfolio_value + btc_value
+    return PortfolioSnapshot(
+        timestamp=datetime.utcnow(),
+        total_value=state.usd_balance + sum(asset_values.values()),
+        usd_balance=state.usd_balance,
+        btc_amount=asset_amounts.get(DEFAULT_SYMBOL, 0.0),
+        btc_value=asset_values.get(DEFAULT_SYMBOL, 0.0),
+        asset_amounts=asset_amounts,
+        asset_values=asset_values
+    )
+
+async def execute_paper_trade(decision: str, price: float, confidence: float, symbol: str = DEFAULT_SYMBOL,
+                              enforce_daily_cap: bool = False):
+    """Execute paper trading logic; returns the portfolio's TradeExecution
+
+    With `enforce_daily_cap` (LLM decisions) a BUY/SELL over the daily trade
+    cap becomes a HOLD; risk exits always execute but still count toward it.
+    """
+    snapshot_limit = trading_settings.portfolio_snapshots_limit if trading_settings else 100
     
-    portfolio_snapshot = PortfolioSnapshot(
-        timestamp=current_time,
-        total_value=total_value,
-        usd_balance=current_portfolio_value,
-        btc_amount=current_btc_amount,
-        btc_value=btc_value
+    # Applied atomically: concurrent triggers and the scheduler can't double-spend,
+    # and the daily cap is checked and counted in the same shared update
+    execution = await portfolio.execute_trade(
+        decision,
+        price,
+        symbol,
+        get_tracked_symbols(),
+        make_snapshot=lambda state, trade_price: create_portfolio_snapshot({symbol: trade_price}, state),
+        snapshot_limit=snapshot_limit,
+        max_trades_per_day=risk_monitor.max_trades_per_day if enforce_daily_cap else 0
     )
-    portfolio_snapshots.append(portfolio_snapshot)
     
-    # Keep only configured number of snapshots
-    if trading_settings and len(portfolio_snapshots) > trading_settings.portfolio_snapshots_limit:
-        portfolio_snapshots = portfolio_snapshots[-trading_settings.portfolio_snapshots_limit:]
-    elif not trading_settings and len(portfolio_snapshots) > 100:  # fallback
-        portfolio_snapshots = portfolio_snapshots[-100:]
+    if execution.action == "BUY":
+        risk_monitor.open_position(symbol, price)
+    elif execution.action == "SELL":
+        risk_monitor.close_position(symbol)
         
-    return profit_loss
+    return execution
 
-async def execute_trading_pipeline():
-    """Execute the full LLM trading pipeline"""
+async def execute_trading_pipeline(symbol: str = DEFAULT_SYMBOL, market_data: Optional[MarketData] = None,
+                                   force: bool = False):
+    """Execute the full LLM trading pipeline
+
+    Unless `force`, the LLM is skipped (and a HOLD recorded) while nothing
+    changed since its last decision for this asset; see `unchanged_since_last_decision`.
+    """
     try:
         # Step 1: Get real market data
-        market_data = await get_real_market_data()
+        if market_data is None:
+            with stage_latency.time(stage="market_data"):
+                market_data = await get_real_market_data(symbol, LANE_TRADING)
+        require_market_price(market_data)
+        
+        mark = None if force else await get_decision_mark(symbol)
+        unchanged = unchanged_since_last_decision(market_data, mark)
+        if unchanged:
+            llm_decisions_skipped.inc(pipeline="single")
+            return await record_skipped_decision(market_data, mark, unchanged)
         
         # Step 2: Create LLM trading decision
         trading_chat = create_trading_chat()
@@ -548,136 +1205,504 @@ async def execute_trading_pipeline():
             raise HTTPException(status_code=500, detail="OpenAI API key not configured")
         
         # Prepare input for LLM
-        market_input = f"""
-        Current Market Data:
-        - Price: ${market_data.price:,.2f}
-        - Volume: {market_data.volume:.2f}
-        - RSI: {market_data.rsi:.1f}
-        - News Headlines: {market_data.news}
-        - Twitter Sentiment: {market_data.twitter_sentiment}
-        - News Sentiment: {market_data.news_sentiment}
-        - Recent Tweets: {market_data.tweets}
-        
-        Current Portfolio: ${current_portfolio_value:.2f} USD, {current_btc_amount:.6f} BTC
-        
-        Provide your trading decision based on this real-time data including sentiment analysis.
-        """
+        decision_prompt = build_trading_prompt(market_data)
+        logging.info(
+            f"Decision prompt: {decision_prompt.tokens}/{decision_prompt.budget} tokens, "
+            f"{decision_prompt.dropped_items} items dropped"
+        )
         
-        user_message = UserMessage(text=market_input)
-        llm_response = await trading_chat.send_message(user_message)
+        user_message = make_user_message(decision_prompt.text)
+        with stage_latency.time(stage="decision_llm"):
+            llm_response = await trading_chat.send_message(user_message)
         
-        # Parse LLM response
+        # Parse LLM response (including any repair call)
         try:
-            decision_data = json.loads(llm_response)
-            trading_decision = decision_data["trading_decision"]
-            chain_of_thought = decision_data["chain_of_thought"]
-        except (json.JSONDecodeError, KeyError) as e:
+            with stage_latency.time(stage="decision_parse"):
+                trading_decision, chain_of_thought = await parse_llm_response(
+                    llm_response,
+                    validate_trading_response,
+                    TRADING_LLM_MODEL,
+                    schema=TRADING_RESPONSE_SCHEMA
+                )
+        except LLMOutputError as e:
             raise HTTPException(status_code=500, detail=f"LLM response parsing error: {str(e)}")
         
         # Step 3: Verify the decision
         verification_chat = create_verification_chat()
-        verification_input = f"""
-        Trading Decision: {trading_decision}
-        Market Evidence: {market_input}
-        Chain of Thought: {chain_of_thought}
-        
-        Verify if this decision is valid and well-reasoned considering the sentiment analysis.
-        """
+        verification_prompt = build_verification_prompt(trading_decision, chain_of_thought, market_data)
+        logging.info(
+            f"Verification prompt: {verification_prompt.tokens}/{verification_prompt.budget} tokens, "
+            f"{verification_prompt.dropped_items} items dropped"
+        )
         
-        verification_message = UserMessage(text=verification_input)
-        verification_response = await verification_chat.send_message(verification_message)
+        verification_message = make_user_message(verification_prompt.text)
+        with stage_latency.time(stage="verification_llm"):
+            verification_response = await verification_chat.send_message(verification_message)
         
         try:
-            verification_data = json.loads(verification_response)
-        except json.JSONDecodeError:
+            with stage_latency.time(stage="verification_parse"):
+                verification_data = await parse_llm_response(
+                    verification_response,
+                    validate_verification_response,
+                    VERIFICATION_LLM_MODEL
+                )
+        except LLMOutputError:
             verification_data = {"is_valid": True, "verdict": "Verification parsing failed", "issues": []}
         
-        # Step 4: Execute paper trade
-        profit_loss = await execute_paper_trade(
-            trading_decision["action"],
-            market_data.price,
-            trading_decision["confidence"]
-        )
-        
-        # Step 5: Save trade result
-        trade_result = TradeResult(
-            price=market_data.price,
-            decision=trading_decision["action"],
-            confidence=trading_decision["confidence"],
-            reasoning=trading_decision["reasoning"],
-            evidence=market_data.news + market_data.tweets,
-            is_valid=verification_data["is_valid"],
-            verdict=verification_data["verdict"],
-            profit_loss=profit_loss,
-            chain_of_thought=chain_of_thought,
-            news_sentiment=market_data.news_sentiment,
-            twitter_sentiment=market_data.twitter_sentiment
-        )
-        
-        await db.trades.insert_one(trade_result.dict())
-        
-        return trade_result
+        # Step 4 & 5: Execute paper trade and save trade result
+        with stage_latency.time(stage="record_trade"):
+            return await record_trade_decision(
+                market_data,
+                trading_decision,
+                chain_of_thought,
+                verification_data,
+                prompt_tokens={
+                    "decision": decision_prompt.tokens,
+                    "verification": verification_prompt.tokens
+                }
+            )
         
     except Exception as e:
         logging.error(f"Trading pipeline error: {str(e)}")
         raise e
 
-# Background task for auto-trading
-async def auto_trade_scheduler():
-    """Background task for automatic trading"""
-    global auto_trading_enabled
+def require_market_price(market_data: MarketData):
+    """Refuse to trade on a placeholder price (CoinGecko has never quoted this asset)"""
+    if market_data.price_source == "fallback":
+        raise HTTPException(status_code=503, detail=f"No market price available for {market_data.symbol}")
+
+class DecisionMark(NamedTuple):
+    """What the last LLM decision for an asset was based on"""
+    news_digest: str
+    twitter_sentiment: str
+    price: float
+    confidence: float
+
+# Inputs of the last LLM decision per asset, shared so any worker's decision counts
+DECISION_MARK_KEY = "llm_decision_mark:{}"
+
+async def get_decision_mark(symbol: str) -> Optional[DecisionMark]:
+    doc = await state_store.get(DECISION_MARK_KEY.format(symbol))
+    return DecisionMark(**doc) if doc else None
+
+def unchanged_since_last_decision(market_data: MarketData, mark: Optional[DecisionMark]) -> Optional[str]:
+    """Why the last LLM decision (`mark`) for this asset still stands, or None when the LLM should decide again
+
+    It stands while the headlines are the same, the Twitter sentiment label is
+    the same and the price moved less than `llm_skip_price_change_percentage`.
+    """
+    threshold = trading_settings.llm_skip_price_change_percentage if trading_settings else 1.0
+    if threshold <= 0 or mark is None:
+        return None
+    if mark.news_digest != market_data.news_digest or mark.twitter_sentiment != market_data.twitter_sentiment:
+        return None
+    move = abs(market_data.price - mark.price) / mark.price * 100
+    if move >= threshold:
+        return None
+    return f"No new news and price moved {move:.2f}% (under {threshold}%) since the last LLM decision"
+
+async def record_skipped_decision(market_data: MarketData, mark: DecisionMark, reason: str):
+    """Record a HOLD without calling the LLM, for an asset whose last decision still stands"""
+    trade_result = TradeResult(
+        symbol=market_data.symbol,
+        price=market_data.price,
+        decision="HOLD",
+        confidence=mark.confidence,
+        reasoning=reason,
+        evidence=[],
+        is_valid=True,
+        verdict="LLM skipped: nothing changed since the last decision",
+        profit_loss=0.0,
+        news_sentiment=market_data.news_sentiment,
+        twitter_sentiment=market_data.twitter_sentiment
+    )
+    await trade_writer.put(trade_result.dict())
+    return trade_result
+
+async def record_trade_decision(market_data, trading_decision, chain_of_thought, verification_data, prompt_tokens=None):
+    """Execute the paper trade for a verified decision and save the trade result"""
+    action = trading_decision["action"]
+    
+    # Gate on the confidence threshold (the daily trade cap is enforced by the portfolio update)
+    allowed, risk_blocked = risk_monitor.check_decision(action, trading_decision["confidence"])
+    if not allowed:
+        logging.info(f"Risk monitor: {risk_blocked}")
+        action = "HOLD"
+    await state_store.put(DECISION_MARK_KEY.format(market_data.symbol), DecisionMark(
+        market_data.news_digest, market_data.twitter_sentiment, market_data.price, trading_decision["confidence"]
+    )._asdict())
+    
+    execution = await execute_paper_trade(
+        action,
+        market_data.price,
+        trading_decision["confidence"],
+        market_data.symbol,
+        enforce_daily_cap=True
+    )
+    if execution.capped:
+        risk_blocked = risk_monitor.daily_cap_blocked(action)
+        logging.info(f"Risk monitor: {risk_blocked}")
+        action = "HOLD"
+    profit_loss = execution.profit_loss
+    
+    trade_result = TradeResult(
+        symbol=market_data.symbol,
+        price=market_data.price,
+        decision=action,
+        confidence=trading_decision["confidence"],
+        reasoning=trading_decision["reasoning"],
+        evidence=market_data.news + market_data.tweets,
+        is_valid=verification_data["is_valid"],
+        verdict=verification_data["verdict"],
+        profit_loss=profit_loss,
+        chain_of_thought=chain_of_thought,
+        news_sentiment=market_data.news_sentiment,
+        twitter_sentiment=market_data.twitter_sentiment,
+        prompt_tokens=prompt_tokens,
+        risk_blocked=risk_blocked
+    )
+    
+    await trade_writer.put(trade_result.dict())
+    
+    return trade_result
+
+async def execute_decision_batch(market_datas):
+    """Decide and verify several assets with one decision call and one verification call
+
+    Returns (results, errors) keyed by symbol; a symbol the LLM skipped or
+    answered with an invalid entry fails alone without failing the batch.
+    """
+    symbols = [market_data.symbol for market_data in market_datas]
+    results, errors = {}, {}
     
-    while auto_trading_enabled:
+    trading_chat = create_batch_trading_chat()
+    if not trading_chat:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    decision_prompt = build_batch_trading_prompt(market_datas)
+    logging.info(
+        f"Batch decision prompt for {symbols}: {decision_prompt.tokens}/{decision_prompt.budget} tokens, "
+        f"{decision_prompt.dropped_items} items dropped"
+    )
+    with stage_latency.time(stage="batch_decision_llm"):
+        llm_response = await trading_chat.send_message(make_user_message(decision_prompt.text))
+    with stage_latency.time(stage="batch_decision_parse"):
+        parsed = await parse_llm_response(
+            llm_response,
+            validate_per_symbol("decisions", validate_trading_response),
+            TRADING_LLM_MODEL,
+            schema=BATCH_TRADING_RESPONSE_SCHEMA
+        )
+    
+    decisions = {}
+    for symbol in symbols:
+        entry = parsed.get(symbol)
+        if entry is None:
+            errors[symbol] = "No decision returned for symbol"
+        elif isinstance(entry, str):
+            errors[symbol] = entry
+        else:
+            decisions[symbol] = entry
+    
+    decided = [market_data for market_data in market_datas if market_data.symbol in decisions]
+    if not decided:
+        return results, errors
+    
+    verification_prompt = build_batch_verification_prompt(decisions, decided)
+    verifications = {}
+    try:
+        verification_chat = create_batch_verification_chat()
+        with stage_latency.time(stage="batch_verification_llm"):
+            verification_response = await verification_chat.send_message(make_user_message(verification_prompt.text))
+        verifications = await parse_llm_response(
+            verification_response,
+            validate_per_symbol("verifications", validate_verification_response),
+            VERIFICATION_LLM_MODEL
+        )
+    except Exception as e:
+        logging.error(f"Batch verification failed for {symbols}: {e}")
+    
+    prompt_tokens = {
+        "decision": decision_prompt.tokens,
+        "verification": verification_prompt.tokens,
+        "batch_size": len(market_datas)
+    }
+    for market_data in decided:
+        verification_data = verifications.get(market_data.symbol)
+        if not isinstance(verification_data, dict):
+            verification_data = {"is_valid": True, "verdict": "Verification parsing failed", "issues": []}
+        trading_decision, chain_of_thought = decisions[market_data.symbol]
         try:
-            logging.info("🤖 Auto-trading: Executing trade decision...")
-            # Use the same demo logic as manual trigger to avoid API errors
-            current_time = datetime.utcnow()
-            
-            # Get current market data
-            market_data = await get_real_market_data()
-            
-            # Create a simple trading decision without LLM for testing
-            trade_result = TradeResult(
-                price=market_data.price,
-                decision="HOLD",  # Safe default decision
-                confidence=0.5,
-                reasoning="Auto-trading demo decision - LLM integration temporarily disabled",
-                evidence=market_data.news[:3],  # Top 3 news items
-                is_valid=True,
-                verdict="Auto-trading demo decision for testing",
-                profit_loss=0.0,
-                chain_of_thought={
-                    "market_analysis": "Automated price analysis based on current market data",
-                    "risk_assessment": "Conservative auto-trading approach",
-                    "reasoning_steps": ["Auto-analyzed current price", "Checked market sentiment", "Decided to hold"]
-                },
-                news_sentiment=market_data.news_sentiment,
-                twitter_sentiment=market_data.twitter_sentiment
-            )
-            
-            # Execute paper trade
-            profit_loss = await execute_paper_trade(
-                trade_result.decision,
-                market_data.price,
-                trade_result.confidence
+            results[market_data.symbol] = await record_trade_decision(
+                market_data, trading_decision, chain_of_thought, verification_data, prompt_tokens
             )
-            trade_result.profit_loss = profit_loss
-            
-            # Save trade result
-            await db.trades.insert_one(trade_result.dict())
-            
-            logging.info("✅ Auto-trading: Trade decision completed")
-            
-            # Use configurable interval from settings
+        except Exception as e:
+            errors[market_data.symbol] = str(e)
+    
+    return results, errors
+
+async def execute_batch_trading_pipeline(symbols=None, force: bool = False):
+    """Execute the LLM trading pipeline for several assets in batched prompts
+
+    Symbols are split into batches of `llm_batch_size`, and batches run
+    concurrently with at most `llm_batch_concurrency` in flight. Unless
+    `force`, assets with nothing new since their last decision skip the LLM.
+    """
+    symbols = symbols or get_tracked_symbols()
+    batch_size = max(1, trading_settings.llm_batch_size if trading_settings else 5)
+    concurrency = max(1, trading_settings.llm_batch_concurrency if trading_settings else 2)
+    
+    # Step 1: Get market data for every asset in one batch
+    market_snapshot = await get_market_snapshot(symbols, LANE_TRADING)
+    batch_result = BatchTradeResult()
+    market_datas = []
+    for symbol in symbols:
+        market_data = market_snapshot[symbol]
+        try:
+            require_market_price(market_data)
+        except HTTPException as e:
+            batch_result.errors[symbol] = e.detail
+            continue
+        mark = None if force else await get_decision_mark(symbol)
+        unchanged = unchanged_since_last_decision(market_data, mark)
+        if unchanged:
+            llm_decisions_skipped.inc(pipeline="batch")
+            batch_result.results[symbol] = await record_skipped_decision(market_data, mark, unchanged)
+        else:
+            market_datas.append(market_data)
+    batches = [market_datas[i:i + batch_size] for i in range(0, len(market_datas), batch_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run_batch(batch):
+        async with semaphore:
+            return await execute_decision_batch(batch)
+    
+    batch_result.batches = len(batches)
+    outcomes = await asyncio.gather(*(run_batch(batch) for batch in batches), return_exceptions=True)
+    for batch, outcome in zip(batches, outcomes):
+        if isinstance(outcome, BaseException):
+            detail = outcome.detail if isinstance(outcome, HTTPException) else str(outcome)
+            logging.error(f"Batch trading pipeline error for {[m.symbol for m in batch]}: {detail}")
+            for market_data in batch:
+                batch_result.errors[market_data.symbol] = detail
+            continue
+        results, errors = outcome
+        batch_result.results.update(results)
+        batch_result.errors.update(errors)
+    
+    return batch_result
+
+# Tick-level risk monitoring
+async def handle_price_tick(symbol: str, price: float):
+    """Check a price tick against the open position and exit on stop-loss/take-profit"""
+    reason = risk_monitor.on_tick(symbol, price)
+    if not reason or (await portfolio.refresh()).amount(symbol) <= 0:
+        return None
+    
+    entry_price = portfolio.state.last_trade_prices.get(symbol, 0.0)
+    execution = await execute_paper_trade("SELL", price, 1.0, symbol)
+    label = "Stop-loss" if reason == "stop_loss" else "Take-profit"
+    if execution.action != "SELL":
+        # Closed by an LLM SELL or another tick between the check and the update
+        logging.info(f"Risk monitor: {symbol} position already closed, no {label.lower()} exit recorded")
+        return None
+    profit_loss = execution.profit_loss
+    trade_result = TradeResult(
+        symbol=symbol,
+        price=price,
+        decision="SELL",
+        confidence=1.0,
+        reasoning=f"{label} triggered at ${price:,.2f} (entry ${entry_price:,.2f})",
+        evidence=[],
+        is_valid=True,
+        verdict=f"Risk monitor {reason} exit",
+        profit_loss=profit_loss
+    )
+    await trade_writer.put(trade_result.dict())
+    logging.info(f"🛑 Risk monitor: {label} exit for {symbol} at ${price:,.2f}, P&L ${profit_loss:,.2f}")
+    return trade_result
+
+async def risk_tick_monitor():
+    """Poll prices at tick cadence while positions are open, so exits don't wait for the scheduler"""
+    while True:
+        interval = trading_settings.risk_tick_interval_seconds if trading_settings else 15
+        try:
+            # Positions may have been opened by other workers
+            state = await portfolio.refresh()
+            risk_monitor.sync_positions({symbol: state.last_trade_prices.get(symbol, 0.0) for symbol in state.holdings})
+            if risk_monitor.has_open_positions():
+                await get_market_prices(lane=LANE_TRADING)  # Ticks are handled inside the batched fetch
+        except Exception as e:
+            logging.error(f"Risk tick monitor error: {e}")
+        await asyncio.sleep(max(1, interval))
+
+# Leader election: background work runs on exactly one worker
+async def auto_trading_flag() -> bool:
+    """Shared auto-trading on/off flag"""
+    doc = await state_store.get(AUTO_TRADING_KEY)
+    return bool(doc and doc["enabled"])
+
+async def refresh_shared_state(symbol: str):
+    """Reload the local copies of state other workers may have changed"""
+    global sentiment_history
+    
+    await portfolio.refresh()
+    if SHARED_STATE_BACKEND == "mongo":
+        price_histories[symbol] = await price_history_store.get(symbol)
+        sentiment_history = await sentiment_history_store.get("all")
+
+async def sync_settings_from_db():
+    """Pick up settings saved through another worker"""
+    global trading_settings
+    
+    settings_doc = await db.settings.find_one({})
+    if settings_doc and (not trading_settings or settings_doc.get("updated_at") != trading_settings.updated_at):
+        trading_settings = TradingSettings(**settings_doc)
+        await apply_settings_to_system()
+
+async def reconcile_background_tasks():
+    """Run the scheduler, the risk tick monitor, trade retention and tweet ingestion on the leader only"""
+    global auto_trading_task, risk_tick_task, retention_task, twitter_task
+    
+    leader = leader_lease.is_leader
+    run_auto_trading = leader and await auto_trading_flag()
+    if run_auto_trading and auto_trading_task is None:
+        auto_trading_task = asyncio.create_task(auto_trade_scheduler())
+    elif not run_auto_trading and auto_trading_task is not None:
+        auto_trading_task.cancel()
+        auto_trading_task = None
+    
+    if leader and risk_tick_task is None:
+        risk_tick_task = asyncio.create_task(risk_tick_monitor())
+    elif not leader and risk_tick_task is not None:
+        risk_tick_task.cancel()
+        risk_tick_task = None
+    
+    if leader and retention_task is None:
+        retention_task = asyncio.create_task(retention_monitor())
+    elif not leader and retention_task is not None:
+        retention_task.cancel()
+        retention_task = None
+    
+    if leader and tweet_ingestor and twitter_task is None:
+        twitter_task = asyncio.create_task(twitter_ingest_loop())
+    elif not leader and twitter_task is not None:
+        twitter_task.cancel()
+        twitter_task = None
+
+async def leader_heartbeat():
+    """Take or renew the leader lease, pick up shared settings, then start or stop the leader-only tasks"""
+    while True:
+        was_leader = leader_lease.is_leader
+        try:
+            if await leader_lease.try_acquire():
+                if not was_leader:
+                    logging.info(f"👑 Leader election: {leader_lease.holder} is now the leader")
+            elif was_leader:
+                logging.warning(f"Leader election: {leader_lease.holder} lost the lease")
+        except Exception as e:
+            # Can't renew: stop leader-only work before the lease expires under us
+            logging.error(f"Leader election error: {e}")
+            leader_lease.step_down()
+        if SHARED_STATE_BACKEND == "mongo":
+            # Every worker serves trades, so every worker applies settings saved through another one
+            try:
+                await sync_settings_from_db()
+            except Exception as e:
+                logging.error(f"Settings sync error: {e}")
+        try:
+            await reconcile_background_tasks()
+        except Exception as e:
+            logging.error(f"Background task reconcile error: {e}")
+        await asyncio.sleep(leader_lease.heartbeat_seconds)
+
+# Background task for trade retention
+async def retention_monitor():
+    """Archive and compact old trades every retention interval"""
+    while True:
+        interval = trading_settings.retention_interval_minutes if trading_settings else 60
+        try:
             if trading_settings:
-                sleep_duration = trading_settings.auto_trading_interval_minutes * 60
-            else:
-                sleep_duration = 300  # 5 minutes default
-                
-            await asyncio.sleep(sleep_duration)
+                await run_retention()
         except Exception as e:
-            logging.error(f"Auto-trade error: {str(e)}")
-            await asyncio.sleep(60)  # Wait 1 minute before retrying
+            logging.error(f"Trade retention error: {e}")
+        await asyncio.sleep(max(1, interval) * 60)
+
+async def run_retention():
+    report = await retention_job.run_once(trading_settings)
+    if report["archived"] or report["compacted"]:
+        logging.info(
+            f"🗄️ Retention: archived {report['archived']}, compacted {report['compacted']} HOLD rows, "
+            f"reclaimed {report['reclaimed_bytes'] / 1024:.1f} KiB"
+        )
+    return report
+
+# Background task for auto-trading
+async def run_auto_trade_cycle():
+    """One auto-trading tick"""
+    logging.info("🤖 Auto-trading: Executing trade decision...")
+    # Use the same demo logic as manual trigger to avoid API errors
+    # Get current market data for every tracked asset in one batch
+    market_snapshot = await get_market_snapshot(lane=LANE_TRADING)
+    
+    for market_data in market_snapshot.values():
+        if market_data.price_source == "fallback":
+            logging.warning(f"Auto-trading: no market price for {market_data.symbol}, skipping")
+            continue
+        await record_demo_trade(market_data)
+    
+    logging.info("✅ Auto-trading: Trade decision completed")
+
+# Fixed cadence, independent of how long each cycle takes
+auto_trade_schedule = TickScheduler(run_auto_trade_cycle, interval=300)  # 5 minutes default
+
+def configure_auto_trade_schedule():
+    """Apply the configurable interval, jitter and missed-tick policy from settings"""
+    if trading_settings:
+        auto_trade_schedule.configure(
+            trading_settings.auto_trading_interval_minutes * 60,
+            trading_settings.auto_trading_jitter_seconds,
+            trading_settings.auto_trading_missed_tick_policy
+        )
+
+async def auto_trade_scheduler():
+    """Background task for automatic trading"""
+    await auto_trade_schedule.run()
+
+async def record_demo_trade(market_data: MarketData):
+    """Record the placeholder HOLD decision used by auto-trading"""
+    # Create a simple trading decision without LLM for testing
+    trade_result = TradeResult(
+        symbol=market_data.symbol,
+        price=market_data.price,
+        decision="HOLD",  # Safe default decision
+        confidence=0.5,
+        reasoning="Auto-trading demo decision - LLM integration temporarily disabled",
+        evidence=market_data.news[:3],  # Top 3 news items
+        is_valid=True,
+        verdict="Auto-trading demo decision for testing",
+        profit_loss=0.0,
+        chain_of_thought={
+            "market_analysis": "Automated price analysis based on current market data",
+            "risk_assessment": "Conservative auto-trading approach",
+            "reasoning_steps": ["Auto-analyzed current price", "Checked market sentiment", "Decided to hold"]
+        },
+        news_sentiment=market_data.news_sentiment,
+        twitter_sentiment=market_data.twitter_sentiment
+    )
+    
+    # Execute paper trade
+    execution = await execute_paper_trade(
+        trade_result.decision,
+        market_data.price,
+        trade_result.confidence,
+        market_data.symbol
+    )
+    trade_result.profit_loss = execution.profit_loss
+    
+    # Save trade result
+    await trade_writer.put(trade_result.dict())
+    return trade_result
 
 # API Routes
 @api_router.get("/")
@@ -685,24 +1710,35 @@ async def root():
     return {"message": "Crypto Trading Agent API with Real-time Data"}
 
 @api_router.post("/trade/trigger")
-async def trigger_trade():
-    """Trigger a manual trade decision"""
+async def trigger_trade(symbol: str = DEFAULT_SYMBOL, force: bool = False):
+    """Trigger a manual trade decision (`force` asks the LLM even when nothing changed)"""
+    symbol = resolve_symbol(symbol)
     try:
         # Execute the full LLM trading pipeline
-        return await execute_trading_pipeline()
+        return await execute_trading_pipeline(symbol, force=force)
         
     except Exception as e:
         logging.error(f"Manual trade trigger error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/trade/trigger/batch")
+async def trigger_batch_trade(symbols: Optional[str] = None, force: bool = False):
+    """Trigger batched trade decisions for several assets (comma-separated symbols, default: tracked)"""
+    symbol_list = None
+    if symbols:
+        symbol_list = list(dict.fromkeys(resolve_symbol(symbol.strip()) for symbol in symbols.split(",") if symbol.strip()))
+    try:
+        return await execute_batch_trading_pipeline(symbol_list, force)
+    except Exception as e:
+        logging.error(f"Batch trade trigger error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.post("/trade/auto/enable")
 async def enable_auto_trading():
     """Enable automatic trading"""
-    global auto_trading_enabled, auto_trading_task
-    
-    if not auto_trading_enabled:
-        auto_trading_enabled = True
-        auto_trading_task = asyncio.create_task(auto_trade_scheduler())
+    if not await auto_trading_flag():
+        await state_store.put(AUTO_TRADING_KEY, {"enabled": True, "updated_at": datetime.utcnow()})
+        await reconcile_background_tasks()  # Other workers' leader picks it up on its next heartbeat
         logging.info("🚀 Auto-trading enabled")
         return {"message": "Auto-trading enabled", "status": "active"}
     else:
@@ -711,13 +1747,9 @@ async def enable_auto_trading():
 @api_router.post("/trade/auto/disable")
 async def disable_auto_trading():
     """Disable automatic trading"""
-    global auto_trading_enabled, auto_trading_task
-    
-    if auto_trading_enabled:
-        auto_trading_enabled = False
-        if auto_trading_task:
-            auto_trading_task.cancel()
-            auto_trading_task = None
+    if await auto_trading_flag():
+        await state_store.put(AUTO_TRADING_KEY, {"enabled": False, "updated_at": datetime.utcnow()})
+        await reconcile_background_tasks()
         logging.info("⏸️ Auto-trading disabled")
         return {"message": "Auto-trading disabled", "status": "inactive"}
     else:
@@ -726,26 +1758,33 @@ async def disable_auto_trading():
 @api_router.get("/trade/auto/status")
 async def get_auto_trading_status():
     """Get auto-trading status"""
-    return {"auto_trading_enabled": auto_trading_enabled}
+    return {
+        "auto_trading_enabled": await auto_trading_flag(),
+        "running_here": auto_trading_task is not None,
+        "leader": leader_lease.snapshot(),
+        "schedule": auto_trade_schedule.snapshot()
+    }
 
 @api_router.get("/trade/live")
 async def get_live_trade():
     """Get the most recent trade decision"""
     try:
-        latest_trade = await db.trades.find().sort("timestamp", -1).limit(1).to_list(1)
+        latest_trade = await db.trades.find({}, SUMMARY_PROJECTION).sort("timestamp", -1).limit(1).to_list(1)
         if not latest_trade:
             return {"message": "No trades found"}
         
-        return TradeResult(**latest_trade[0])
+        return FastJSONResponse(TradeSummary.model_construct(**latest_trade[0]))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/trade/history")
-async def get_trade_history(limit: int = 50):
+async def get_trade_history(limit: int = 50, symbol: Optional[str] = None):
     """Get paginated trade history"""
+    query = symbol_query(resolve_symbol(symbol)) if symbol else {}
     try:
-        trades = await db.trades.find().sort("timestamp", -1).limit(limit).to_list(limit)
-        return [TradeResult(**trade) for trade in trades]
+        trades = await db.trades.find(query, SUMMARY_PROJECTION).sort("timestamp", -1).limit(limit).to_list(limit)
+        # Trusted documents: skip re-validation and FastAPI's jsonable_encoder pass
+        return FastJSONResponse(construct_many(TradeSummary, trades))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -753,19 +1792,22 @@ async def get_trade_history(limit: int = 50):
 async def get_trade_details(trade_id: str):
     """Get detailed reasoning for a specific trade"""
     try:
-        trade = await db.trades.find_one({"id": trade_id})
+        trade = await trade_store.get(trade_id)
         if not trade:
             raise HTTPException(status_code=404, detail="Trade not found")
         
         return TradeResult(**trade)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/metrics")
-async def get_trading_metrics():
+async def get_trading_metrics(symbol: Optional[str] = None):
     """Get trading performance metrics"""
+    query = symbol_query(resolve_symbol(symbol)) if symbol else {}
     try:
-        all_trades = await db.trades.find().to_list(1000)
+        all_trades = await db.trades.find(query, {"profit_loss": 1, "timestamp": 1}).to_list(1000)
         
         if not all_trades:
             return TradingMetrics(
@@ -773,7 +1815,7 @@ async def get_trading_metrics():
                 successful_trades=0,
                 total_profit_loss=0.0,
                 accuracy_percentage=0.0,
-                auto_trading_enabled=auto_trading_enabled
+                auto_trading_enabled=await auto_trading_flag()
             )
         
         total_trades = len(all_trades)
@@ -791,16 +1833,111 @@ async def get_trading_metrics():
             total_profit_loss=total_profit_loss,
             accuracy_percentage=accuracy_percentage,
             last_trade_time=last_trade_time,
-            auto_trading_enabled=auto_trading_enabled
+            auto_trading_enabled=await auto_trading_flag()
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/llm/parse-stats")
+async def get_llm_parse_stats():
+    """Get structured-output parse success rates per LLM model"""
+    return parse_stats.snapshot()
+
+@api_router.get("/llm/cassette")
+async def get_llm_cassette_status():
+    """Get LLM record/replay cassette mode and hit statistics"""
+    return llm_cassette.snapshot()
+
+@api_router.get("/trades/write-queue")
+async def get_trade_write_queue():
+    """Get write-behind queue depth and flush latency"""
+    return trade_writer.snapshot()
+
+@api_router.get("/retention/status")
+async def get_retention_status():
+    """Get the trade retention policy and the last run's report"""
+    settings = trading_settings or await get_trading_settings()
+    return {
+        "hold_compaction_after_days": settings.hold_compaction_after_days,
+        "hold_summary_period_hours": settings.hold_summary_period_hours,
+        "trade_archive_after_days": settings.trade_archive_after_days,
+        "trade_summary_ttl_days": settings.trade_summary_ttl_days,
+        "retention_interval_minutes": settings.retention_interval_minutes,
+        **retention_job.snapshot()
+    }
+
+@api_router.post("/retention/run")
+async def trigger_retention():
+    """Run the trade retention policy now"""
+    if not leader_lease.is_leader:
+        raise HTTPException(status_code=409, detail="Trade retention runs on the leader worker")
+    if not trading_settings:
+        await get_trading_settings()
+    return await run_retention()
+
+@api_router.get("/profiles")
+async def list_profiles():
+    """List captured request profiles, newest first"""
+    return {
+        "enabled": PROFILING_ENABLED,
+        "stats": profiling_stats,
+        "profiles": await asyncio.to_thread(profile_store.list) if PROFILING_ENABLED else []
+    }
+
+@api_router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Get a request profile as folded stacks (flamegraph.pl, speedscope, inferno)"""
+    folded = await asyncio.to_thread(profile_store.read, profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=folded, media_type="text/plain")
+
+@api_router.get("/compression/stats")
+async def get_compression_stats():
+    """Get per-route response compression ratio and CPU cost"""
+    return compression_stats.snapshot()
+
+@api_router.get("/metrics/prom")
+async def get_prometheus_metrics():
+    """Stage and Mongo latency histograms, cache hit rates, event loop lag and history sizes (Prometheus text format)"""
+    return Response(content=metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@api_router.get("/startup/imports")
+async def get_startup_imports():
+    """Get the import-time breakdown of this worker's cold start and of deferred modules"""
+    return {**(startup_report or {}), "lazy": lazy_imports.report()["lazy"]}
+
+@api_router.get("/upstreams/status")
+async def get_upstreams_status():
+    """Get each upstream's circuit breaker state, rate limit, fetch counters and the age of its last good value"""
+    return {source.name: source.snapshot() for source in upstream_sources}
+
+@api_router.get("/twitter/status")
+async def get_twitter_status():
+    """Get the Twitter/X ingestion worker's counters and the rolling sentiment aggregate"""
+    if tweet_ingestor is None:
+        return {"enabled": False}
+    limiter = tweet_ingestor.limiter
+    return {"enabled": True, **tweet_ingestor.snapshot(), "rate_limit": limiter.snapshot() if limiter else None}
+
+@api_router.get("/news/events")
+async def get_news_events(since: int = 0, limit: int = 50):
+    """Get "new news" events after sequence number `since`, with the headline filter's counters"""
+    events = news_feed.events_since(since, limit)
+    return {**news_feed.snapshot(), "events": [event._asdict() for event in events]}
+
+@api_router.get("/risk/status")
+async def get_risk_status():
+    """Get risk limits, open position levels and enforcement counters"""
+    state = await portfolio.refresh()
+    return {**risk_monitor.snapshot(), "trades_today": state.trades_on(datetime.utcnow().date())}
+
 @api_router.get("/market/data")
-async def get_current_market_data():
+async def get_current_market_data(symbol: str = DEFAULT_SYMBOL):
     """Get current market data"""
+    symbol = resolve_symbol(symbol)
     try:
-        market_data = await get_real_market_data()
+        market_data = await get_real_market_data(symbol)
         return market_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -808,23 +1945,32 @@ async def get_current_market_data():
 @api_router.get("/portfolio")
 async def get_portfolio_status():
     """Get current portfolio status"""
+    state = await portfolio.refresh()
     return {
-        "usd_balance": current_portfolio_value,
-        "btc_amount": current_btc_amount,
-        "last_trade_price": last_trade_price
+        "usd_balance": state.usd_balance,
+        "btc_amount": state.amount(DEFAULT_SYMBOL),
+        "last_trade_price": state.last_trade_prices.get(DEFAULT_SYMBOL, 0.0),
+        "holdings": dict(state.holdings),
+        "last_trade_prices": dict(state.last_trade_prices),
+        "tracked_symbols": get_tracked_symbols(),
+        "version": state.version
     }
 
 @api_router.get("/trades/chart-data")
-async def get_chart_data(timeframe: str = "1h"):
+async def get_chart_data(timeframe: str = "1h", symbol: str = DEFAULT_SYMBOL):
     """Get formatted data for live trades chart"""
+    symbol = resolve_symbol(symbol)
     try:
+        await refresh_shared_state(symbol)
+        
         # Get trade markers from database
-        trades = await db.trades.find().sort("timestamp", -1).limit(50).to_list(50)
+        trades = await db.trades.find(symbol_query(symbol), SUMMARY_PROJECTION).sort("timestamp", -1).limit(50).to_list(50)
         trade_markers = []
         
         for trade in trades:
-            marker = TradeMarker(
+            marker = TradeMarker.model_construct(
                 timestamp=trade["timestamp"],
+                symbol=trade.get("symbol", DEFAULT_SYMBOL),
                 price=trade["price"],
                 decision=trade["decision"],
                 confidence=trade["confidence"],
@@ -850,13 +1996,13 @@ async def get_chart_data(timeframe: str = "1h"):
         
         # Filter price history
         filtered_price_history = [
-            point for point in price_history 
+            point for point in price_histories.get(symbol, [])
             if point.timestamp >= cutoff_time
         ]
         
         # Filter portfolio snapshots
         filtered_portfolio = [
-            snapshot for snapshot in portfolio_snapshots 
+            snapshot for snapshot in portfolio.state.snapshots
             if snapshot.timestamp >= cutoff_time
         ]
         
@@ -869,7 +2015,8 @@ async def get_chart_data(timeframe: str = "1h"):
         # If no price history exists, create a current data point
         if not filtered_price_history:
             try:
-                current_price, volume, rsi = await get_bitcoin_price()
+                prices = await get_market_prices([symbol])
+                current_price, volume, rsi = prices[symbol]
                 current_point = ChartDataPoint(
                     timestamp=now,
                     price=current_price,
@@ -883,7 +2030,7 @@ async def get_chart_data(timeframe: str = "1h"):
                 filtered_price_history = [
                     ChartDataPoint(
                         timestamp=now,
-                        price=45000.0,
+                        price=fallback_price(symbol)[0],
                         volume=1.0,
                         rsi=50.0
                     )
@@ -892,51 +2039,45 @@ async def get_chart_data(timeframe: str = "1h"):
         # If no portfolio snapshots exist, create current snapshot
         if not filtered_portfolio:
             try:
-                current_price = filtered_price_history[-1].price if filtered_price_history else 45000.0
-                btc_value = current_btc_amount * current_price
-                total_value = current_portfolio_value + btc_value
-                
-                current_snapshot = PortfolioSnapshot(
-                    timestamp=now,
-                    total_value=total_value,
-                    usd_balance=current_portfolio_value,
-                    btc_amount=current_btc_amount,
-                    btc_value=btc_value
-                )
+                current_price = filtered_price_history[-1].price if filtered_price_history else fallback_price(symbol)[0]
+                current_snapshot = create_portfolio_snapshot({symbol: current_price})
                 filtered_portfolio = [current_snapshot]
             except Exception as e:
                 logging.error(f"Error creating portfolio snapshot: {e}")
                 filtered_portfolio = []
         
-        chart_data = ChartData(
+        chart_data = ChartData.model_construct(
             price_history=filtered_price_history,
             trade_markers=trade_markers,
             portfolio_history=filtered_portfolio,
             sentiment_timeline=filtered_sentiment,
-            timeframe=timeframe
+            timeframe=timeframe,
+            symbol=symbol
         )
         
-        return chart_data
+        return FastJSONResponse(chart_data)
         
     except Exception as e:
         logging.error(f"Error getting chart data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/trades/chart-data/live")
-async def get_live_chart_update():
+async def get_live_chart_update(symbol: str = DEFAULT_SYMBOL):
     """Get real-time chart data update"""
+    symbol = resolve_symbol(symbol)
     try:
         # Get current market data
-        market_data = await get_real_market_data()
+        market_data = await get_real_market_data(symbol)
         
         # Get latest trade if exists
-        latest_trade = await db.trades.find().sort("timestamp", -1).limit(1).to_list(1)
+        latest_trade = await db.trades.find(symbol_query(symbol), SUMMARY_PROJECTION).sort("timestamp", -1).limit(1).to_list(1)
         latest_trade_marker = None
         
         if latest_trade:
             trade = latest_trade[0]
-            latest_trade_marker = TradeMarker(
+            latest_trade_marker = TradeMarker.model_construct(
                 timestamp=trade["timestamp"],
+                symbol=trade.get("symbol", DEFAULT_SYMBOL),
                 price=trade["price"],
                 decision=trade["decision"],
                 confidence=trade["confidence"],
@@ -947,21 +2088,12 @@ async def get_live_chart_update():
         
         # Get current portfolio value
         current_price = market_data.price
-        btc_value = current_btc_amount * current_price
-        total_value = current_portfolio_value + btc_value
-        
-        current_portfolio_snapshot = PortfolioSnapshot(
-            timestamp=datetime.utcnow(),
-            total_value=total_value,
-            usd_balance=current_portfolio_value,
-            btc_amount=current_btc_amount,
-            btc_value=btc_value
-        )
+        current_portfolio_snapshot = create_portfolio_snapshot({symbol: current_price})
         
         # Get latest price point
         latest_price_point = None
-        if price_history:
-            latest_price_point = price_history[-1]
+        if price_histories.get(symbol):
+            latest_price_point = price_histories[symbol][-1]
         else:
             latest_price_point = ChartDataPoint(
                 timestamp=datetime.utcnow(),
@@ -983,13 +2115,13 @@ async def get_live_chart_update():
                 "tweets": market_data.tweets[:3] if isinstance(market_data.tweets, list) else []
             }
         
-        return {
+        return FastJSONResponse({
             "latest_price": latest_price_point,
             "latest_trade": latest_trade_marker,
             "current_portfolio": current_portfolio_snapshot,
             "latest_sentiment": latest_sentiment,
             "timestamp": datetime.utcnow()
-        }
+        })
         
     except Exception as e:
         logging.error(f"Error getting live chart update: {e}")
@@ -1028,6 +2160,27 @@ async def reset_settings():
 # Include the router in the main app
 app.include_router(api_router)
 
+# Compress chart/history payloads; small responses go out as they are
+if os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true":
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.environ.get("COMPRESSION_MINIMUM_SIZE", 1024)),
+        gzip_level=int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6)),
+        brotli_quality=int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4)),
+        stats=compression_stats
+    )
+
+if PROFILING_ENABLED:
+    # Wraps compression, so a profile covers it too; X-Profile (or PROFILING_SAMPLE_RATE) selects requests
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sample_rate=float(os.environ.get("PROFILING_SAMPLE_RATE", 0.0)),
+        interval=float(os.environ.get("PROFILING_INTERVAL_MS", 5)) / 1000,
+        token=os.environ.get("PROFILING_TOKEN"),
+        stats=profiling_stats
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -1046,26 +2199,53 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     """Initialize settings on startup"""
-    global trading_settings, current_portfolio_value
+    global trading_settings, leader_task, startup_report
     
     try:
         # Load trading settings
         trading_settings = await get_trading_settings()
+        risk_monitor.configure(trading_settings)
+        configure_auto_trade_schedule()
         
-        # Initialize portfolio value from settings if it's still default
-        if current_portfolio_value == 1000.0:
-            current_portfolio_value = trading_settings.initial_portfolio_value
+        # Initialize portfolio value from settings if no trade has been made yet
+        await portfolio.set_initial_balance(trading_settings.initial_portfolio_value)
             
         logging.info(f"✅ Startup: Trading settings loaded successfully")
-        logging.info(f"✅ Startup: Portfolio value set to ${current_portfolio_value}")
+        logging.info(f"✅ Startup: Portfolio value set to ${portfolio.state.usd_balance}")
         
     except Exception as e:
         logging.error(f"❌ Startup: Error initializing settings: {e}")
+    
+    trade_writer.start()
+    
+    try:
+        await retention_job.ensure_indexes(trading_settings.trade_summary_ttl_days if trading_settings else 0)
+    except Exception as e:
+        logging.error(f"❌ Startup: Error creating trade indexes: {e}")
+    
+    # Elects this worker leader (always, with the memory backend) and starts leader-only tasks
+    leader_task = asyncio.create_task(leader_heartbeat())
+    event_loop_lag.start()
+    
+    startup_report = lazy_imports.report(ready_at=time.time())
+    logging.info(f"⏱️ Startup: {lazy_imports.format_report(startup_report)}")
+    if os.environ.get("LAZY_IMPORT_PRELOAD", "true").lower() == "true":
+        # Warm the deferred modules off the event loop so the first trade cycle doesn't pay for them
+        asyncio.get_running_loop().run_in_executor(None, lazy_imports.preload)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    global auto_trading_enabled, auto_trading_task
-    auto_trading_enabled = False
-    if auto_trading_task:
-        auto_trading_task.cancel()
+    event_loop_lag.stop()
+    for task in (leader_task, auto_trading_task, risk_tick_task, retention_task, twitter_task):
+        if task:
+            task.cancel()
+    try:
+        await leader_lease.release()  # Hand over without waiting for the lease to expire
+    except Exception as e:
+        logging.error(f"Error releasing leader lease: {e}")
+    
+    # Flush queued trades before the connection goes away
+    lost = await trade_writer.drain(timeout=float(os.environ.get("TRADE_WRITE_DRAIN_TIMEOUT_SECONDS", 30)))
+    if lost:
+        logging.error(f"❌ Shutdown: {lost} queued trades could not be written (dead-lettered)")
     client.close()
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""State shared by every API worker
+
+With one uvicorn worker, trading state can live in process memory. With
+`--workers N`, each process would otherwise keep its own portfolio, chart
+histories and auto-trading flag. The Mongo stores keep a single copy in the
+database instead. Every worker reads and writes it atomically:
+
+- documents are updated with a compare-and-set on their version;
+- histories use `$push` with `$slice`.
+
+The memory stores have the same interface for single-worker deployments
+and tests.
+
+Selected with SHARED_STATE_BACKEND=memory (default) | mongo.
+"""
+import copy
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+BACKENDS = ("memory", "mongo")
+
+
+def backend_from_env() -> str:
+    backend = os.environ.get("SHARED_STATE_BACKEND", "memory").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid SHARED_STATE_BACKEND: {backend}")
+    return backend
+
+
+class MemoryStateStore:
+    """Versioned documents by key, held in this process"""
+
+    def __init__(self):
+        self._docs: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        doc = self._docs.get(key)
+        return copy.deepcopy(doc) if doc is not None else None
+
+    async def put(self, key: str, doc: Dict[str, Any]):
+        self._docs[key] = copy.deepcopy(doc)
+
+    async def compare_and_set(self, key: str, expected_version: int, doc: Dict[str, Any]) -> bool:
+        """Write `doc` only if the stored version is still `expected_version` (0 = absent)"""
+        current = self._docs.get(key)
+        if (current["version"] if current else 0) != expected_version:
+            return False
+        self._docs[key] = copy.deepcopy(doc)
+        return True
+
+
+class MongoStateStore:
+    """Versioned documents by key in one collection, shared by all workers"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one({"_id": key})
+        if doc is not None:
+            doc.pop("_id")
+        return doc
+
+    async def put(self, key: str, doc: Dict[str, Any]):
+        await self.collection.replace_one({"_id": key}, doc, upsert=True)
+
+    async def compare_and_set(self, key: str, expected_version: int, doc: Dict[str, Any]) -> bool:
+        if expected_version == 0:
+            try:
+                await self.collection.insert_one({"_id": key, **doc})
+                return True
+            except DuplicateKeyError:
+                return False
+        result = await self.collection.replace_one({"_id": key, "version": expected_version}, doc)
+        return result.matched_count == 1
+
+
+class MemoryHistoryStore:
+    """Bounded append-only series by key, held in this process"""
+
+    def __init__(self):
+        self._series: Dict[str, List[Any]] = defaultdict(list)
+
+    async def append(self, key: str, item: Any, limit: int) -> List[Any]:
+        """Append `item`, keep the last `limit` entries and return the series"""
+        series = self._series[key]
+        series.append(item)
+        if limit and len(series) > limit:
+            del series[:-limit]
+        return list(series)
+
+    async def get(self, key: str) -> List[Any]:
+        return list(self._series.get(key, []))
+
+    async def trim(self, key: str, limit: int):
+        series = self._series.get(key)
+        if series and limit and len(series) > limit:
+            del series[:-limit]
+
+
+class MongoHistoryStore:
+    """Bounded series by key, one document each; appends are a single atomic update"""
+
+    def __init__(self, collection, prefix: str, encode: Callable[[Any], Any] = None,
+                 decode: Callable[[Any], Any] = None):
+        self.collection = collection
+        self.prefix = prefix
+        self.encode = encode or (lambda item: item)
+        self.decode = decode or (lambda item: item)
+
+    def _id(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def append(self, key: str, item: Any, limit: int) -> List[Any]:
+        push = {"$each": [self.encode(item)]}
+        if limit:
+            push["$slice"] = -limit
+        doc = await self.collection.find_one_and_update(
+            {"_id": self._id(key)},
+            {"$push": {"items": push}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return [self.decode(item) for item in doc["items"]]
+
+    async def get(self, key: str) -> List[Any]:
+        doc = await self.collection.find_one({"_id": self._id(key)})
+        return [self.decode(item) for item in doc["items"]] if doc else []
+
+    async def trim(self, key: str, limit: int):
+        if limit:
+            await self.collection.update_one(
+                {"_id": self._id(key)}, {"$push": {"items": {"$each": [], "$slice": -limit}}}
+            )
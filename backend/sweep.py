@@ -0,0 +1,248 @@
+"""Parallel parameter sweep of TradingSettings over historical data
+
+Runs one backtest per parameter combination in a process pool using every
+core. The historical series is copied once into shared memory and each
+worker maps it as NumPy views, so tasks only carry their parameter dict
+instead of pickling the whole dataset per task.
+
+Usage:
+    python sweep.py prices.csv --strategy rsi \
+        --grid stop_loss_percentage=2,5,10 --grid take_profit_percentage=5,10,20
+    python sweep.py prices.csv --random 200 \
+        --range stop_loss_percentage=1:15 --range max_trades_per_day=1:20
+"""
+import argparse
+import inspect
+import itertools
+import json
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backtest import STRATEGIES, BacktestData, TradingRules, cached_decisions, load_csv, run_backtest
+
+# TradingSettings fields that map onto the backtest risk rules
+RULE_PARAMETERS = ("confidence_threshold", "stop_loss_percentage", "take_profit_percentage", "max_trades_per_day")
+# TradingSettings fields with no paper-trading effect; forwarded to strategies that accept them
+STRATEGY_SETTING_PARAMETERS = ("risk_threshold",)
+INTEGER_PARAMETERS = ("max_trades_per_day",)
+DATA_FIELDS = ("prices", "volumes", "rsi", "sentiment")
+
+# Per-worker state set up by _init_worker
+_worker = {}
+
+
+def grid_space(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the listed values"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_space(ranges: Dict[str, Any], samples: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`samples` random draws; each range is a (low, high) tuple or a list of choices"""
+    rng = random.Random(seed)
+    combos = []
+    for _ in range(samples):
+        combo = {}
+        for name, spec in ranges.items():
+            if isinstance(spec, tuple):
+                low, high = spec
+                combo[name] = rng.randint(int(low), int(high)) if name in INTEGER_PARAMETERS else rng.uniform(low, high)
+            else:
+                combo[name] = rng.choice(list(spec))
+        combos.append(combo)
+    return combos
+
+
+def _share(data: BacktestData):
+    """Copy the series into one shared memory block; returns (block, layout)"""
+    arrays = {"timestamps": data.timestamps.astype("datetime64[s]").astype(np.int64)}
+    arrays.update({name: getattr(data, name) for name in DATA_FIELDS if getattr(data, name) is not None})
+    arrays = {name: np.ascontiguousarray(values) for name, values in arrays.items()}
+
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(a.nbytes for a in arrays.values())))
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        view = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf, offset=offset)
+        view[:] = values
+        layout[name] = (offset, values.shape, values.dtype.str)
+        offset += values.nbytes
+    return block, layout
+
+
+def _attach(block_name: str, layout: Dict[str, Any]):
+    block = shared_memory.SharedMemory(name=block_name)
+    views = {
+        name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf, offset=offset)
+        for name, (offset, shape, dtype) in layout.items()
+    }
+    data = BacktestData(
+        timestamps=views.pop("timestamps").view("datetime64[s]"),
+        prices=views["prices"],
+        volumes=views.get("volumes"),
+        rsi=views.get("rsi"),
+        sentiment=views.get("sentiment"),
+    )
+    return block, data
+
+
+def _init_worker(block_name, layout, strategy, strategy_kwargs, decisions, initial_value, fee_rate):
+    block, data = _attach(block_name, layout)
+    _worker.update(
+        block=block,  # keep the mapping alive for the life of the worker
+        data=data,
+        strategy=strategy,
+        strategy_kwargs=strategy_kwargs,
+        decisions=decisions,
+        initial_value=initial_value,
+        fee_rate=fee_rate,
+    )
+
+
+def _make_strategy(strategy, strategy_kwargs, decisions, params):
+    """Build the decision function, passing it any sampled params it accepts"""
+    if strategy == "cached":
+        factory = cached_decisions
+        kwargs = {"decisions": decisions or []}
+    else:
+        factory = STRATEGIES[strategy]
+        kwargs = dict(strategy_kwargs or {})
+    accepted = inspect.signature(factory).parameters
+    kwargs.update({name: value for name, value in params.items() if name in accepted and name not in RULE_PARAMETERS})
+    return factory(**kwargs)
+
+
+def evaluate(params: Dict[str, Any], data: BacktestData, strategy="rsi", strategy_kwargs=None,
+             decisions=None, initial_value=1000.0, fee_rate=0.0) -> Dict[str, Any]:
+    """Backtest one parameter combination"""
+    rules = TradingRules(**{name: params[name] for name in RULE_PARAMETERS if name in params})
+    decide = _make_strategy(strategy, strategy_kwargs, decisions, params)
+    result = run_backtest(data, decide, initial_value, fee_rate, rules)
+    return {"params": params, **result.stats}
+
+
+def _evaluate_in_worker(params):
+    w = _worker
+    return evaluate(params, w["data"], w["strategy"], w["strategy_kwargs"], w["decisions"], w["initial_value"], w["fee_rate"])
+
+
+def validate_space(combos: List[Dict[str, Any]], strategy: str):
+    """Reject parameters that neither the risk rules nor the strategy understand"""
+    factory = cached_decisions if strategy == "cached" else STRATEGIES[strategy]
+    accepted = set(RULE_PARAMETERS) | set(inspect.signature(factory).parameters)
+    names = {name for combo in combos for name in combo}
+    unknown = names - accepted - set(STRATEGY_SETTING_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters for strategy '{strategy}': {sorted(unknown)}")
+    for name in (names & set(STRATEGY_SETTING_PARAMETERS)) - accepted:
+        logging.warning(f"'{name}' has no effect on the '{strategy}' strategy")
+
+
+def run_sweep(
+    data: BacktestData,
+    combos: List[Dict[str, Any]],
+    strategy: str = "rsi",
+    strategy_kwargs: Optional[Dict[str, Any]] = None,
+    decisions: Optional[List[Dict[str, Any]]] = None,
+    initial_value: float = 1000.0,
+    fee_rate: float = 0.0,
+    rank_by: str = "total_return_pct",
+    workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Backtest every combination across a process pool and rank the results"""
+    validate_space(combos, strategy)
+    workers = workers or os.cpu_count() or 1
+    block, layout = _share(data)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(block.name, layout, strategy, strategy_kwargs, decisions, initial_value, fee_rate),
+        ) as pool:
+            chunksize = max(1, len(combos) // (workers * 4))
+            results = list(pool.map(_evaluate_in_worker, combos, chunksize=chunksize))
+    finally:
+        block.close()
+        block.unlink()
+
+    results.sort(key=lambda r: r[rank_by], reverse=True)
+    for rank, result in enumerate(results, 1):
+        result["rank"] = rank
+    return results
+
+
+def format_table(results: List[Dict[str, Any]], top: int = 20,
+                 columns=("total_return_pct", "max_drawdown_pct", "sharpe_ratio", "win_rate_pct", "total_trades")) -> str:
+    """Plain-text ranked table of sweep results"""
+    if not results:
+        return "No results"
+    param_names = list(results[0]["params"])
+    header = ["rank"] + param_names + list(columns)
+    rows = [
+        [str(r["rank"])]
+        + [f"{r['params'][name]:.4g}" if isinstance(r["params"][name], float) else str(r["params"][name]) for name in param_names]
+        + [f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c]) for c in columns]
+        for r in results[:top]
+    ]
+    widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows]
+    return "\n".join(lines)
+
+
+def _parse_value(name, text):
+    return int(text) if name in INTEGER_PARAMETERS else float(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel TradingSettings sweep over a historical price CSV")
+    parser.add_argument("csv", help="CSV with timestamp,price[,volume,rsi,sentiment] columns")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES) + ["cached"], default="rsi")
+    parser.add_argument("--decisions", help="JSON file of recorded decisions for --strategy cached")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=LOW:HIGH")
+    parser.add_argument("--random", type=int, help="sample this many combinations from --range/--grid")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--rank-by", default="total_return_pct")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="write all ranked results as JSON")
+    args = parser.parse_args()
+
+    grid = {}
+    for spec in args.grid:
+        name, values = spec.split("=", 1)
+        grid[name] = [_parse_value(name, v) for v in values.split(",")]
+    ranges = {}
+    for spec in args.range:
+        name, bounds = spec.split("=", 1)
+        low, high = bounds.split(":")
+        ranges[name] = (_parse_value(name, low), _parse_value(name, high))
+
+    if args.random:
+        combos = random_space({**grid, **ranges}, args.random, args.seed)
+    else:
+        combos = grid_space(grid) if grid else [{}]
+
+    decisions = None
+    if args.decisions:
+        with open(args.decisions) as f:
+            decisions = json.load(f)
+
+    results = run_sweep(
+        load_csv(args.csv), combos, args.strategy, decisions=decisions,
+        rank_by=args.rank_by, workers=args.workers,
+    )
+    print(format_table(results, args.top))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Split storage for trade documents
+
+List endpoints only need a trade's price, decision and outcome, but every
+trade also carries its reasoning, chain of thought, verdict and evidence.
+The evidence is every headline and tweet the LLM saw. Each trade is stored
+as three kinds of documents:
+
+- `trades`: the compact summary every list query reads;
+- `trade_details`: reasoning, chain_of_thought, verdict and evidence hashes,
+  keyed by trade id and loaded only for a single trade;
+- `evidence`: each distinct evidence string once, keyed by its content hash
+  and reference counted. The auto-trader re-sends the same headlines for
+  hours, so this collapses most of the evidence volume.
+
+Documents written before the split keep their heavy fields inline; `get`
+returns them as they are, and list queries strip the fields by projection.
+"""
+import hashlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+DETAIL_FIELDS = ("reasoning", "chain_of_thought", "evidence", "verdict")
+SUMMARY_PROJECTION = {field: 0 for field in DETAIL_FIELDS}
+DUPLICATE_KEY = 11000
+
+
+def evidence_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def split_trade(doc: Dict[str, Any]):
+    """Return (summary, detail) documents for a full trade document"""
+    evidence = doc.get("evidence") or []
+    summary = {key: value for key, value in doc.items() if key not in DETAIL_FIELDS}
+    summary["_id"] = doc["id"]  # stable ids make a retried batch fail as duplicates, not double-insert
+    summary["evidence_count"] = len(evidence)
+    summary["has_detail"] = True
+    detail = {
+        "_id": doc["id"],
+        "reasoning": doc.get("reasoning", ""),
+        "chain_of_thought": doc.get("chain_of_thought"),
+        "verdict": doc.get("verdict", ""),
+        "evidence": [evidence_hash(text) for text in evidence],
+    }
+    return summary, detail
+
+
+def merge_trade(summary: Dict[str, Any], detail: Optional[Dict[str, Any]], texts: Dict[str, str]) -> Dict[str, Any]:
+    """Rebuild the full trade document from its parts"""
+    trade = {key: value for key, value in summary.items() if key not in ("_id", "has_detail", "evidence_count")}
+    if detail is not None:
+        trade.update({key: detail[key] for key in ("reasoning", "chain_of_thought", "verdict")})
+        trade["evidence"] = [texts[h] for h in detail["evidence"] if h in texts]
+    return trade
+
+
+def _ignore_duplicates(error: BulkWriteError):
+    if any(e["code"] != DUPLICATE_KEY for e in error.details.get("writeErrors", [])):
+        raise error
+
+
+class TradeStore:
+    def __init__(self, db):
+        self.trades = db.trades
+        self.details = db.trade_details
+        self.evidence = db.evidence
+
+    async def insert_many(self, docs: Iterable[Dict[str, Any]], ordered: bool = False):
+        """Write full trade documents; summaries go last so a visible trade always has its detail"""
+        summaries, details, refs, texts = [], [], Counter(), {}
+        for doc in docs:
+            summary, detail = split_trade(doc)
+            summaries.append(summary)
+            details.append(detail)
+            for text, h in zip(doc.get("evidence") or [], detail["evidence"]):
+                refs[h] += 1
+                texts[h] = text
+        if not summaries:
+            return
+
+        if refs:
+            # A retried batch over-counts refs; that only delays garbage collection
+            await self.evidence.bulk_write([
+                UpdateOne({"_id": h}, {"$setOnInsert": {"text": texts[h]}, "$inc": {"refs": count}}, upsert=True)
+                for h, count in refs.items()
+            ], ordered=False)
+        try:
+            await self.details.insert_many(details, ordered=False)
+        except BulkWriteError as e:
+            _ignore_duplicates(e)
+        await self.trades.insert_many(summaries, ordered=ordered)
+
+    async def _texts(self, hashes: Iterable[str]) -> Dict[str, str]:
+        hashes = list(set(hashes))
+        if not hashes:
+            return {}
+        docs = await self.evidence.find({"_id": {"$in": hashes}}).to_list(len(hashes))
+        return {doc["_id"]: doc["text"] for doc in docs}
+
+    async def get(self, trade_id: str) -> Optional[Dict[str, Any]]:
+        """Full trade document by id, with its detail and evidence"""
+        summary = await self.trades.find_one({"id": trade_id})
+        if summary is None or not summary.get("has_detail"):
+            return summary  # missing, or stored before the split
+        detail = await self.details.find_one({"_id": trade_id})
+        texts = await self._texts(detail["evidence"]) if detail else {}
+        return merge_trade(summary, detail, texts)
+
+    async def hydrate(self, summaries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Full documents for a batch of summaries (e.g. for archiving)"""
+        ids = [s["id"] for s in summaries if s.get("has_detail")]
+        details = {d["_id"]: d for d in await self.details.find({"_id": {"$in": ids}}).to_list(len(ids))} if ids else {}
+        texts = await self._texts(h for d in details.values() for h in d["evidence"])
+        return [
+            merge_trade(s, details.get(s["id"]), texts) if s.get("has_detail") else s
+            for s in summaries
+        ]
+
+    async def delete_details(self, trade_ids: List[str]):
+        """Drop the details of deleted trades and evidence no trade references any more"""
+        if not trade_ids:
+            return
+        details = await self.details.find({"_id": {"$in": trade_ids}}, {"evidence": 1}).to_list(len(trade_ids))
+        refs = Counter(h for d in details for h in d["evidence"])
+        await self.details.delete_many({"_id": {"$in": trade_ids}})
+        if refs:
+            await self.evidence.bulk_write(
+                [UpdateOne({"_id": h}, {"$inc": {"refs": -count}}) for h, count in refs.items()], ordered=False
+            )
+            await self.evidence.delete_many({"_id": {"$in": list(refs)}, "refs": {"$lte": 0}})
@@ -0,0 +1,213 @@
+"""Background ingestion of recent crypto posts from Twitter/X
+
+A `TweetIngestor` polls a source for recent posts and drops the ones it has
+already seen. It matches by id, and also by normalized text, so copy-pasted
+posts and retweets count once. It queues the rest in a bounded buffer and
+scores them in batches. Scored posts go into a `SentimentWindow`, a bounded,
+time-windowed buffer that keeps a running sum and label counts. Reading the
+aggregate sentiment is O(1) however many posts the window holds.
+
+Sources:
+    TwitterSearchSource  tweepy.Client.search_recent_tweets, paging with
+                         since_id; can record what it fetches as JSONL
+    ReplayTweetSource    replays a recorded JSONL file a page per poll, for
+                         offline runs and tests
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from dedup import SeenSet, text_key
+from rate_limiter import LANE_TRADING
+from sentiment import NEGATIVE, NEUTRAL, POSITIVE, sentiment_label
+
+
+class Tweet(NamedTuple):
+    id: str
+    text: str
+    created_at: Optional[str] = None  # ISO 8601, as the API returns it
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class SentimentAggregate(NamedTuple):
+    label: str
+    polarity: float  # mean over the window
+    count: int
+    positive: int
+    negative: int
+
+
+class SentimentWindow:
+    """Scored posts from the last `window_seconds`, at most `max_size` of them"""
+
+    def __init__(self, max_size: int = 1000, window_seconds: float = 3600.0, threshold: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.clock = clock
+        self._items = deque()  # (added_at, polarity, label, text)
+        self._sum = 0.0
+        self._counts = {POSITIVE: 0, NEGATIVE: 0, NEUTRAL: 0}
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._items)
+
+    def _drop_oldest(self):
+        _, polarity, label, _ = self._items.popleft()
+        self._sum -= polarity
+        self._counts[label] -= 1
+
+    def _expire(self):
+        cutoff = self.clock() - self.window_seconds
+        while self._items and self._items[0][0] < cutoff:
+            self._drop_oldest()
+
+    def add(self, text: str, polarity: float):
+        label = sentiment_label(polarity, self.threshold)
+        self._items.append((self.clock(), polarity, label, text))
+        self._sum += polarity
+        self._counts[label] += 1
+        if len(self._items) > self.max_size:
+            self._drop_oldest()
+
+    def aggregate(self) -> SentimentAggregate:
+        self._expire()
+        count = len(self._items)
+        if not count:
+            return SentimentAggregate(NEUTRAL, 0.0, 0, 0, 0)
+        mean = self._sum / count
+        return SentimentAggregate(sentiment_label(mean, self.threshold), round(mean, 4), count,
+                                  self._counts[POSITIVE], self._counts[NEGATIVE])
+
+    def recent(self, n: int) -> List[str]:
+        """Text of the `n` most recently scored posts, newest first"""
+        self._expire()
+        texts = []
+        for item in reversed(self._items):
+            if len(texts) == n:
+                break
+            texts.append(item[3])
+        return texts
+
+
+class TwitterSearchSource:
+    def __init__(self, client, query: str, max_results: int = 50, record_path: Optional[str] = None):
+        self.client = client
+        self.query = query
+        self.max_results = max(10, min(100, max_results))  # the API's bounds
+        self.record_path = Path(record_path) if record_path else None
+        self.since_id: Optional[str] = None
+
+    def _search(self):
+        import tweepy  # only reached with a configured client
+        try:
+            return self.client.search_recent_tweets(
+                query=self.query, max_results=self.max_results, since_id=self.since_id,
+                tweet_fields=["created_at"],
+            )
+        except tweepy.errors.TooManyRequests as e:
+            reset = float(e.response.headers.get("x-rate-limit-reset", time.time() + 900))
+            raise RateLimited(max(1.0, reset - time.time())) from e
+
+    async def fetch(self) -> List[Tweet]:
+        response = await asyncio.to_thread(self._search)
+        tweets = [
+            Tweet(str(t.id), t.text, t.created_at.isoformat() if t.created_at else None)
+            for t in (response.data or [])
+        ]
+        newest = (response.meta or {}).get("newest_id")
+        if newest:
+            self.since_id = newest
+        if tweets and self.record_path:
+            with self.record_path.open("a", encoding="utf-8") as f:
+                for tweet in tweets:
+                    f.write(json.dumps(tweet._asdict(), ensure_ascii=False) + "\n")
+        return tweets
+
+
+class ReplayTweetSource:
+    def __init__(self, path, per_poll: int = 20):
+        self.per_poll = per_poll
+        with open(path, encoding="utf-8") as f:
+            self._tweets = [Tweet(**json.loads(line)) for line in f if line.strip()]
+        self._position = 0
+
+    async def fetch(self) -> List[Tweet]:
+        page = self._tweets[self._position:self._position + self.per_poll]
+        self._position += len(page)
+        return page
+
+
+class TweetIngestor:
+    def __init__(self, source, score_batch: Callable[[Sequence[str]], List[float]], window: SentimentWindow,
+                 batch_size: int = 100, max_pending: int = 1000, seen_size: int = 20000, limiter=None):
+        self.source = source
+        self.score_batch = score_batch  # blocking; run off the event loop
+        self.window = window
+        self.batch_size = batch_size
+        self.limiter = limiter
+        self.seen = SeenSet(seen_size)
+        self._pending = deque(maxlen=max_pending)
+        self.last_poll_at: Optional[datetime] = None
+        self.stats = {"polls": 0, "fetched": 0, "duplicates": 0, "dropped": 0, "scored": 0, "batches": 0,
+                      "errors": 0, "throttled": 0}
+
+    def _enqueue(self, tweets: List[Tweet]):
+        for tweet in tweets:
+            content = text_key(tweet.text)
+            if tweet.id in self.seen or content in self.seen:
+                self.stats["duplicates"] += 1
+                continue
+            self.seen.add(tweet.id)
+            self.seen.add(content)
+            if len(self._pending) == self._pending.maxlen:
+                self.stats["dropped"] += 1  # the oldest unscored post makes room
+            self._pending.append(tweet.text)
+
+    async def _score_pending(self):
+        while self._pending:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            polarities = await asyncio.to_thread(self.score_batch, batch)
+            for text, polarity in zip(batch, polarities):
+                self.window.add(text, polarity)
+            self.stats["scored"] += len(batch)
+            self.stats["batches"] += 1
+
+    async def poll(self) -> int:
+        """Fetch, deduplicate and score one page of posts; returns how many new posts were scored"""
+        self.stats["polls"] += 1
+        if self.limiter is not None and not await self.limiter.acquire(LANE_TRADING):
+            self.stats["throttled"] += 1
+            return 0
+        scored = self.stats["scored"]
+        try:
+            tweets = await self.source.fetch()
+            self.stats["fetched"] += len(tweets)
+            self._enqueue(tweets)
+            await self._score_pending()
+            self.last_poll_at = datetime.now(timezone.utc)
+        except RateLimited as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Twitter ingestion {e}")
+            if self.limiter is not None:
+                self.limiter.penalize(e.retry_after)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.error(f"Twitter ingestion error: {e}")
+        return self.stats["scored"] - scored
+
+    def snapshot(self) -> Dict:
+        return {**self.window.aggregate()._asdict(), "pending": len(self._pending), "seen": len(self.seen),
+                "last_poll_at": self.last_poll_at.isoformat() if self.last_poll_at else None, **self.stats}
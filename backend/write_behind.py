@@ -0,0 +1,194 @@
+"""Write-behind queue for trade documents
+
+Pipelines enqueue documents and return right away; a background flusher
+writes them with `insert_many`. A batch is flushed once it holds
+`max_batch` documents or its oldest document has waited `flush_interval`
+seconds. The queue is bounded: when it is full, `put` waits for the flusher
+to make room (backpressure) instead of growing without limit. `drain()`
+writes out everything that is still queued, so shutting down loses no
+documents.
+
+A failed flush is retried `max_retries` times with exponential backoff. If
+the batch still fails, it is split in halves, and each half is written once
+more. This repeats until the documents that still fail are alone. Those
+are dead-lettered: appended to `dead_letter_path` as JSON lines and counted
+in `stats`. So one document the database always rejects (a validation error,
+an oversized document) can't block every write queued behind it.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY = 11000
+
+
+class WriteBehindQueue:
+    def __init__(self, collection, max_batch: int = 100, flush_interval: float = 0.5,
+                 max_queue: int = 10000, retry_delay: float = 1.0, latency_window: int = 100,
+                 max_retries: int = 5, max_retry_delay: float = 30.0, dead_letter_path=None):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.max_retry_delay = max_retry_delay
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: List[Any] = []
+        self._closed = False
+        self._latencies = deque(maxlen=latency_window)
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "failures": 0, "backpressure_waits": 0,
+                      "dead_lettered": 0}
+
+    def start(self):
+        if self._task is None:
+            self._closed = False
+            self._task = asyncio.create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def put(self, doc: Dict[str, Any]):
+        """Queue a document; waits only when the queue is full"""
+        if self._closed:
+            raise RuntimeError("Write-behind queue is draining; no new writes accepted")
+        if self._queue.full():
+            self.stats["backpressure_waits"] += 1
+        await self._queue.put((time.monotonic(), doc))
+        self.stats["enqueued"] += 1
+
+    async def _next_batch(self) -> List[Any]:
+        """Wait for one document, then collect more until the batch is full or its deadline passes"""
+        batch = [await self._queue.get()]
+        deadline = batch[0][0] + self.flush_interval
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: List[Any]) -> bool:
+        started = time.monotonic()
+        try:
+            await self.collection.insert_many([doc for _, doc in batch], ordered=False)
+        except BulkWriteError as e:
+            # insert_many sets _id on the documents, so a retried batch reports the
+            # ones that already made it as duplicates; everything else was written
+            if any(error["code"] != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                self.stats["failures"] += 1
+                logging.error(f"Write-behind flush of {len(batch)} documents failed: {e}")
+                return False
+        except Exception as e:
+            self.stats["failures"] += 1
+            logging.error(f"Write-behind flush of {len(batch)} documents failed: {e}")
+            return False
+        finished = time.monotonic()
+        self._latencies.append((finished - started, finished - batch[0][0]))
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+        return True
+
+    def _append_dead_letters(self, docs: List[Dict[str, Any]]):
+        self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.dead_letter_path.open("a", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json.dumps(doc, default=str) + "\n")
+
+    async def _dead_letter(self, batch: List[Any]):
+        docs = [doc for _, doc in batch]
+        self.stats["dead_lettered"] += len(docs)
+        logging.error(f"Write-behind dead-lettered {len(docs)} documents: {[doc.get('id') for doc in docs]}")
+        if self.dead_letter_path is not None:
+            try:
+                await asyncio.to_thread(self._append_dead_letters, docs)
+            except OSError as e:
+                logging.error(f"Write-behind could not save dead letters to {self.dead_letter_path}: {e}")
+
+    async def _isolate(self, batch: List[Any]):
+        """Write what can be written by halving the batch; dead-letter single documents that still fail"""
+        if len(batch) == 1:
+            await self._dead_letter(batch)
+            return
+        middle = len(batch) // 2
+        for half in (batch[:middle], batch[middle:]):
+            if not await self._write(half):
+                await self._isolate(half)
+
+    async def _flush(self, batch: List[Any]):
+        for attempt in range(self.max_retries):
+            if await self._write(batch):
+                return
+            await asyncio.sleep(min(self.retry_delay * 2 ** attempt, self.max_retry_delay))
+        if not await self._write(batch):
+            await self._isolate(batch)
+
+    async def _run(self):
+        while True:
+            batch = self._inflight = await self._next_batch()
+            # drain() picks the batch up if cancelled meanwhile
+            await self._flush(batch)
+            self._inflight = []
+            for _ in batch:
+                self._queue.task_done()
+
+    async def drain(self, timeout: Optional[float] = None) -> int:
+        """Stop accepting writes, flush everything queued and stop the flusher
+
+        Returns the number of documents that could not be written (and were
+        dead-lettered).
+        """
+        self._closed = True
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logging.error(f"Write-behind drain timed out with {self.depth} documents queued")
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Flusher stopped or never started: write the remainder directly, one final attempt
+        dead_lettered = self.stats["dead_lettered"]
+        if self._inflight:
+            if not await self._write(self._inflight):
+                await self._isolate(self._inflight)
+            self._inflight = []
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.max_batch, self._queue.qsize()))]
+            if not await self._write(batch):
+                await self._isolate(batch)
+        return self.stats["dead_lettered"] - dead_lettered
+
+    def snapshot(self):
+        flush = sorted(latency for latency, _ in self._latencies)
+        end_to_end = sorted(latency for _, latency in self._latencies)
+        return {
+            "depth": self.depth,
+            "max_queue": self._queue.maxsize,
+            "max_batch": self.max_batch,
+            "flush_interval_seconds": self.flush_interval,
+            "flush_latency_ms": {
+                "last": round(self._latencies[-1][0] * 1000, 2) if self._latencies else 0.0,
+                "p50": round(flush[len(flush) // 2] * 1000, 2) if flush else 0.0,
+                "max": round(flush[-1] * 1000, 2) if flush else 0.0,
+            },
+            "enqueue_to_write_ms_p50": round(end_to_end[len(end_to_end) // 2] * 1000, 2) if end_to_end else 0.0,
+            **self.stats,
+        }
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import "./App.css";
 import axios from "axios";
 import {
@@ -31,6 +31,7 @@ const API = `${BACKEND_URL}/api`;
 
 const TradingDashboard = () => {
   const [liveTrade, setLiveTrade] = useState(null);
+  const liveTradeId = useRef(null);
   const [tradeHistory, setTradeHistory] = useState([]);
   const [metrics, setMetrics] = useState(null);
   const [marketData, setMarketData] = useState(null);
@@ -96,7 +97,15 @@ const TradingDashboard = () => {
   const fetchLiveTrade = async () => {
     try {
       const response = await axios.get(`${API}/trade/live`);
-      setLiveTrade(response.data);
+      const trade = response.data;
+      // The live summary has no reasoning or evidence; load them once per new trade
+      if (!trade.id) {
+        setLiveTrade(trade);
+      } else if (trade.id !== liveTradeId.current) {
+        const detail = await axios.get(`${API}/trade/${trade.id}`);
+        liveTradeId.current = trade.id;
+        setLiveTrade(detail.data);
+      }
     } catch (error) {
       console.error('Error fetching live trade:', error);
     }
@@ -206,6 +215,7 @@ const TradingDashboard = () => {
     setLoading(true);
     try {
       const response = await axios.post(`${API}/trade/trigger`);
+      liveTradeId.current = response.data.id;
       setLiveTrade(response.data);
       await fetchTradeHistory();
       await fetchMetrics();
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# Backend modules are imported flat, the same way uvicorn loads server.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+class FakeUpstream:
+    """Stands in for aiohttp.ClientSession against CoinGecko and the CoinDesk RSS feed"""
+
+    def __init__(self):
+        self.prices = {
+            "bitcoin": {"usd": 50000.0, "usd_24h_change": 2.0, "usd_24h_vol": 1e9},
+            "ethereum": {"usd": 2500.0, "usd_24h_change": -1.0, "usd_24h_vol": 5e8},
+            "solana": {"usd": 100.0, "usd_24h_change": 0.0, "usd_24h_vol": 1e8},
+        }
+        self.headlines = ["Bitcoin steadies as traders weigh rate outlook"]
+        self.urls = []
+
+    def __call__(self, *args, **kwargs):
+        return FakeSession(self)
+
+    def respond(self, url):
+        self.urls.append(url)
+        if "/simple/price" in url:
+            ids = parse_qs(urlparse(url).query)["ids"][0].split(",")
+            return FakeResponse(json.dumps({coin: self.prices[coin] for coin in ids if coin in self.prices}))
+        from benchmarks.stubs import rss_feed
+        return FakeResponse(rss_feed(self.headlines))
+
+
+class FakeSession:
+    def __init__(self, upstream):
+        self.upstream = upstream
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, url, headers=None):
+        return self.upstream.respond(url)
+
+
+class FakeResponse:
+    def __init__(self, body, status=200):
+        self.body = body
+        self.status = status
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return json.loads(self.body)
+
+    async def text(self):
+        return self.body
+
+
+class FakeChat:
+    def __init__(self, llm, kind):
+        self.llm = llm
+        self.kind = kind
+
+    async def send_message(self, message):
+        self.llm.calls.append((self.kind, message))
+        self.llm.in_flight += 1
+        self.llm.max_in_flight = max(self.llm.max_in_flight, self.llm.in_flight)
+        try:
+            await asyncio.sleep(self.llm.delay)
+        finally:
+            self.llm.in_flight -= 1
+        return json.dumps(self.llm.answer(self.kind, message))
+
+
+class FakeLLM:
+    """Decision and verification chats answering from `actions` (symbol -> action)
+
+    Symbols in `omit` are left out of batch answers and symbols in `invalid`
+    get an entry that fails validation.
+    """
+
+    def __init__(self):
+        self.actions = defaultdict(lambda: "BUY")
+        self.confidence = 0.9
+        self.omit = set()
+        self.invalid = set()
+        self.delay = 0.0
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def decision(self, symbol):
+        if symbol in self.invalid:
+            return {"trading_decision": {"action": "MAYBE", "confidence": 0.5, "reasoning": "?"}}
+        return {
+            "chain_of_thought": {"market_analysis": "Flat", "risk_assessment": "Moderate", "reasoning_steps": ["a"]},
+            "trading_decision": {"action": self.actions[symbol], "confidence": self.confidence, "reasoning": "test"},
+        }
+
+    def answer(self, kind, prompt):
+        verification = {"is_valid": True, "verdict": "ok", "issues": []}
+        if kind == "batch_decision":
+            symbols = prompt.split("Assets: ", 1)[1].split("\n", 1)[0].split(", ")
+            return {"decisions": {s: self.decision(s) for s in symbols if s not in self.omit}}
+        if kind == "batch_verification":
+            return {"verifications": {s: verification for s in re.findall(r"^\[(\w+)\]", prompt, re.M)}}
+        if kind == "verification":
+            return verification
+        return self.decision(re.search(r"Current Market Data \((\w+)\)", prompt).group(1))
+
+    def decision_calls(self):
+        return [message for kind, message in self.calls if kind.endswith("decision")]
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    """server.py on the in-memory Mongo stand-in, with fresh trading state, upstreams and LLM fakes
+
+    Yields the module; `server.fake_upstream` and `server.fake_llm` are the fakes.
+    """
+    monkeypatch.setenv("MONGO_URL", "memory://")
+    monkeypatch.setenv("DB_NAME", "test")
+    monkeypatch.setenv("SHARED_STATE_BACKEND", "memory")
+    import server as module
+    from benchmarks.memory_mongo import MemoryMongoClient
+    from circuit_breaker import UpstreamSource
+    from news_feed import NewsFeed
+    from portfolio_state import PortfolioManager
+    from risk_monitor import RiskMonitor
+    from shared_state import MemoryHistoryStore, MemoryStateStore
+    from trade_store import TradeStore
+    from write_behind import WriteBehindQueue
+
+    db = MemoryMongoClient("memory://")["test"]
+    trade_store = TradeStore(db)
+    upstream = FakeUpstream()
+    llm = FakeLLM()
+    state = {
+        "db": db,
+        "trade_store": trade_store,
+        "trade_writer": WriteBehindQueue(trade_store, flush_interval=0.01, dead_letter_path=tmp_path / "dead.jsonl"),
+        "state_store": MemoryStateStore(),
+        "price_history_store": MemoryHistoryStore(),
+        "sentiment_history_store": MemoryHistoryStore(),
+        "sentiment_history": [],
+        "portfolio": PortfolioManager(1000.0),
+        "trading_settings": module.TradingSettings(tracked_symbols=["BTC", "ETH", "SOL"]),
+        "risk_monitor": RiskMonitor(),
+        "price_histories": defaultdict(list),
+        "price_tick_times": {},
+        "news_feed": NewsFeed(module.sentiment_backend),
+        "price_source": UpstreamSource("coingecko", module.fetch_coingecko_prices),
+        "news_source": UpstreamSource("coindesk", module.fetch_coindesk_headlines),
+        "make_user_message": lambda text: text,
+        "create_trading_chat": lambda: FakeChat(llm, "decision"),
+        "create_verification_chat": lambda: FakeChat(llm, "verification"),
+        "create_batch_trading_chat": lambda: FakeChat(llm, "batch_decision"),
+        "create_batch_verification_chat": lambda: FakeChat(llm, "batch_verification"),
+        "fake_upstream": upstream,
+        "fake_llm": llm,
+    }
+    for name, value in state.items():
+        monkeypatch.setattr(module, name, value, raising=False)
+    monkeypatch.setattr(module.aiohttp, "ClientSession", upstream)
+    yield module
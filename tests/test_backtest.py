@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+
+from backtest import (
+    BUY, HOLD, SELL, BacktestData, TradingRules, cached_decisions, compute_rsi, load_records,
+    positions_from_actions, rsi_strategy, run_backtest,
+)
+
+
+def make_data(prices, start="2024-01-01T00:00", step_seconds=60):
+    prices = np.asarray(prices, dtype=float)
+    timestamps = np.datetime64(start, "s") + np.arange(len(prices)) * np.timedelta64(step_seconds, "s")
+    return BacktestData(timestamps, prices)
+
+
+def paper_trade_loop(prices, actions, initial_value):
+    """Reference implementation of execute_paper_trade() semantics"""
+    usd, amount, last_price = initial_value, 0.0, 0.0
+    equity, profits = [], []
+    for price, action in zip(prices, actions):
+        if action == BUY and usd > 0:
+            amount, usd, last_price = usd / price, 0.0, price
+        elif action == SELL and amount > 0:
+            profits.append(amount * price - amount * last_price)
+            usd, amount = amount * price, 0.0
+        equity.append(usd + amount * price)
+    return np.array(equity), profits
+
+
+def test_positions_carry_forward():
+    actions = np.array([HOLD, BUY, HOLD, BUY, SELL, HOLD, SELL, BUY])
+    assert positions_from_actions(actions).tolist() == [0, 1, 1, 1, 0, 0, 0, 1]
+
+
+def test_matches_paper_trade_semantics():
+    rng = np.random.default_rng(7)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 2000)))
+    actions = rng.choice([HOLD, HOLD, HOLD, BUY, SELL], size=len(prices))
+    data = make_data(prices)
+
+    result = run_backtest(data, lambda _: actions, initial_value=1000.0)
+    expected_equity, expected_profits = paper_trade_loop(prices, actions, 1000.0)
+
+    np.testing.assert_allclose(result.equity, expected_equity, rtol=1e-9)
+    closed = [t["profit_loss"] for t in result.trades if t["closed"]]
+    np.testing.assert_allclose(closed, expected_profits, rtol=1e-9)
+
+
+def test_cached_decisions_align_to_bars_and_gate_confidence():
+    data = make_data([100, 110, 120, 90])
+    decisions = [
+        {"timestamp": "2024-01-01T00:00:30", "decision": "BUY", "confidence": 0.9},
+        {"timestamp": "2024-01-01T00:02:00", "decision": "SELL", "confidence": 0.4},
+        {"timestamp": "2024-01-01T00:03:00", "decision": "SELL", "confidence": 0.8},
+    ]
+    result = run_backtest(data, cached_decisions(decisions, min_confidence=0.6))
+    assert result.positions.tolist() == [0, 1, 1, 0]
+    assert result.trades[0]["entry_price"] == 110
+    assert result.trades[0]["exit_price"] == 90
+
+
+def test_load_records_maps_sentiment_labels():
+    data = load_records([
+        {"timestamp": "2024-01-01T00:01:00", "price": 2.0, "news_sentiment": "Negative"},
+        {"timestamp": "2024-01-01T00:00:00", "price": 1.0, "news_sentiment": "Positive"},
+    ])
+    assert data.prices.tolist() == [1.0, 2.0]
+    assert data.sentiment.tolist() == [1.0, -1.0]
+
+
+def test_rsi_bounds():
+    rsi = compute_rsi(np.linspace(100, 200, 50))
+    assert rsi[:14].tolist() == [50.0] * 14
+    assert rsi[-1] == 100.0
+
+
+def test_year_of_minute_bars_is_fast():
+    rng = np.random.default_rng(1)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.0005, 365 * 24 * 60)))
+    data = make_data(prices)
+
+    start = time.perf_counter()
+    result = run_backtest(data, rsi_strategy())
+    elapsed = time.perf_counter() - start
+
+    assert len(result.equity) == len(prices)
+    assert elapsed < 5.0
+
+
+def test_stop_loss_take_profit_and_daily_cap():
+    prices = [100, 100, 94, 100, 100, 111, 100, 100]
+    actions = np.array([BUY, HOLD, HOLD, BUY, HOLD, HOLD, BUY, HOLD])
+    data = make_data(prices, step_seconds=3600)
+
+    result = run_backtest(data, lambda _: actions, rules=TradingRules(stop_loss_percentage=5, take_profit_percentage=10))
+    assert [t["exit_reason"] for t in result.trades] == ["stop_loss", "take_profit", None]
+    assert result.positions.tolist() == [1, 1, 0, 1, 1, 0, 1, 1]
+
+    capped = run_backtest(data, lambda _: actions, rules=TradingRules(stop_loss_percentage=5, max_trades_per_day=2))
+    assert len(capped.trades) == 1
+
+
+def test_daily_cap_skips_sells_as_well_as_buys():
+    # Day 1: BUY, SELL, BUY fill the cap of 3, so the second SELL waits for day 2
+    prices = [100, 105, 100, 110, 120, 130]
+    actions = np.array([BUY, SELL, BUY, SELL, HOLD, SELL])
+    data = BacktestData(np.array(["2024-01-01T00", "2024-01-01T01", "2024-01-01T02", "2024-01-01T03",
+                                  "2024-01-01T04", "2024-01-02T00"], dtype="datetime64[s]"), np.asarray(prices, float))
+    result = run_backtest(data, lambda _: actions, rules=TradingRules(max_trades_per_day=3))
+    assert result.positions.tolist() == [1, 0, 1, 1, 1, 0]
+    assert [t["exit_price"] for t in result.trades] == [105.0, 130.0]
+
+    stopped = run_backtest(data, lambda _: actions, rules=TradingRules(max_trades_per_day=3, take_profit_percentage=15))
+    assert [t["exit_reason"] for t in stopped.trades] == ["signal", "take_profit"]
+    assert stopped.trades[1]["exit_price"] == 120.0
+
+
+def test_confidence_threshold_drops_weak_signals():
+    data = make_data([100, 110, 120])
+    actions = np.array([BUY, HOLD, SELL])
+    confidence = np.array([0.5, 1.0, 0.9])
+    result = run_backtest(data, lambda _: (actions, confidence), rules=TradingRules(confidence_threshold=0.6))
+    assert result.positions.tolist() == [0, 0, 0]
@@ -0,0 +1,45 @@
+import asyncio
+
+
+def assets_line(prompt):
+    return prompt.split("Assets: ", 1)[1].split("\n", 1)[0]
+
+
+def test_symbols_are_split_into_batches_of_llm_batch_size(server):
+    server.trading_settings.llm_batch_size = 2
+    result = asyncio.run(server.execute_batch_trading_pipeline())
+
+    assert result.batches == 2 and not result.errors
+    assert set(result.results) == {"BTC", "ETH", "SOL"}
+    prompts = [message for kind, message in server.fake_llm.calls if kind == "batch_decision"]
+    assert sorted(assets_line(prompt) for prompt in prompts) == ["BTC, ETH", "SOL"]
+    assert all(trade.decision == "BUY" for trade in result.results.values())
+
+
+def test_batches_in_flight_are_bounded_by_llm_batch_concurrency(server):
+    server.fake_upstream.prices.update({
+        "binancecoin": {"usd": 300.0, "usd_24h_change": 0.0},
+        "ripple": {"usd": 0.5, "usd_24h_change": 0.0},
+        "cardano": {"usd": 0.4, "usd_24h_change": 0.0},
+    })
+    server.trading_settings.tracked_symbols = ["BTC", "ETH", "SOL", "BNB", "XRP", "ADA"]
+    server.trading_settings.llm_batch_size = 1
+    server.trading_settings.llm_batch_concurrency = 2
+    server.fake_llm.delay = 0.02
+    result = asyncio.run(server.execute_batch_trading_pipeline())
+
+    assert result.batches == 6 and len(result.results) == 6
+    assert server.fake_llm.max_in_flight == 2
+
+
+def test_missing_and_invalid_decisions_fail_alone(server):
+    server.fake_llm.omit = {"SOL"}
+    server.fake_llm.invalid = {"ETH"}
+    result = asyncio.run(server.execute_batch_trading_pipeline())
+
+    assert result.batches == 1
+    assert list(result.results) == ["BTC"] and result.results["BTC"].decision == "BUY"
+    assert result.errors["SOL"] == "No decision returned for symbol"
+    assert result.errors["ETH"].startswith("Invalid entry")
+    assert server.portfolio.state.amount("BTC") > 0
+    assert server.portfolio.state.amount("ETH") == 0 and server.portfolio.state.amount("SOL") == 0
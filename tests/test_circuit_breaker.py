@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, SourceUnavailable, UpstreamSource
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_threshold_and_probes_once_when_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker("prices", failure_threshold=2, reset_timeout=30, clock=clock)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.snapshot()["retry_in_seconds"] == 30
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["opened"] == 2
+
+
+def test_source_serves_last_good_value_with_its_age_while_failing():
+    clock = FakeClock()
+    calls = []
+    healthy = True
+
+    async def fetch(symbols):
+        calls.append(symbols)
+        if not healthy:
+            raise RuntimeError("503")
+        return {symbol: len(calls) for symbol in symbols}
+
+    async def scenario():
+        nonlocal healthy
+        source = UpstreamSource("prices", fetch, CircuitBreaker("prices", 2, 30, clock=clock), clock=clock)
+        with pytest.raises(SourceUnavailable):
+            healthy = False
+            await source.get(("BTC",), ["BTC"])
+        healthy = True
+        live = await source.get(("BTC",), ["BTC"])
+        assert live.value == {"BTC": 2} and live.source == "live"
+
+        healthy = False
+        clock.now += 5
+        stale = await source.get(("BTC",), ["BTC"])
+        assert stale.value == {"BTC": 2} and stale.stale and stale.age_seconds == 5
+        assert stale.fetched_at == live.fetched_at
+        await source.get(("BTC",), ["BTC"])
+        assert source.breaker.state == OPEN
+
+        # Open: answered from the last good value without calling the upstream
+        await source.get(("BTC",), ["BTC"])
+        assert len(calls) == 4
+
+        # Half-open: the reader gets the stale value now, the probe runs in the background
+        healthy = True
+        clock.now += 30
+        served = await source.get(("BTC",), ["BTC"])
+        assert served.stale and len(calls) == 4
+        await asyncio.sleep(0.01)
+        assert len(calls) == 5 and source.breaker.state == CLOSED
+        recovered = await source.get(("BTC",), ["BTC"])
+        assert recovered.value == {"BTC": 6} and not recovered.stale
+        return source
+
+    source = asyncio.run(scenario())
+    assert source.stats["background_refreshes"] == 1
+    assert source.stats["unavailable"] == 1
+
+
+def test_slow_fetch_times_out_and_concurrent_reads_share_one_fetch():
+    calls = []
+
+    async def fetch(delay):
+        calls.append(delay)
+        await asyncio.sleep(delay)
+        return delay
+
+    async def scenario():
+        source = UpstreamSource("news", fetch, timeout=0.05)
+        readings = await asyncio.gather(*(source.get(None, 0.01) for _ in range(5)))
+        assert len(calls) == 1 and all(r.value == 0.01 and not r.stale for r in readings)
+
+        slow = await source.get(None, 1.0)
+        assert slow.stale and slow.value == 0.01
+        assert source.stats["timeouts"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,64 @@
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from compression import CompressionMiddleware, CompressionStats, choose_encoding
+
+
+def make_client(minimum_size=500):
+    app = FastAPI()
+    stats = CompressionStats()
+
+    @app.get("/big/{n}")
+    def big(n: int):
+        return [{"headline": "Bitcoin holds steady as traders wait", "price": 40000 + i} for i in range(n)]
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size, gzip_level=6, stats=stats)
+    return TestClient(app), stats
+
+
+def test_choose_encoding_respects_q_values():
+    assert choose_encoding("gzip, deflate, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert choose_encoding("br;q=0.5, gzip;q=0.8", brotli_available=True) == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*", brotli_available=False) == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+
+
+def test_large_json_is_gzipped_and_small_skipped():
+    client, stats = make_client()
+    response = client.get("/big/200", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 200  # the client decodes transparently
+    raw_size = len(json.dumps(response.json(), separators=(",", ":")))
+    assert int(response.headers["content-length"]) < raw_size / 5
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    routes = stats.snapshot()
+    assert routes["/big/{n}"]["compressed"] == 1
+    assert 0 < routes["/big/{n}"]["ratio"] < 0.2
+    assert routes["/small"]["skipped_small"] == 1
+
+
+def test_unmatched_paths_share_one_stats_bucket():
+    client, stats = make_client()
+    for path in ("/missing/1", "/missing/2", "/.env"):
+        assert client.get(path, headers={"Accept-Encoding": "gzip"}).status_code == 404
+    assert list(stats.snapshot()) == ["<unmatched>"]
+    assert stats.snapshot()["<unmatched>"]["responses"] == 3
+
+
+def test_no_accept_encoding_passes_through():
+    client, stats = make_client()
+    response = client.get("/big/50", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()) == 50
+    assert stats.snapshot() == {}
@@ -0,0 +1,44 @@
+import asyncio
+
+from circuit_breaker import UpstreamSource
+from news_feed import NewsFeed
+
+
+def decision_calls(server):
+    return [kind for kind, _ in server.fake_llm.calls if kind == "decision"]
+
+
+def new_worker(server, monkeypatch):
+    """Fresh per-process news and price state over the same shared stores"""
+    monkeypatch.setattr(server, "news_feed", NewsFeed(server.sentiment_backend))
+    monkeypatch.setattr(server, "price_source", UpstreamSource("coingecko", server.fetch_coingecko_prices))
+    monkeypatch.setattr(server, "news_source", UpstreamSource("coindesk", server.fetch_coindesk_headlines))
+
+
+def test_last_decision_is_shared_across_workers(server, monkeypatch):
+    server.fake_llm.actions["BTC"] = "HOLD"
+    first = asyncio.run(server.execute_trading_pipeline("BTC"))
+    assert first.decision == "HOLD" and len(decision_calls(server)) == 1
+
+    new_worker(server, monkeypatch)
+    skipped = asyncio.run(server.execute_trading_pipeline("BTC"))
+    assert skipped.verdict.startswith("LLM skipped") and len(decision_calls(server)) == 1
+
+    server.fake_upstream.headlines = ["Exchange hacked as prices crash"]
+    new_worker(server, monkeypatch)
+    asyncio.run(server.execute_trading_pipeline("BTC"))
+    assert len(decision_calls(server)) == 2
+
+
+def test_sentiment_point_is_stored_when_the_twitter_label_changes(server, monkeypatch):
+    labels = iter(["Neutral", "Neutral", "Positive"])
+
+    async def twitter_sentiment():
+        return [], next(labels)
+
+    monkeypatch.setattr(server, "get_twitter_sentiment", twitter_sentiment)
+    for _ in range(3):
+        asyncio.run(server.get_market_snapshot(["BTC"]))
+    history = asyncio.run(server.sentiment_history_store.get("all"))
+    assert [point["twitter_sentiment"] for point in history] == ["Neutral", "Positive"]
+    assert history[1]["news_items"] == []
@@ -0,0 +1,34 @@
+import json
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+from fast_json import FastJSONResponse, construct_many
+
+
+class Point(BaseModel):
+    timestamp: datetime
+    price: float
+    note: Optional[str] = None
+
+
+class Chart(BaseModel):
+    points: list
+    symbol: str = "BTC"
+
+
+def test_construct_skips_unknown_keys_and_fills_defaults():
+    docs = [{"_id": ObjectId(), "timestamp": datetime(2024, 1, 1), "price": 1.5, "has_detail": True}]
+    (point,) = construct_many(Point, docs)
+    assert point.note is None
+    assert not hasattr(point, "_id")
+
+
+def test_body_matches_default_encoding():
+    ts = datetime(2024, 1, 1, 12, 30, 15, 123456)
+    chart = Chart(points=[Point(timestamp=ts, price=2.0)])
+    body = json.loads(FastJSONResponse(chart).body)
+    assert body == json.loads(chart.model_dump_json())
+    assert json.loads(FastJSONResponse({"id": ObjectId("65a000000000000000000000")}).body) == {"id": "65a000000000000000000000"}
@@ -0,0 +1,62 @@
+import sys
+import time
+
+import pytest
+
+import lazy_imports
+from lazy_imports import LazyModule
+
+
+@pytest.fixture
+def module_dir(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    for name in ("lazy_fixture_mod", "slow_fixture_pkg", "slow_fixture_dep"):
+        sys.modules.pop(name, None)
+
+
+def test_lazy_module_imports_on_first_attribute_access(module_dir):
+    (module_dir / "lazy_fixture_mod.py").write_text("VALUE = 42\n")
+    module = LazyModule("lazy_fixture_mod")
+
+    assert not module.loaded
+    assert "lazy_fixture_mod" not in sys.modules
+    assert module.VALUE == 42
+    assert module.loaded
+    assert module.load() is sys.modules["lazy_fixture_mod"]
+
+
+def test_missing_module_fails_on_use_not_on_declaration():
+    module = LazyModule("no_such_module_for_lazy_test")
+    with pytest.raises(ImportError):
+        module.anything
+
+
+def test_lazy_import_registers_once_and_reports_import_time(module_dir):
+    (module_dir / "lazy_fixture_mod.py").write_text("VALUE = 1\n")
+    module = lazy_imports.lazy_import("lazy_fixture_mod")
+    assert lazy_imports.lazy_import("lazy_fixture_mod") is module
+    assert lazy_imports.report()["lazy"]["lazy_fixture_mod"] == {"loaded": False, "import_ms": None}
+
+    lazy_imports.preload(["lazy_fixture_mod"])
+
+    info = lazy_imports.report()["lazy"]["lazy_fixture_mod"]
+    assert info["loaded"] and info["import_ms"] >= 0
+
+
+def test_tracking_attributes_nested_imports_to_the_outermost_package(module_dir):
+    (module_dir / "slow_fixture_dep.py").write_text("import time\ntime.sleep(0.05)\n")
+    (module_dir / "slow_fixture_pkg.py").write_text("import slow_fixture_dep\n")
+
+    lazy_imports.start_tracking()
+    try:
+        exec("import slow_fixture_pkg")
+    finally:
+        lazy_imports.stop_tracking()
+
+    data = lazy_imports.report(ready_at=time.time())
+    assert data["eager_by_package_ms"]["slow_fixture_pkg"] >= 50
+    assert "slow_fixture_dep" not in data["eager_by_package_ms"]
+    assert data["eager_import_ms"] >= 50
+    assert data["process_start_to_ready_ms"] > 0
+    assert "slow_fixture_pkg" in lazy_imports.format_report(data)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_cassette import CassetteMiss, LLMCassette
+
+
+class Message:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeChat:
+    def __init__(self):
+        self.calls = 0
+
+    async def send_message(self, message):
+        self.calls += 1
+        return f'{{"echo": "{message.text}"}}'
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    live = FakeChat()
+    recorder = LLMCassette(path, mode="record")
+    chat = recorder.wrap(live, "trading", "gpt-4-turbo", "system")
+    assert asyncio.run(chat.send_message(Message("price 100"))) == '{"echo": "price 100"}'
+    assert live.calls == 1
+
+    player = LLMCassette(path, mode="replay")
+    replay_chat = player.wrap(None, "trading", "gpt-4-turbo", "system")
+    assert asyncio.run(replay_chat.send_message(Message("price 100"))) == '{"echo": "price 100"}'
+    assert player.snapshot()["hits"] == 1
+
+    with pytest.raises(CassetteMiss):
+        asyncio.run(replay_chat.send_message(Message("price 101")))
+
+
+def test_replay_miss_fallback_and_latency(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    LLMCassette(path, mode="record").record("trading", "gpt-4-turbo", "system", "a", "response-a")
+
+    player = LLMCassette(path, mode="replay", latency_ms=20, on_miss="any")
+    chat = player.wrap(None, "trading", "gpt-4-turbo", "system")
+    start = time.perf_counter()
+    assert asyncio.run(chat.send_message(Message("unseen prompt"))) == "response-a"
+    assert time.perf_counter() - start >= 0.02
+    assert player.snapshot()["fallbacks"] == 1
+
+
+def test_off_mode_returns_chat_unchanged(tmp_path):
+    live = FakeChat()
+    assert LLMCassette(tmp_path / "c.jsonl").wrap(live, "trading", "m", "s") is live
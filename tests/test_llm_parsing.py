@@ -0,0 +1,58 @@
+import pytest
+
+from llm_parsing import LLMOutputError, ParseStats, extract_json_object, parse_llm_output, repair_json
+
+
+def test_plain_json():
+    assert extract_json_object('{"action": "BUY"}') == {"action": "BUY"}
+
+
+def test_fenced_block_with_prose():
+    text = 'Here is my decision:\n```json\n{"action": "SELL", "confidence": 0.7}\n```\nGood luck!'
+    assert extract_json_object(text) == {"action": "SELL", "confidence": 0.7}
+
+
+def test_leading_and_trailing_text():
+    text = 'Decision follows {"a": {"b": "brace } in string"}} and that is all'
+    assert extract_json_object(text) == {"a": {"b": "brace } in string"}}
+
+
+def test_trailing_commas_and_single_quotes():
+    text = "{'action': 'HOLD', 'steps': ['it\\'s flat', 'wait',], 'valid': True,}"
+    assert extract_json_object(text) == {"action": "HOLD", "steps": ["it's flat", "wait"], "valid": True}
+
+
+def test_truncated_object_is_closed():
+    assert extract_json_object('{"steps": ["a", "b"') == {"steps": ["a", "b"]}
+
+
+def test_truncated_nesting_is_closed_in_order_ignoring_brackets_in_strings():
+    assert repair_json('{"decisions": {"BTC": {"a": [1, {"b": 2') == '{"decisions": {"BTC": {"a": [1, {"b": 2}]}}}'
+    text = '{"reasoning": "range [low, high", "steps": [{"note": "use {x}"'
+    assert extract_json_object(text) == {"reasoning": "range [low, high", "steps": [{"note": "use {x}"}]}
+
+
+def test_no_json_raises():
+    with pytest.raises(LLMOutputError):
+        extract_json_object("I cannot make a decision right now.")
+
+
+def test_validator_errors_become_output_errors():
+    def validate(payload):
+        return payload["trading_decision"]
+
+    with pytest.raises(LLMOutputError):
+        parse_llm_output('{"chain_of_thought": {}}', validate)
+
+
+def test_parse_stats_success_rate():
+    stats = ParseStats()
+    stats.record("gpt-4-turbo", "parsed")
+    stats.record("gpt-4-turbo", "repaired")
+    stats.record("gpt-4-turbo", "failed")
+    stats.record("gpt-4-turbo", "parsed")
+
+    snapshot = stats.snapshot()["gpt-4-turbo"]
+    assert snapshot["total"] == 4
+    assert snapshot["success_rate"] == 0.75
+    assert snapshot["first_pass_rate"] == 0.5
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import aiohttp
+
+from benchmarks.load import compare, percentile, summarize
+from benchmarks.stubs import StubBehavior, UpstreamStubs
+
+
+def test_percentiles_interpolate_between_ranks():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50.5
+    assert percentile(values, 99) == 99.01
+    assert percentile([], 95) == 0.0
+
+
+def test_summary_and_baseline_comparison():
+    latencies = {"GET /api/portfolio": [1.0] * 95 + [2.0] * 5, "GET /api/market/data": [100.0] * 100}
+    baseline = summarize(latencies, {}, elapsed=10.0)
+    assert baseline["GET /api/portfolio"]["throughput_rps"] == 10.0
+    assert baseline["TOTAL"]["requests"] == 200
+
+    slower = summarize({**latencies, "GET /api/market/data": [100.0] * 90 + [200.0] * 10}, {}, elapsed=10.0)
+    regressions = compare(slower, baseline, tolerance=0.2)
+    assert {(r["endpoint"], r["metric"]) for r in regressions} >= {("GET /api/market/data", "p95_ms")}
+    assert all(r["endpoint"] != "GET /api/portfolio" for r in regressions)
+    assert compare(baseline, baseline) == []
+
+
+def test_stubs_answer_the_pipeline_prompts_and_inject_errors():
+    stubs = UpstreamStubs(prices=StubBehavior(error_rate=1.0), llm=StubBehavior(latency_ms=5)).start()
+    env = stubs.env()
+
+    async def scenario():
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{env['COINGECKO_API_URL']}/simple/price?ids=bitcoin") as response:
+                assert response.status == 503
+            async with session.get(env["COINDESK_RSS_URL"]) as response:
+                assert "<item><title>" in await response.text()
+            payload = {"messages": [
+                {"role": "system", "content": 'Respond with {"decisions": {...}}'},
+                {"role": "user", "content": "Assets: BTC, ETH\n..."},
+            ]}
+            async with session.post(f"{env['LLM_API_BASE']}/chat/completions", json=payload) as response:
+                content = (await response.json())["choices"][0]["message"]["content"]
+        return json.loads(content)
+
+    try:
+        answer = asyncio.run(scenario())
+    finally:
+        stubs.stop()
+    assert set(answer["decisions"]) == {"BTC", "ETH"}
+    assert stubs.stats["prices"] == {"requests": 1, "errors": 1}
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import HTTPException
+
+
+def price_urls(server):
+    return [url for url in server.fake_upstream.urls if "/simple/price" in url]
+
+
+def test_basket_prices_come_from_one_batched_request(server):
+    prices = asyncio.run(server.get_market_prices(["BTC", "ETH", "SOL"]))
+    urls = price_urls(server)
+    assert len(urls) == 1
+    assert parse_qs(urlparse(urls[0]).query)["ids"][0].split(",") == ["bitcoin", "ethereum", "solana"]
+    assert prices["BTC"][0] == 50000.0 and prices["ETH"][0] == 2500.0 and prices["SOL"][0] == 100.0
+    assert prices["BTC"][1] == pytest.approx(0.02)
+
+
+def test_symbols_missing_from_the_response_fall_back(server):
+    del server.fake_upstream.prices["solana"]
+    quotes = asyncio.run(server.fetch_coingecko_prices(["BTC", "ETH", "SOL"]))
+    assert set(quotes) == {"BTC", "ETH"}
+
+    prices = asyncio.run(server.get_market_prices(["BTC", "SOL"]))
+    assert prices["BTC"][0] == 50000.0
+    assert prices["SOL"] == server.fallback_price("SOL")
+
+    server.fake_upstream.prices.clear()
+    with pytest.raises(Exception):
+        asyncio.run(server.fetch_coingecko_prices(["BTC"]))
+
+
+def test_buy_splits_free_usd_across_assets_without_a_position(server):
+    async def scenario():
+        first = await server.execute_paper_trade("BUY", 50000.0, 1.0, "BTC")
+        second = await server.execute_paper_trade("BUY", 2500.0, 1.0, "ETH")
+        held = await server.execute_paper_trade("BUY", 2400.0, 1.0, "ETH")
+        return first, second, held
+
+    first, second, held = asyncio.run(scenario())
+    assert first.action == "BUY" and first.amount * 50000.0 == pytest.approx(1000.0 / 3)
+    assert second.action == "BUY" and second.amount * 2500.0 == pytest.approx(1000.0 / 3)
+    assert held.action == "HOLD"
+    assert server.portfolio.state.usd_balance == pytest.approx(1000.0 / 3)
+
+
+def test_trades_without_a_symbol_count_as_btc(server):
+    def trade(trade_id, **fields):
+        return {"id": trade_id, "timestamp": datetime(2024, 1, 1, 0, 0, int(trade_id)), "price": 1.0,
+                "decision": "HOLD", "confidence": 0.5, **fields}
+
+    asyncio.run(server.db.trades.insert_many([trade("1"), trade("2", symbol="BTC"), trade("3", symbol="ETH")]))
+    assert server.symbol_query("ETH") == {"symbol": "ETH"}
+
+    def history(symbol):
+        response = asyncio.run(server.get_trade_history(symbol=symbol))
+        return sorted((t["id"], t["symbol"]) for t in json.loads(response.body))
+
+    assert history("btc") == [("1", "BTC"), ("2", "BTC")]
+    assert history("ETH") == [("3", "ETH")]
+    assert server.resolve_symbol("eth") == "ETH"
+    with pytest.raises(HTTPException) as error:
+        server.resolve_symbol("LUNA")
+    assert error.value.status_code == 400
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from benchmarks.memory_mongo import MemoryMongoClient
+from leader_election import LeaderLease
+from shared_state import MongoHistoryStore
+from trade_store import SUMMARY_PROJECTION, TradeStore
+
+
+def test_find_supports_operators_projection_sort_and_limit():
+    async def scenario():
+        trades = MemoryMongoClient()["db"].trades
+        start = datetime(2024, 1, 1)
+        await trades.insert_many([
+            {"id": str(i), "symbol": "ETH" if i % 3 == 0 else "BTC", "timestamp": start + timedelta(hours=i),
+             "decision": "HOLD" if i % 2 else "BUY", "reasoning": "long text"}
+            for i in range(10)
+        ])
+        await trades.insert_one({"id": "legacy", "timestamp": start - timedelta(days=1), "decision": "SELL"})
+
+        btc = {"$or": [{"symbol": "BTC"}, {"symbol": {"$exists": False}}]}
+        latest = await trades.find(btc, {"reasoning": 0}).sort("timestamp", -1).limit(3).to_list(3)
+        assert [t["id"] for t in latest] == ["8", "7", "5"]
+        assert "reasoning" not in latest[0] and "_id" in latest[0]
+
+        old_holds = await trades.find({"decision": "HOLD", "timestamp": {"$lt": start + timedelta(hours=5)}},
+                                      {"id": 1, "_id": 0}).to_list(None)
+        assert old_holds == [{"id": "1"}, {"id": "3"}]
+        assert await trades.count_documents({"id": {"$in": ["legacy", "2", "nope"]}}) == 2
+
+    asyncio.run(scenario())
+
+
+def test_updates_upserts_and_duplicate_ids():
+    async def scenario():
+        db = MemoryMongoClient()["db"]
+        await db.evidence.bulk_write([
+            UpdateOne({"_id": "h1"}, {"$setOnInsert": {"text": "a"}, "$inc": {"refs": 2}}, upsert=True),
+        ])
+        await db.evidence.bulk_write([
+            UpdateOne({"_id": "h1"}, {"$setOnInsert": {"text": "changed"}, "$inc": {"refs": -1}}, upsert=True),
+        ])
+        assert await db.evidence.find_one({"_id": "h1"}) == {"_id": "h1", "text": "a", "refs": 1}
+
+        doc = await db.series.find_one_and_update(
+            {"_id": "s"}, {"$push": {"items": {"$each": [1, 2, 3], "$slice": -2}}},
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        assert doc["items"] == [2, 3]
+
+        await db.trades.insert_many([{"_id": 1}, {"_id": 2}])
+        with pytest.raises(BulkWriteError) as error:
+            await db.trades.insert_many([{"_id": 2}, {"_id": 3}], ordered=False)
+        assert [e["code"] for e in error.value.details["writeErrors"]] == [11000]
+        assert await db.trades.count_documents({}) == 3
+
+    asyncio.run(scenario())
+
+
+def test_app_stores_run_on_the_stand_in():
+    async def scenario():
+        db = MemoryMongoClient("memory://?latency_ms=1")["db"]
+        store = TradeStore(db)
+        trade = {"id": "t1", "timestamp": datetime(2024, 1, 1), "price": 1.0, "decision": "BUY",
+                 "reasoning": "why", "chain_of_thought": None, "verdict": "ok", "evidence": ["headline"]}
+        await store.insert_many([trade])
+        assert "reasoning" not in (await db.trades.find({}, SUMMARY_PROJECTION).to_list(1))[0]
+        assert (await store.get("t1"))["evidence"] == ["headline"]
+
+        history = MongoHistoryStore(db.history, "price")
+        for i in range(5):
+            series = await history.append("BTC", i, limit=3)
+        assert series == [2, 3, 4]
+
+        first, second = LeaderLease(db.leases, holder="a"), LeaderLease(db.leases, holder="b")
+        assert await first.try_acquire()
+        assert not await second.try_acquire()
+
+    asyncio.run(scenario())
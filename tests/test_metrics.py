@@ -0,0 +1,88 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from metrics import EventLoopLagMonitor, MetricsRegistry, MongoCommandTimer
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, stage="decision_llm")
+
+    text = registry.render()
+
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="decision_llm",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="decision_llm",le="1"} 3' in text
+    assert 'stage_seconds_bucket{stage="decision_llm",le="+Inf"} 4' in text
+    assert 'stage_seconds_sum{stage="decision_llm"} 4.05' in text
+    assert 'stage_seconds_count{stage="decision_llm"} 4' in text
+
+
+def test_time_observes_blocks_that_raise():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ["stage"])
+    with pytest.raises(RuntimeError):
+        with latency.time(stage="news_rss"):
+            raise RuntimeError("feed down")
+    assert latency.count(stage="news_rss") == 1
+
+
+def test_labels_must_match_and_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("errors_total", "Errors", ["source"])
+    with pytest.raises(ValueError):
+        counter.inc(stage="x")
+    counter.inc(source='say "hi"\n')
+    assert 'errors_total{source="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+def test_callback_gauge_reads_at_scrape_time_and_skips_unknown_values():
+    sizes = {"BTC": 3}
+    registry = MetricsRegistry()
+    registry.gauge("history_points", "Points", lambda: {(symbol,): n for symbol, n in sizes.items()}, ["symbol"])
+    registry.gauge("hit_ratio", "Hits", lambda: None)
+    sizes["ETH"] = 7
+
+    text = registry.render()
+    assert 'history_points{symbol="ETH"} 7' in text
+    assert "\nhit_ratio " not in text
+
+
+def test_mongo_listener_times_commands_by_collection():
+    registry = MetricsRegistry()
+    durations = registry.histogram("mongo_seconds", "Mongo", ["command", "collection"])
+    failures = registry.counter("mongo_failures_total", "Failures", ["command", "collection"])
+    timer = MongoCommandTimer(durations, failures)
+
+    def event(name, command=None, micros=0):
+        return SimpleNamespace(command_name=name, command=command or {}, request_id=1, connection_id=("h", 1),
+                               operation_id=1, duration_micros=micros)
+
+    timer.started(event("find", {"find": "trades", "filter": {}}))
+    timer.succeeded(event("find", micros=2500))
+    timer.started(event("getMore", {"getMore": 12345, "collection": "trades"}))
+    timer.failed(event("getMore", micros=1000))
+
+    assert durations.count(command="find", collection="trades") == 1
+    assert durations.total(command="find", collection="trades") == pytest.approx(0.0025)
+    assert failures.value(command="getMore", collection="trades") == 1
+
+
+def test_event_loop_lag_monitor_sees_blocking_work():
+    registry = MetricsRegistry()
+    monitor = EventLoopLagMonitor(registry.histogram("lag_seconds", "Lag"), interval=0.01)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # blocks the loop
+        await asyncio.sleep(0.03)
+        monitor.stop()
+
+    asyncio.run(scenario())
+    assert monitor.max_lag >= 0.05
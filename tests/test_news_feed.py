@@ -0,0 +1,78 @@
+from dedup import SeenSet
+from news_feed import Headline, NewsFeed, headline_key
+from sentiment import LexiconBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingBackend(LexiconBackend):
+    def __init__(self):
+        super().__init__()
+        self.scored = []
+
+    def score_batch(self, texts):
+        self.scored.append(list(texts))
+        return super().score_batch(texts)
+
+
+def headlines(*titles):
+    return [Headline(headline_key(None, title), title) for title in titles]
+
+
+def test_seen_set_forgets_keys_not_seen_within_ttl():
+    clock = FakeClock()
+    seen = SeenSet(max_size=10, ttl=60, clock=clock)
+    assert seen.add("a") and seen.add("b")
+    clock.now = 50
+    assert not seen.add("a")  # refreshed: now expires at 110
+    clock.now = 70
+    assert "b" not in seen and "a" in seen and len(seen) == 1
+    clock.now = 111
+    assert seen.add("a")
+
+
+def test_only_unseen_headlines_are_scored_and_emitted():
+    backend = CountingBackend()
+    feed = NewsFeed(backend)
+    first = feed.observe(headlines("Bitcoin surges to record", "Exchange hacked"), fetched_at=1)
+    assert [event.seq for event in first] == [1, 2] and feed.generation == 1
+    assert [event.label for event in first] == ["Positive", "Negative"]
+
+    assert feed.observe(headlines("Bitcoin surges to record", "Exchange hacked"), fetched_at=1) == []  # cached read
+    assert feed.observe(headlines("Bitcoin surges to record", "Exchange hacked"), fetched_at=2) == []
+    assert feed.generation == 1
+
+    second = feed.observe(headlines("Ether rallies", "Bitcoin surges to record"), fetched_at=3)
+    assert [event.title for event in second] == ["Ether rallies"] and feed.generation == 2
+    assert backend.scored == [["Bitcoin surges to record", "Exchange hacked"], ["Ether rallies"]]
+    assert feed.sentiment() == "Positive"
+    assert [event.title for event in feed.events_since(1)] == ["Exchange hacked", "Ether rallies"]
+    assert feed.snapshot()["new"] == 3
+
+
+def test_headline_key_prefers_guid_and_expired_headlines_are_new_again():
+    assert headline_key("guid-1", "Title") == "guid-1"
+    assert headline_key(None, "Bitcoin rallies!") == headline_key(None, "bitcoin rallies")
+
+    clock = FakeClock()
+    feed = NewsFeed(LexiconBackend(), seen_ttl=3600, clock=clock)
+    feed.observe(headlines("Bitcoin rallies"), fetched_at=1)
+    clock.now = 3601
+    assert len(feed.observe(headlines("Bitcoin rallies"), fetched_at=2)) == 1
+
+
+def test_digest_depends_only_on_the_current_headlines():
+    first, second = NewsFeed(LexiconBackend()), NewsFeed(LexiconBackend())
+    assert first.digest() == ""
+    first.observe(headlines("Ether rallies"), fetched_at=1)
+    first.observe(headlines("Bitcoin rallies", "Ether rallies"), fetched_at=2)
+    second.observe(headlines("Ether rallies", "Bitcoin rallies"), fetched_at=1)
+    assert first.generation != second.generation and first.digest() == second.digest()
+    second.observe(headlines("Exchange hacked"), fetched_at=2)
+    assert first.digest() != second.digest()
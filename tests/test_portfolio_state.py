@@ -0,0 +1,75 @@
+import asyncio
+import random
+
+from portfolio_state import PortfolioManager
+
+SYMBOLS = ["BTC", "ETH", "SOL"]
+
+
+def test_buy_then_sell_round_trip():
+    async def scenario():
+        manager = PortfolioManager(1000.0)
+        buy = await manager.execute_trade("BUY", 100.0, "BTC", SYMBOLS)
+        assert buy.action == "BUY"
+        assert round(buy.state.usd_balance, 6) == round(1000.0 - 1000.0 / 3, 6)
+        assert (await manager.execute_trade("BUY", 90.0, "BTC", SYMBOLS)).action == "HOLD"
+        sell = await manager.execute_trade("SELL", 110.0, "BTC", SYMBOLS)
+        assert sell.action == "SELL"
+        assert round(sell.profit_loss, 6) == round(buy.amount * 10.0, 6)
+        assert manager.state.amount("BTC") == 0.0
+        assert manager.state.trade_count == 2
+        assert manager.state.version == 3
+
+    asyncio.run(scenario())
+
+
+def test_initial_balance_only_before_first_trade():
+    async def scenario():
+        manager = PortfolioManager(1000.0)
+        assert await manager.set_initial_balance(5000.0)
+        await manager.execute_trade("BUY", 100.0, "BTC", ["BTC"])
+        assert not await manager.set_initial_balance(10.0)
+        assert manager.state.amount("BTC") == 50.0
+
+    asyncio.run(scenario())
+
+
+def test_snapshots_are_bounded():
+    async def scenario():
+        manager = PortfolioManager(1000.0)
+        for _ in range(10):
+            await manager.execute_trade("HOLD", 100.0, "BTC", ["BTC"], make_snapshot=lambda s, p: s.usd_balance, snapshot_limit=4)
+        assert len(manager.state.snapshots) == 4
+        await manager.trim_snapshots(2)
+        assert len(manager.state.snapshots) == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_triggers_never_double_spend():
+    """Hundreds of interleaved BUY/SELL triggers at one price must conserve value"""
+    async def trigger(manager, rng, reads):
+        await asyncio.sleep(rng.random() / 1000)
+        state = manager.state
+        reads.append(state)
+        await asyncio.sleep(0)
+        return await manager.execute_trade(rng.choice(["BUY", "SELL", "HOLD"]), 100.0, rng.choice(SYMBOLS), SYMBOLS)
+
+    async def scenario():
+        rng = random.Random(7)
+        manager = PortfolioManager(1000.0)
+        reads = []
+        executions = await asyncio.gather(*(trigger(manager, rng, reads) for _ in range(500)))
+
+        state = manager.state
+        assert state.version == 500
+        assert state.trade_count == sum(e.action != "HOLD" for e in executions)
+        assert state.usd_balance >= 0
+        assert all(amount > 0 for amount in state.holdings.values())
+        assert abs(state.usd_balance + 100.0 * sum(state.holdings.values()) - 1000.0) < 1e-6
+        for read in reads:
+            assert read.usd_balance >= 0
+            assert abs(read.usd_balance + 100.0 * sum(read.holdings.values()) - 1000.0) < 1e-6
+        assert sorted(e.state.version for e in executions) == list(range(1, 501))
+
+    asyncio.run(scenario())
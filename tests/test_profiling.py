@@ -0,0 +1,79 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from profiling import ProfileStore, ProfilingMiddleware
+
+
+def crunch(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def make_client(tmp_path, **options):
+    app = FastAPI()
+    store = ProfileStore(tmp_path / "profiles")
+    stats = {}
+
+    @app.get("/slow")
+    async def slow():
+        crunch(0.1)
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, store=store, interval=0.001, stats=stats, **options)
+    return TestClient(app), store, stats
+
+
+def test_header_profiles_one_request_in_folded_format(tmp_path):
+    client, store, stats = make_client(tmp_path)
+
+    response = client.get("/slow", headers={"X-Profile": "1"})
+
+    profile_id = response.headers["x-profile-id"]
+    (meta,) = store.list()
+    assert meta["id"] == profile_id
+    assert meta["path"] == "/slow" and meta["status"] == 200 and meta["trigger"] == "header"
+    assert meta["samples"] >= 5
+    folded = store.read(profile_id)
+    crunch_samples = sum(int(line.rsplit(" ", 1)[1]) for line in folded.splitlines() if "crunch (test_profiling.py" in line)
+    assert crunch_samples > meta["samples"] / 2
+    assert stats["profiled"] == 1
+
+
+def test_unselected_requests_are_not_profiled(tmp_path):
+    client, store, _ = make_client(tmp_path, token="secret")
+
+    plain = client.get("/slow")
+    wrong_token = client.get("/slow", headers={"X-Profile": "1"})
+
+    assert "x-profile-id" not in plain.headers and "x-profile-id" not in wrong_token.headers
+    assert store.list() == []
+    assert client.get("/slow", headers={"X-Profile": "secret"}).headers["x-profile-id"]
+
+
+def test_sample_rate_selects_requests(tmp_path):
+    client, store, _ = make_client(tmp_path, sample_rate=1.0)
+    client.get("/slow")
+    assert store.list()[0]["trigger"] == "sampled"
+
+
+def test_store_evicts_oldest_by_count_and_size(tmp_path):
+    store = ProfileStore(tmp_path, max_profiles=3, max_bytes=250)
+    ids = []
+    for i in range(5):
+        profile_id = f"2024010{i + 1}T000000-0000000{i}"
+        store.save(profile_id, {}, "main;work 1\n" * 5)  # 60 bytes each
+        ids.append(profile_id)
+    assert [meta["id"] for meta in store.list()] == ids[:1:-1]
+
+    store.save("20240106T000000-00000005", {}, "x" * 200)
+    assert [meta["id"] for meta in store.list()] == ["20240106T000000-00000005"]
+
+
+def test_read_rejects_ids_outside_the_store(tmp_path):
+    store = ProfileStore(tmp_path / "profiles")
+    (tmp_path / "secret.folded").write_text("nope")
+    assert store.read("../secret") is None
+    assert store.read("20240101T000000-deadbeef") is None
@@ -0,0 +1,41 @@
+from prompt_builder import PromptBuilder, compact_headline, compact_list, count_tokens, summarize_series
+
+
+def test_required_sections_always_included():
+    prompt = PromptBuilder(budget_tokens=5).add("x" * 100, required=True).build()
+    assert prompt.text == "x" * 100
+    assert prompt.tokens == count_tokens("x" * 100)
+
+
+def test_list_is_trimmed_to_budget_by_priority():
+    headlines = [f"Headline number {i} about bitcoin markets" for i in range(20)]
+    builder = PromptBuilder(budget_tokens=80)
+    builder.add("Price: $50,000", required=True)
+    builder.add("Indicators: price trend up", priority=1)
+    builder.add_list("News Headlines:", headlines, priority=2)
+    prompt = builder.build()
+
+    assert "Indicators: price trend up" in prompt.text
+    assert "Headline number 0" in prompt.text
+    assert "Headline number 19" not in prompt.text
+    assert prompt.dropped_items > 0
+    assert prompt.tokens <= 80
+
+
+def test_sections_keep_insertion_order():
+    builder = PromptBuilder(budget_tokens=1000)
+    builder.add("low priority first", priority=5)
+    builder.add("required last", required=True)
+    assert builder.build().text == "low priority first\nrequired last"
+
+
+def test_compact_headline_and_list():
+    assert compact_headline("  Bitcoin   rallies - CoinDesk ") == "Bitcoin rallies"
+    assert len(compact_headline("a" * 300, max_chars=50)) == 50
+    assert compact_list(["Same story", "same  story", "Other"]) == ["Same story", "Other"]
+
+
+def test_summarize_series():
+    assert summarize_series("Price", []) is None
+    summary = summarize_series("Price", [100.0, 110.0])
+    assert "+10.00%" in summary and "2 pts" in summary
@@ -0,0 +1,92 @@
+import asyncio
+
+from circuit_breaker import UpstreamSource
+from rate_limiter import LANE_DASHBOARD, LANE_TRADING, Lane, RateLimiter
+
+
+def test_bucket_grants_burst_then_serves_trading_lane_first():
+    async def scenario():
+        # One token per 50ms after a burst of two
+        limiter = RateLimiter("prices", rate_per_minute=1200, burst=2,
+                              lanes={LANE_TRADING: Lane(0, 1.0), LANE_DASHBOARD: Lane(1, 1.0)})
+        assert await limiter.acquire(LANE_DASHBOARD)
+        assert await limiter.acquire(LANE_DASHBOARD)
+
+        order = []
+
+        async def call(lane, tag):
+            await limiter.acquire(lane)
+            order.append(tag)
+
+        dashboards = [asyncio.create_task(call(LANE_DASHBOARD, f"chart{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        trading = asyncio.create_task(call(LANE_TRADING, "pipeline"))
+        await asyncio.gather(trading, *dashboards)
+        assert order == ["pipeline", "chart0", "chart1"]
+        return limiter.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["lanes"][LANE_DASHBOARD]["granted"] == 4
+    assert snapshot["lanes"][LANE_DASHBOARD]["throttled"] == 2
+    assert snapshot["lanes"][LANE_TRADING]["throttled"] == 1
+
+
+def test_callers_give_up_after_max_wait_and_429_holds_the_bucket_shut():
+    async def scenario():
+        limiter = RateLimiter("news", rate_per_minute=6000, burst=1,
+                              lanes={LANE_DASHBOARD: Lane(1, 0.05), LANE_TRADING: Lane(0, 0.0)})
+        limiter.penalize(0.2)
+        assert not await limiter.acquire(LANE_TRADING)  # no waiting in this lane
+        assert not await limiter.acquire(LANE_DASHBOARD)
+        await asyncio.sleep(0.2)
+        assert await limiter.acquire(LANE_DASHBOARD)
+        return limiter.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["penalties"] == 1
+    assert snapshot["lanes"][LANE_DASHBOARD]["rejected"] == 1
+    assert snapshot["lanes"][LANE_TRADING]["rejected"] == 1
+
+
+def test_throttled_readers_get_the_last_good_value_without_fetching():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def scenario():
+        limiter = RateLimiter("prices", rate_per_minute=60, burst=1,
+                              lanes={LANE_TRADING: Lane(0, 5.0), LANE_DASHBOARD: Lane(1, 5.0, stale_ok=True)})
+        source = UpstreamSource("prices", fetch, limiter=limiter)
+        first = await source.get()
+        throttled = await asyncio.gather(*(source.get(lane=LANE_DASHBOARD) for _ in range(10)))
+        assert not first.stale and all(r.stale and r.value == 1 for r in throttled)
+        assert calls == [1]
+        return source.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["throttled"] == 10
+    assert snapshot["rate_limit"]["lanes"][LANE_DASHBOARD]["throttled"] == 10
+
+
+def test_trading_lane_reuses_a_recent_value_instead_of_waiting():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        limiter = RateLimiter("prices", rate_per_minute=1, burst=1,
+                              lanes={LANE_TRADING: Lane(0, 5.0, reuse_within=60.0)})
+        source = UpstreamSource("prices", fetch, limiter=limiter)
+        await source.get(lane=LANE_TRADING)
+        started = asyncio.get_running_loop().time()
+        reading = await source.get(lane=LANE_TRADING)
+        return reading, asyncio.get_running_loop().time() - started
+
+    reading, waited = asyncio.run(scenario())
+    assert reading.stale and reading.value == 1 and calls == [1]
+    assert waited < 1.0
@@ -0,0 +1,94 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import retention
+from benchmarks.memory_mongo import MemoryMongoClient
+from retention import RetentionJob, period_start, read_archive, summarize_holds, summary_update, write_archive
+
+
+def hold(timestamp, price, symbol="BTC", news="Positive"):
+    return {"symbol": symbol, "timestamp": timestamp, "price": price, "confidence": 0.5,
+            "decision": "HOLD", "news_sentiment": news, "twitter_sentiment": None}
+
+
+def test_period_start_buckets():
+    ts = datetime(2024, 3, 5, 17, 42)
+    assert period_start(ts, 24) == datetime(2024, 3, 5)
+    assert period_start(ts, 6) == datetime(2024, 3, 5, 12)
+
+
+def test_summarize_holds_groups_by_symbol_and_period():
+    base = datetime(2024, 3, 5)
+    trades = [
+        hold(base + timedelta(hours=1), 100.0),
+        hold(base + timedelta(hours=5), 110.0, news="Negative"),
+        hold(base + timedelta(hours=30), 90.0),
+        hold(base + timedelta(hours=2), 2000.0, symbol="ETH"),
+    ]
+    summaries = {(s["symbol"], s["period_start"]): s for s in summarize_holds(trades, 24)}
+    assert len(summaries) == 3
+    btc = summaries[("BTC", base)]
+    assert btc["hold_count"] == 2
+    assert (btc["price_min"], btc["price_max"], btc["price_sum"]) == (100.0, 110.0, 210.0)
+    assert btc["news_sentiment"] == {"Positive": 1, "Negative": 1}
+    assert btc["twitter_sentiment"] == {"Unknown": 2}
+    assert btc["period_end"] == base + timedelta(days=1)
+
+    query, update = summary_update(btc)
+    assert query == {"symbol": "BTC", "period_start": base}
+    assert update["$inc"]["hold_count"] == 2
+    assert update["$inc"]["news_sentiment.Negative"] == 1
+    assert update["$min"]["price_min"] == 100.0
+
+
+def test_archive_round_trip(tmp_path):
+    base = datetime(2024, 1, 1)
+    trades = [hold(base + timedelta(minutes=i), 100.0 + i) for i in range(50)]
+    path = write_archive(tmp_path, trades)
+    assert path.name.endswith(".jsonl.gz")
+    assert not list(tmp_path.glob("*.tmp"))
+    restored = read_archive(path)
+    assert [t["price"] for t in restored] == [t["price"] for t in trades]
+    assert restored[0]["timestamp"] == str(base)
+
+
+def test_archive_is_fsynced_before_it_is_renamed(tmp_path, monkeypatch):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(retention.os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+    write_archive(tmp_path, [hold(datetime(2024, 1, 1), 100.0)])
+    assert len(synced) == 2  # the temp file, then the directory entry of the rename
+
+
+def test_compaction_interrupted_before_the_delete_is_not_counted_twice(tmp_path, monkeypatch):
+    db = MemoryMongoClient("memory://")["test"]
+    base = datetime(2024, 3, 5)
+    # Two rows share a timestamp across the chunk boundary
+    times = [base + timedelta(hours=1), base + timedelta(hours=2), base + timedelta(hours=3),
+             base + timedelta(hours=3), base + timedelta(hours=4)]
+    rows = [{**hold(ts, 100.0 + i), "id": f"t{i}"} for i, ts in enumerate(times)]
+    settings = SimpleNamespace(trade_archive_after_days=0, hold_compaction_after_days=1, hold_summary_period_hours=24)
+    job = RetentionJob(db, tmp_path, chunk_size=3)
+    delete = job._delete
+
+    async def crash_on_second_chunk(chunk):
+        if chunk[0]["id"] == "t3":
+            raise RuntimeError("worker killed")
+        return await delete(chunk)
+
+    async def scenario():
+        await db.trades.insert_many(rows)
+        monkeypatch.setattr(job, "_delete", crash_on_second_chunk)
+        assert "error" in await job.run_once(settings, now=base + timedelta(days=10))
+        monkeypatch.setattr(job, "_delete", delete)
+        report = await job.run_once(settings, now=base + timedelta(days=10))
+        return report, await db.trade_summaries.find({}).to_list(None)
+
+    report, summaries = asyncio.run(scenario())
+    assert report["compacted"] == 2 and "error" not in report
+    assert len(summaries) == 1
+    assert summaries[0]["hold_count"] == 5
+    assert summaries[0]["price_sum"] == sum(100.0 + i for i in range(5))
+    assert summaries[0]["last_ids"] == ["t4"]
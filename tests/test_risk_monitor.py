@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from risk_monitor import STOP_LOSS, TAKE_PROFIT, RiskMonitor
+
+
+def test_stop_loss_fires_once():
+    monitor = RiskMonitor(stop_loss_percentage=5, take_profit_percentage=10)
+    monitor.open_position("BTC", 100.0)
+    assert monitor.on_tick("BTC", 96.0) is None
+    assert monitor.on_tick("BTC", 95.0) == STOP_LOSS
+    assert monitor.on_tick("BTC", 90.0) is None
+    assert not monitor.has_open_positions()
+
+
+def test_take_profit_and_untracked_symbol():
+    monitor = RiskMonitor(stop_loss_percentage=5, take_profit_percentage=10)
+    monitor.open_position("ETH", 200.0)
+    assert monitor.on_tick("BTC", 1.0) is None
+    assert monitor.on_tick("ETH", 221.0) == TAKE_PROFIT
+
+
+def test_configure_recomputes_open_levels():
+    monitor = RiskMonitor(stop_loss_percentage=5)
+    monitor.open_position("BTC", 100.0)
+    monitor.configure(SimpleNamespace(
+        stop_loss_percentage=1, take_profit_percentage=0, max_trades_per_day=10, confidence_threshold=0.6
+    ))
+    assert monitor.on_tick("BTC", 99.0) == STOP_LOSS
+
+
+def test_confidence_gate_and_daily_cap_reason():
+    monitor = RiskMonitor(max_trades_per_day=2, confidence_threshold=0.6)
+    assert monitor.check_decision("HOLD", 0.1) == (True, None)
+    allowed, reason = monitor.check_decision("BUY", 0.5)
+    assert not allowed and "confidence" in reason
+    assert monitor.check_decision("SELL", 0.9) == (True, None)
+    assert "daily trade cap of 2" in monitor.daily_cap_blocked("SELL")
+    assert monitor.snapshot()["blocked_daily_cap"] == 1
+
+
+def test_sync_positions_follows_shared_portfolio():
+    monitor = RiskMonitor(stop_loss_percentage=5, take_profit_percentage=10)
+    monitor.open_position("BTC", 100.0)
+    monitor.sync_positions({"ETH": 200.0})
+    assert monitor.on_tick("BTC", 1.0) is None
+    assert monitor.on_tick("ETH", 189.0) == STOP_LOSS
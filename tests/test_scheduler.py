@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from scheduler import TickScheduler
+
+
+def run_for(scheduler, seconds):
+    async def scenario():
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(seconds)
+        task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_slow_job_does_not_drift():
+    starts = []
+
+    async def job():
+        starts.append(time.monotonic())
+        await asyncio.sleep(0.03)
+
+    scheduler = TickScheduler(job, interval=0.05)
+    run_for(scheduler, 0.52)
+    # Sleeping interval-after-work would only fit 6 runs in this window
+    assert len(starts) >= 10
+    assert abs((starts[-1] - starts[0]) - 0.05 * (len(starts) - 1)) < 0.03
+
+
+def test_overrun_skips_missed_ticks():
+    async def job():
+        await asyncio.sleep(0.12)
+
+    scheduler = TickScheduler(job, interval=0.05, missed_tick_policy="skip")
+    run_for(scheduler, 0.3)
+    assert scheduler.stats["skipped"] >= 2
+    assert scheduler.stats["caught_up"] == 0
+
+
+def test_overrun_catches_up():
+    runs = []
+
+    async def job():
+        runs.append(time.monotonic())
+        if len(runs) == 1:
+            await asyncio.sleep(0.17)
+
+    scheduler = TickScheduler(job, interval=0.05, missed_tick_policy="catch_up", max_catch_up=2)
+    run_for(scheduler, 0.22)
+    assert scheduler.stats["caught_up"] == 2
+    assert scheduler.stats["skipped"] == 1
+    assert runs[2] - runs[1] < 0.02  # replayed back-to-back
+
+
+def test_configure_wakes_sleeping_scheduler():
+    runs = []
+
+    async def job():
+        runs.append(time.monotonic())
+
+    async def scenario():
+        scheduler = TickScheduler(job, interval=60)
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.02)
+        scheduler.configure(0.05)
+        await asyncio.sleep(0.05)  # woken for the tick at 0.05, next one is due at 0.10
+        task.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert len(runs) == 2
+    assert scheduler.stats["reschedules"] == 1
+
+
+def test_errors_keep_cadence_and_lateness_is_reported():
+    async def job():
+        raise RuntimeError("boom")
+
+    scheduler = TickScheduler(job, interval=0.02, jitter=0.005, seed=1)
+    run_for(scheduler, 0.15)
+    snapshot = scheduler.snapshot()
+    assert snapshot["errors"] == snapshot["ticks"] >= 5
+    assert 0.0 <= snapshot["lateness_seconds"]["p50"] <= snapshot["lateness_seconds"]["max"] < 0.02
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmarks.sentiment import run, synthetic_headlines
+from sentiment import LexiconBackend, TextBlobBackend, create_backend
+
+
+def test_lexicon_scores_direction_negation_boosters_and_contrast():
+    backend = LexiconBackend()
+    surge, crash, plain, negated, boosted, contrast = backend.score_batch([
+        "Bitcoin surges after ETF approval",
+        "Exchange hacked, prices crash",
+        "Miners publish quarterly report",
+        "Bitcoin is not bullish",
+        "Bitcoin sharply bullish",
+        "Bitcoin was bearish but rallied",
+    ])
+    assert surge > 0.05 and crash < -0.05 and plain == 0.0
+    assert negated < 0 < boosted
+    assert contrast > 0
+    assert backend.score_batch([]) == [] and backend.overall([]) == "Neutral"
+
+
+def test_lexicon_batch_scores_match_one_at_a_time():
+    backend = LexiconBackend()
+    headlines = synthetic_headlines(200, seed=3) + ["", "not"]
+    batched = backend.score_batch(headlines)
+    assert batched == pytest.approx([backend.score_batch([h])[0] for h in headlines])
+
+
+def test_lexicon_labels_mostly_agree_with_textblob():
+    results = run(count=2000, batch_size=500)
+    assert results["agreement"] >= 0.9
+    assert results["speedup"] > 1
+
+
+def test_create_backend_selects_by_name():
+    assert isinstance(create_backend("TextBlob"), TextBlobBackend)
+    assert isinstance(create_backend(), LexiconBackend)
+    with pytest.raises(ValueError):
+        create_backend("vader")
@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import pytest
+
+
+async def put_settings(server, **fields):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.put("/api/settings", json=fields)
+
+
+@pytest.mark.parametrize("fields", [
+    {"auto_trading_interval_minutes": 0},
+    {"auto_trading_jitter_seconds": -1},
+    {"trade_summary_ttl_days": -1},
+    {"retention_interval_minutes": 0},
+])
+def test_invalid_schedule_is_rejected_before_it_is_saved(server, fields):
+    response = asyncio.run(put_settings(server, **fields))
+    assert response.status_code == 422
+    assert asyncio.run(server.db.settings.find_one({})) is None
+
+
+def test_settings_saved_on_one_worker_reach_the_others(server, monkeypatch):
+    from leader_election import LeaderLease
+    from risk_monitor import RiskMonitor
+
+    monkeypatch.setattr(server, "SHARED_STATE_BACKEND", "mongo")
+    leader = LeaderLease(server.db.leases, holder="worker-a")
+    follower = LeaderLease(server.db.leases, holder="worker-b", heartbeat_seconds=0.01)
+    # Worker B's process state, loaded before worker A saved new settings
+    monkeypatch.setattr(server, "leader_lease", follower)
+    monkeypatch.setattr(server, "risk_monitor", RiskMonitor())
+
+    async def scenario():
+        assert await leader.try_acquire()
+        # Worker A's PUT /settings stores the document the same way
+        saved = server.TradingSettings(tracked_symbols=["ETH"], confidence_threshold=0.8, max_trades_per_day=3)
+        await server.db.settings.update_one({}, {"$set": saved.dict()}, upsert=True)
+
+        heartbeat = asyncio.create_task(server.leader_heartbeat())
+        await asyncio.sleep(0.05)
+        heartbeat.cancel()
+
+    asyncio.run(scenario())
+    assert not follower.is_leader
+    assert server.get_tracked_symbols() == ["ETH"]
+    assert server.trading_settings.confidence_threshold == 0.8
+    assert server.risk_monitor.confidence_threshold == 0.8 and server.risk_monitor.max_trades_per_day == 3
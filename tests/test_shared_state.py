@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from portfolio_state import PortfolioManager
+from shared_state import MemoryHistoryStore, MemoryStateStore
+
+SYMBOLS = ["BTC", "ETH"]
+
+
+class RoundTripStateStore(MemoryStateStore):
+    """Yields on every read, like a database round trip, so workers interleave"""
+
+    async def get(self, key):
+        doc = await super().get(key)
+        await asyncio.sleep(0)
+        return doc
+
+
+def test_compare_and_set_rejects_stale_version():
+    async def scenario():
+        store = MemoryStateStore()
+        assert await store.compare_and_set("doc", 0, {"version": 1})
+        assert not await store.compare_and_set("doc", 0, {"version": 1})
+        assert await store.compare_and_set("doc", 1, {"version": 2})
+        assert (await store.get("doc"))["version"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_workers_share_one_portfolio():
+    """Managers on one store behave like API workers on one Mongo database"""
+    async def scenario():
+        store = RoundTripStateStore()
+        workers = [PortfolioManager(1000.0, store=store) for _ in range(4)]
+
+        async def trigger(i):
+            await asyncio.sleep(0)
+            action = "BUY" if i % 2 == 0 else "SELL"
+            return await workers[i % 4].execute_trade(action, 100.0, SYMBOLS[i % 3 % 2], SYMBOLS)
+
+        executions = await asyncio.gather(*(trigger(i) for i in range(200)))
+        state = await workers[0].refresh()
+        assert state.version == 200
+        assert state.trade_count == sum(e.action != "HOLD" for e in executions)
+        assert abs(state.usd_balance + 100.0 * sum(state.holdings.values()) - 1000.0) < 1e-6
+        assert sum(w.stats["conflicts"] for w in workers) > 0
+
+        # A worker that never traded sees the shared result
+        late = PortfolioManager(1000.0, store=store)
+        assert (await late.refresh()).version == 200
+        assert not await late.set_initial_balance(5000.0)
+
+    asyncio.run(scenario())
+
+
+def test_daily_trade_cap_holds_across_workers():
+    async def scenario():
+        store = RoundTripStateStore()
+        workers = [PortfolioManager(1000.0, store=store) for _ in range(2)]
+        day = datetime(2024, 1, 1, 12)
+
+        async def trigger(i, now):
+            action = "BUY" if i % 2 == 0 else "SELL"
+            return await workers[i % 2].execute_trade(action, 100.0, "BTC", ["BTC"], max_trades_per_day=3, now=now)
+
+        executions = await asyncio.gather(*(trigger(i, day) for i in range(20)))
+        assert sum(e.action != "HOLD" for e in executions) == 3
+        assert any(e.capped for e in executions)
+        state = await workers[1].refresh()
+        assert state.trades_on(day.date()) == 3
+
+        # A new day starts a new count
+        next_day = await workers[1].execute_trade("SELL", 100.0, "BTC", ["BTC"], max_trades_per_day=3,
+                                                  now=day + timedelta(days=1))
+        assert next_day.action == "SELL" and next_day.state.trades_on((day + timedelta(days=1)).date()) == 1
+
+    asyncio.run(scenario())
+
+
+def test_history_store_is_bounded():
+    async def scenario():
+        store = MemoryHistoryStore()
+        for i in range(10):
+            series = await store.append("BTC", i, limit=3)
+        assert series == [7, 8, 9]
+        await store.trim("BTC", 2)
+        assert await store.get("BTC") == [8, 9]
+        assert await store.get("ETH") == []
+
+    asyncio.run(scenario())
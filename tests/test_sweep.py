@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from backtest import BacktestData
+from sweep import format_table, grid_space, random_space, run_sweep
+
+
+def make_data(n=5000):
+    rng = np.random.default_rng(3)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    timestamps = np.datetime64("2024-01-01", "s") + np.arange(n) * np.timedelta64(60, "s")
+    return BacktestData(timestamps, prices)
+
+
+def test_spaces():
+    assert grid_space({"a": [1, 2], "b": [3]}) == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+    combos = random_space({"stop_loss_percentage": (1.0, 5.0), "max_trades_per_day": (1, 3)}, 10, seed=1)
+    assert len(combos) == 10
+    assert all(isinstance(c["max_trades_per_day"], int) for c in combos)
+    assert all(1.0 <= c["stop_loss_percentage"] <= 5.0 for c in combos)
+
+
+def test_sweep_ranks_results_across_processes():
+    combos = grid_space({"stop_loss_percentage": [1, 5], "take_profit_percentage": [2, 10], "buy_below": [30, 40]})
+    results = run_sweep(make_data(), combos, strategy="rsi", workers=2)
+
+    assert len(results) == len(combos)
+    assert [r["rank"] for r in results] == list(range(1, len(combos) + 1))
+    returns = [r["total_return_pct"] for r in results]
+    assert returns == sorted(returns, reverse=True)
+    assert "rank" in format_table(results)
+
+
+def test_unknown_parameters_are_rejected():
+    with pytest.raises(ValueError):
+        run_sweep(make_data(100), [{"not_a_setting": 1}], workers=1)
@@ -0,0 +1,31 @@
+from trade_store import DETAIL_FIELDS, evidence_hash, merge_trade, split_trade
+
+
+def trade(evidence):
+    return {
+        "id": "t-1", "price": 100.0, "decision": "BUY", "confidence": 0.8,
+        "reasoning": "RSI oversold", "evidence": evidence, "verdict": "ok",
+        "chain_of_thought": {"market_analysis": "calm"}, "profit_loss": 0.0,
+    }
+
+
+def test_split_keeps_summary_compact():
+    doc = trade(["Bitcoin rallies", "ETF approved"])
+    summary, detail = split_trade(doc)
+    assert not set(DETAIL_FIELDS) & set(summary)
+    assert summary["_id"] == detail["_id"] == "t-1"
+    assert summary["evidence_count"] == 2
+    assert detail["evidence"] == [evidence_hash("Bitcoin rallies"), evidence_hash("ETF approved")]
+
+
+def test_identical_evidence_shares_one_hash():
+    _, first = split_trade(trade(["Bitcoin rallies"]))
+    _, second = split_trade(dict(trade(["Bitcoin rallies"]), id="t-2"))
+    assert first["evidence"] == second["evidence"]
+
+
+def test_merge_restores_the_full_trade():
+    doc = trade(["Bitcoin rallies", "ETF approved", "Bitcoin rallies"])
+    summary, detail = split_trade(doc)
+    texts = {evidence_hash(text): text for text in doc["evidence"]}
+    assert merge_trade(summary, detail, texts) == doc
@@ -0,0 +1,78 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+PRICES = {"BTC": 50000.0, "ETH": 2500.0, "SOL": 100.0}
+
+
+class RandomActions:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def __getitem__(self, symbol):
+        return self.rng.choice(["BUY", "SELL", "HOLD"])
+
+
+async def fire_triggers(server, count, seed):
+    rng = random.Random(seed)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.post("/api/trade/trigger", params={"symbol": rng.choice(list(PRICES)), "force": "true"})
+            for _ in range(count)
+        ))
+    assert await server.trade_writer.drain() == 0
+    return responses
+
+
+def test_concurrent_triggers_keep_balances_consistent(server):
+    server.fake_llm.actions = RandomActions(seed=11)
+    server.fake_llm.delay = 0.001
+    server.risk_monitor.max_trades_per_day = 0
+    responses = asyncio.run(fire_triggers(server, 500, seed=5))
+
+    assert [response.status_code for response in responses] == [200] * 500
+    # A recorded BUY/SELL may have been a no-op (already held / nothing to sell), never the reverse
+    requested = sum(response.json()["decision"] != "HOLD" for response in responses)
+    state = server.portfolio.state
+    assert state.version == 500 and 0 < state.trade_count <= requested
+    assert state.usd_balance >= 0 and all(amount > 0 for amount in state.holdings.values())
+    value = state.usd_balance + sum(amount * PRICES[symbol] for symbol, amount in state.holdings.items())
+    assert value == pytest.approx(1000.0)
+    assert asyncio.run(server.db.trades.count_documents({})) == 500
+
+
+def test_concurrent_triggers_respect_the_daily_trade_cap(server):
+    server.fake_llm.actions = RandomActions(seed=3)
+    server.risk_monitor.max_trades_per_day = 4
+    responses = asyncio.run(fire_triggers(server, 300, seed=9))
+
+    trades = [response.json() for response in responses]
+    assert server.portfolio.state.trade_count == server.portfolio.state.trades_today == 4
+    assert any(trade["risk_blocked"] for trade in trades)
+
+
+
+def test_risk_exit_is_not_recorded_when_the_position_closed_first(server, monkeypatch):
+    refresh = server.portfolio.refresh
+
+    async def refresh_then_close():
+        # The position is open at the check, then an LLM SELL closes it before the exit's update
+        state = await refresh()
+        monkeypatch.setattr(server.portfolio, "refresh", refresh)
+        await server.execute_paper_trade("SELL", 95.0, 1.0, "SOL")
+        return state
+
+    async def scenario():
+        await server.execute_paper_trade("BUY", 100.0, 1.0, "SOL")
+        monkeypatch.setattr(server.portfolio, "refresh", refresh_then_close)
+        exit_trade = await server.handle_price_tick("SOL", 90.0)
+        assert await server.trade_writer.drain() == 0
+        return exit_trade
+
+    assert asyncio.run(scenario()) is None
+    assert asyncio.run(server.db.trades.count_documents({})) == 0
+    state = server.portfolio.state
+    assert state.trade_count == 2 and state.usd_balance == pytest.approx(1000.0 - 1000.0 / 3 * 0.05)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from dedup import SeenSet, text_key
+from rate_limiter import LANE_TRADING, Lane, RateLimiter
+from tweet_ingest import ReplayTweetSource, SentimentWindow, TweetIngestor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def keyword_scores(texts):
+    return [1.0 if "moon" in t else -1.0 if "dump" in t else 0.0 for t in texts]
+
+
+def test_window_keeps_a_running_aggregate_within_size_and_age():
+    clock = FakeClock()
+    window = SentimentWindow(max_size=3, window_seconds=60, clock=clock)
+    assert window.aggregate().label == "Neutral" and window.aggregate().count == 0
+
+    window.add("a", 0.5)
+    window.add("b", 0.5)
+    clock.now = 30
+    window.add("c", -0.2)
+    window.add("d", -0.4)  # evicts "a"
+    aggregate = window.aggregate()
+    assert (aggregate.count, aggregate.positive, aggregate.negative) == (3, 1, 2)
+    assert aggregate.polarity == round((0.5 - 0.2 - 0.4) / 3, 4)
+    assert window.recent(2) == ["d", "c"]
+
+    clock.now = 61  # "b" ages out
+    assert window.aggregate().label == "Negative" and len(window) == 2
+
+
+def test_seen_set_forgets_oldest_and_text_key_ignores_links_and_mentions():
+    seen = SeenSet(max_size=2)
+    assert seen.add("a") and seen.add("b") and not seen.add("a")
+    seen.add("c")  # "b" was seen longest ago
+    assert "b" not in seen and "a" in seen
+    assert text_key("RT @whale: BTC to the MOON! https://t.co/x") == text_key("btc to the moon")
+
+
+def test_replayed_posts_are_deduplicated_and_scored_in_batches(tmp_path):
+    recorded = [
+        {"id": "1", "text": "BTC to the moon"},
+        {"id": "2", "text": "Market dump incoming"},
+        {"id": "1", "text": "BTC to the moon"},  # same post on the next page
+        {"id": "3", "text": "RT @trader: BTC to the moon https://t.co/abc"},  # copy
+        {"id": "4", "text": "ETH moon season"},
+        {"id": "5", "text": "Watching the charts"},
+    ]
+    path = tmp_path / "tweets.jsonl"
+    path.write_text("".join(json.dumps(t) + "\n" for t in recorded))
+    batches = []
+
+    def score(texts):
+        batches.append(len(texts))
+        return keyword_scores(texts)
+
+    async def scenario():
+        ingestor = TweetIngestor(ReplayTweetSource(path, per_poll=4), score, SentimentWindow(), batch_size=2)
+        assert await ingestor.poll() == 2
+        assert await ingestor.poll() == 2
+        assert await ingestor.poll() == 0  # replay exhausted
+        return ingestor
+
+    ingestor = asyncio.run(scenario())
+    assert batches == [2, 2]
+    assert ingestor.stats["duplicates"] == 2
+    snapshot = ingestor.snapshot()
+    assert (snapshot["count"], snapshot["positive"], snapshot["negative"]) == (4, 2, 1)
+    assert snapshot["label"] == "Positive"
+
+
+def test_polls_without_a_token_skip_the_upstream():
+    class CountingSource:
+        calls = 0
+
+        async def fetch(self):
+            self.calls += 1
+            return []
+
+    async def scenario():
+        source = CountingSource()
+        ingestor = TweetIngestor(source, keyword_scores, SentimentWindow(),
+                                 limiter=RateLimiter("twitter", rate_per_minute=1, burst=1,
+                                                     lanes={LANE_TRADING: Lane(0, 0.0)}))
+        await ingestor.poll()
+        await ingestor.poll()
+        return source.calls, ingestor.stats["throttled"]
+
+    assert asyncio.run(scenario()) == (1, 1)
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+from write_behind import WriteBehindQueue
+
+
+class RecordingCollection:
+    def __init__(self, fail_times=0, delay=0.0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.delay = delay
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(self.delay)
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("mongo unavailable")
+        self.batches.append(list(docs))
+
+    @property
+    def docs(self):
+        return [doc for batch in self.batches for doc in batch]
+
+
+def test_batches_by_size_and_time():
+    async def scenario():
+        collection = RecordingCollection()
+        queue = WriteBehindQueue(collection, max_batch=10, flush_interval=0.05)
+        queue.start()
+        for i in range(25):
+            await queue.put({"n": i})
+        await asyncio.sleep(0.1)
+        assert [len(batch) for batch in collection.batches] == [10, 10, 5]
+        assert queue.snapshot()["depth"] == 0
+        assert await queue.drain() == 0
+
+    asyncio.run(scenario())
+
+
+def test_backpressure_bounds_queue():
+    async def scenario():
+        collection = RecordingCollection(delay=0.02)
+        queue = WriteBehindQueue(collection, max_batch=5, flush_interval=0.01, max_queue=5)
+        queue.start()
+        for i in range(40):
+            await queue.put({"n": i})
+            assert queue.depth <= 5
+        await queue.drain()
+        assert [doc["n"] for doc in collection.docs] == list(range(40))
+        assert queue.stats["backpressure_waits"] > 0
+
+    asyncio.run(scenario())
+
+
+def test_drain_retries_and_loses_nothing():
+    async def scenario():
+        collection = RecordingCollection(fail_times=2)
+        queue = WriteBehindQueue(collection, max_batch=50, flush_interval=0.01, retry_delay=0.01)
+        queue.start()
+        for i in range(120):
+            await queue.put({"n": i})
+        assert await queue.drain(timeout=1) == 0
+        assert sorted(doc["n"] for doc in collection.docs) == list(range(120))
+        assert queue.stats["failures"] == 2
+        with pytest.raises(RuntimeError):
+            await queue.put({"n": -1})
+
+    asyncio.run(scenario())
+
+
+def test_poison_document_is_dead_lettered_without_blocking_the_rest(tmp_path):
+    class ValidatingCollection(RecordingCollection):
+        async def insert_many(self, docs, ordered=True):
+            if any(doc.get("poison") for doc in docs):
+                raise ValueError("Document failed validation")
+            await super().insert_many(docs, ordered)
+
+    async def scenario():
+        collection = ValidatingCollection()
+        dead_letters = tmp_path / "dead" / "trades.jsonl"
+        queue = WriteBehindQueue(collection, max_batch=8, flush_interval=0.01, retry_delay=0.001,
+                                 max_retries=2, dead_letter_path=dead_letters)
+        queue.start()
+        for i in range(20):
+            await queue.put({"id": str(i), "poison": i == 3})
+        assert await queue.drain(timeout=1) == 0  # dead-lettered by the flusher, not at shutdown
+        assert sorted(int(doc["id"]) for doc in collection.docs) == [i for i in range(20) if i != 3]
+        assert queue.stats["dead_lettered"] == 1
+        assert [json.loads(line)["id"] for line in dead_letters.read_text().splitlines()] == ["3"]
+
+    asyncio.run(scenario())